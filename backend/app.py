@@ -15,6 +15,15 @@ from datetime import datetime
 from gcode_generator import LaserGCodeGenerator
 from image_processor import ImageProcessor
 from svg_processor import SVGProcessor
+from svg_cache import SVGCache
+from svg_pool import FlattenPool
+from spatial_index import polyline_distance
+from machine_profile import MachineProfile
+from motion_simulator import MotionSimulator
+from gcode_validator import GCodeValidator
+from job_file import JobFile
+from job_merger import JobMerger
+from step_repeat import StepRepeat
 from werkzeug.utils import secure_filename
 
 app = Flask(__name__)
@@ -28,6 +37,8 @@ ALLOWED_EXTENSIONS = {'txt', 'gcode'}
 ALLOWED_IMAGE_EXTENSIONS = {'jpg', 'jpeg', 'png', 'bmp', 'tiff', 'tif'}
 ALLOWED_SVG_EXTENSIONS = {'svg'}
 MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB
+SVG_ELEMENTS_PAGE_SIZE = 500  # Elementos por página de /api/svg-elements sin 'limit'
+SVG_ELEMENTS_MAX_PAGE_SIZE = 5000  # Tope de 'limit' en /api/svg-elements
 
 # Crear directorios si no existen
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -37,6 +48,10 @@ os.makedirs(PREVIEW_FOLDER, exist_ok=True)
 # Inicializar procesadores
 image_processor = ImageProcessor()
 svg_processor = SVGProcessor()
+# Aplanado de documentos grandes repartido entre los núcleos disponibles
+flatten_pool = FlattenPool()
+# Documentos SVG ya procesados (memoria + disco en uploads/), por hash del contenido
+svg_cache = SVGCache(svg_processor, cache_dir=os.path.join(UPLOAD_FOLDER, '.svg_cache'), pool=flatten_pool)
 
 def allowed_image_file(filename):
     """Verificar si el archivo es una imagen válida"""
@@ -74,6 +89,60 @@ def save_uploaded_svg(file, folder):
         return filepath
     return None
 
+def get_generator_options(data):
+    """Extraer opciones de optimización de G-code comunes a los generadores"""
+    return {
+        'arc_tolerance': float(data.get('arc_tolerance', 0.0)),
+        'gcode_dialect': data.get('gcode_dialect', 'grbl'),
+        'emission_mode': data.get('emission_mode', 'm3'),
+        'simplify_tolerance': float(data.get('simplify_tolerance', 0.0)),
+        'machine_profile': MachineProfile.from_dict(data.get('machine_profile')),
+        'clip_to_table': bool(data.get('clip_to_table', True)),
+        'pass_order': data.get('pass_order', 'group'),
+        'cooling_interval': float(data.get('cooling_interval', 0.0)),
+        'step_repeat': StepRepeat.from_dict(data.get('step_repeat')),
+        'dedupe_tolerance': float(data.get('dedupe_tolerance', 0.0))
+    }
+
+def estimate_job(filepath, data):
+    """Estimar duración del trabajo guardado con el perfil de máquina de la petición"""
+    profile = MachineProfile.from_dict(data.get('machine_profile'))
+    simulator = MotionSimulator(profile)
+    if filepath.endswith(JobFile.EXTENSION):
+        # Trabajo binario: movimientos directamente desde el toolpath, sin parsear texto
+        toolpath = JobFile(filepath).read()
+        meta = toolpath.meta
+        moves = toolpath.to_moves(LaserGCodeGenerator.LASER_POWER_MAX_VALUE,
+                                  meta.get('emission_mode', 'm3'),
+                                  order=meta.get('pass_order', 'group'),
+                                  cooling_interval=meta.get('cooling_interval', 0.0))
+        return simulator.estimate_moves(moves, meta.get('dwell_s', 0.0))
+    return simulator.estimate_file(filepath)
+
+def save_job(generator, filepath):
+    """Guardar el toolpath del trabajo (.lcjob) junto al archivo G-code"""
+    if generator.last_toolpath is None:
+        return None
+    job_path = JobFile.path_for(filepath)
+    JobFile(job_path).write(generator.last_toolpath)
+    return os.path.basename(job_path)
+
+def resolve_job_path(filename):
+    """Ruta del .lcjob correspondiente a un nombre de archivo .gcode o .lcjob"""
+    return JobFile.path_for(os.path.join(OUTPUT_FOLDER, secure_filename(filename)))
+
+def parse_query_numbers(value, count, name):
+    """Lista de count números desde una lista JSON o una cadena 'a,b,...' de la URL"""
+    if isinstance(value, str):
+        value = value.split(',')
+    try:
+        numbers = [float(v) for v in value]
+    except (TypeError, ValueError):
+        numbers = []
+    if len(numbers) != count or not all(np.isfinite(numbers)):
+        raise ValueError(f"'{name}' debe tener {count} números")
+    return numbers
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Verificar estado del API"""
@@ -105,7 +174,8 @@ def generate_gcode():
             font_name=data.get('font_name', 'Arial'),
             laser_power_max=float(data.get('laser_power_max', 100.0)),
             num_layers=int(data.get('num_layers', 30)),
-            focus_height=float(data.get('focus_height', 0.0))
+            focus_height=float(data.get('focus_height', 0.0)),
+            **get_generator_options(data)
         )
         
         # Generar G-code
@@ -126,7 +196,15 @@ def generate_gcode():
             'filename': filename,
             'filepath': filepath,
             'total_lines': len(gcode_lines),
-            'download_url': f'/api/download/{filename}'
+            'download_url': f'/api/download/{filename}',
+            'arc_fitting': generator.get_arc_stats(),
+            'simplification': generator.get_simplify_stats(),
+            'quantization': generator.get_quantize_stats(),
+            'clipping': generator.get_clip_stats(),
+            'deduplication': generator.get_dedupe_stats(),
+            'pass_orders': generator.get_pass_order_stats(),
+            'job_filename': save_job(generator, filepath),
+            'estimate': estimate_job(filepath, data)
         })
         
     except Exception as e:
@@ -144,9 +222,34 @@ def download_file(filename):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/estimate', methods=['POST'])
+def estimate_gcode():
+    """Estimar tiempo de ejecución de un archivo G-code con un perfil de máquina"""
+    try:
+        data = request.get_json()
+        filename = data.get('filename')
+        
+        if not filename:
+            return jsonify({'error': 'Nombre de archivo requerido'}), 400
+        
+        filepath = os.path.join(OUTPUT_FOLDER, secure_filename(filename))
+        if not os.path.exists(filepath):
+            return jsonify({'error': 'Archivo no encontrado'}), 404
+        
+        estimate = estimate_job(filepath, data)
+        
+        return jsonify({
+            'success': True,
+            'filename': filename,
+            'estimate': estimate
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/validate', methods=['POST'])
 def validate_gcode():
-    """Validar G-code para seguridad del eje Z"""
+    """Validar G-code: límites de la tabla, rango de potencia y rápidos con láser encendido"""
     try:
         data = request.get_json()
         filename = data.get('filename')
@@ -154,26 +257,175 @@ def validate_gcode():
         if not filename:
             return jsonify({'error': 'Nombre de archivo requerido'}), 400
         
-        filepath = os.path.join(OUTPUT_FOLDER, filename)
+        filepath = os.path.join(OUTPUT_FOLDER, secure_filename(filename))
         if not os.path.exists(filepath):
             return jsonify({'error': 'Archivo no encontrado'}), 404
         
-        # Importar validador
-        from validate_z_axis import ZAxisValidator
+        table_width = data.get('table_width')
+        table_height = data.get('table_height')
+        validator = GCodeValidator(
+            table_width=float(table_width) if table_width is not None else None,
+            table_height=float(table_height) if table_height is not None else None,
+            laser_mode=bool(data.get('laser_mode', True))
+        )
+        result = validator.validate_file(filepath)
+        result['filename'] = filename
+        
+        return jsonify(result)
         
-        validator = ZAxisValidator(filepath)
-        is_valid, errors, warnings = validator.validate()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/reemit', methods=['POST'])
+def reemit_job():
+    """Volver a emitir un trabajo guardado (.lcjob) con otro dialecto, modo o potencia"""
+    try:
+        data = request.get_json()
+        filename = data.get('filename')
+        
+        if not filename:
+            return jsonify({'error': 'Nombre de archivo requerido'}), 400
+        
+        job_path = resolve_job_path(filename)
+        if not os.path.exists(job_path):
+            return jsonify({'error': 'Trabajo no encontrado'}), 404
+        
+        toolpath = JobFile(job_path).read()
+        meta = toolpath.meta
+        generator = LaserGCodeGenerator(
+            table_width=float(data.get('table_width', meta.get('table_width', 50.0))),
+            table_height=float(data.get('table_height', meta.get('table_height', 50.0))),
+            **get_generator_options(data)
+        )
+        gcode_lines = generator.generate_gcode_from_toolpath(
+            toolpath, power_scale=float(data.get('power_scale', 1.0))
+        )
+        
+        # Guardar archivo
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        new_filename = f"job_reemit_{timestamp}.gcode"
+        filepath = os.path.join(OUTPUT_FOLDER, new_filename)
+        generator.save_gcode(gcode_lines, filepath)
+        
+        return jsonify({
+            'success': True,
+            'source': os.path.basename(job_path),
+            'filename': new_filename,
+            'total_lines': len(gcode_lines),
+            'download_url': f'/api/download/{new_filename}',
+            'arc_fitting': generator.get_arc_stats(),
+            'simplification': generator.get_simplify_stats(),
+            'quantization': generator.get_quantize_stats(),
+            'clipping': generator.get_clip_stats(),
+            'deduplication': generator.get_dedupe_stats(),
+            'pass_orders': generator.get_pass_order_stats(),
+            'job_filename': save_job(generator, filepath),
+            'estimate': estimate_job(filepath, data)
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/merge', methods=['POST'])
+def merge_jobs():
+    """Combinar varios trabajos generados en un único programa optimizado"""
+    try:
+        data = request.get_json()
+        filenames = data.get('filenames') or []
+        
+        if len(filenames) < 2:
+            return jsonify({'error': 'Se requieren al menos dos trabajos para combinar'}), 400
+        
+        job_paths = [resolve_job_path(name) for name in filenames]
+        for name, job_path in zip(filenames, job_paths):
+            if not os.path.exists(job_path):
+                return jsonify({'error': f'Trabajo no encontrado: {name}'}), 404
+        
+        # Copias en memoria: el combinado no debe quedar ligado a los memmaps
+        toolpaths = [JobFile(job_path).read().copy() for job_path in job_paths]
+        names = [os.path.basename(job_path) for job_path in job_paths]
+        
+        # Estimación de ejecutar los trabajos uno tras otro (cada uno con su G-code)
+        sources = []
+        for name, job_path, toolpath in zip(names, job_paths, toolpaths):
+            gcode_path = os.path.splitext(job_path)[0] + '.gcode'
+            estimate = estimate_job(gcode_path if os.path.exists(gcode_path) else job_path, data)
+            sources.append({
+                'filename': name,
+                'kind': toolpath.meta.get('kind'),
+                'paths': toolpath.num_paths,
+                'estimated_time_s': estimate['estimated_time_s']
+            })
+        
+        merger = JobMerger()
+        merged = merger.merge(toolpaths, names)
+        
+        generator = LaserGCodeGenerator(
+            table_width=float(data.get('table_width', max(tp.meta.get('table_width', 50.0) for tp in toolpaths))),
+            table_height=float(data.get('table_height', max(tp.meta.get('table_height', 50.0) for tp in toolpaths))),
+            **get_generator_options(data)
+        )
+        gcode_lines = generator.generate_merged_gcode(merged, names)
+        
+        # Guardar archivo
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        new_filename = f"merged_output_{timestamp}.gcode"
+        filepath = os.path.join(OUTPUT_FOLDER, new_filename)
+        generator.save_gcode(gcode_lines, filepath)
+        
+        estimate = estimate_job(filepath, data)
+        sequential = sum(source['estimated_time_s'] for source in sources)
+        merge_stats = merger.get_stats()
+        merge_stats.update({
+            'jobs': sources,
+            'sequential_time_s': round(sequential, 3),
+            'merged_time_s': estimate['estimated_time_s'],
+            'time_saved_s': round(sequential - estimate['estimated_time_s'], 3)
+        })
+        # Resumen con el tiempo total: menos desplazamiento no implica un programa más rápido
+        travel = f"desplazamiento {merge_stats['travel_before_mm']} → {merge_stats['travel_after_mm']} mm"
+        if merge_stats['time_saved_s'] >= 0:
+            message = (f"Trabajos combinados: {merge_stats['time_saved_s']} s menos que ejecutarlos "
+                       f"por separado ({travel})")
+        else:
+            message = (f"Trabajos combinados, pero el programa tarda {-merge_stats['time_saved_s']} s más "
+                       f"que ejecutarlos por separado ({travel})")
         
         return jsonify({
-            'is_valid': is_valid,
-            'errors': errors,
-            'warnings': warnings,
-            'filename': filename
+            'success': True,
+            'message': message,
+            'filename': new_filename,
+            'total_lines': len(gcode_lines),
+            'download_url': f'/api/download/{new_filename}',
+            'merge': merge_stats,
+            'arc_fitting': generator.get_arc_stats(),
+            'simplification': generator.get_simplify_stats(),
+            'quantization': generator.get_quantize_stats(),
+            'clipping': generator.get_clip_stats(),
+            'deduplication': generator.get_dedupe_stats(),
+            'pass_orders': generator.get_pass_order_stats(),
+            'job_filename': save_job(generator, filepath),
+            'estimate': estimate
         })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/jobs/<filename>/preview', methods=['GET'])
+def get_job_preview(filename):
+    """Obtener la geometría de un trabajo guardado (.lcjob) para previsualizarla"""
+    try:
+        job_path = resolve_job_path(filename)
+        if not os.path.exists(job_path):
+            return jsonify({'error': 'Trabajo no encontrado'}), 404
+        
+        preview = JobFile(job_path).preview()
+        preview['filename'] = os.path.basename(job_path)
+        return jsonify(preview)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/presets', methods=['GET'])
 def get_presets():
     """Obtener configuraciones predefinidas para LASER TREE 10W"""
@@ -356,11 +608,13 @@ def list_files():
             if filename.endswith('.gcode'):
                 filepath = os.path.join(OUTPUT_FOLDER, filename)
                 stat = os.stat(filepath)
+                job_path = JobFile.path_for(filepath)
                 files.append({
                     'filename': filename,
                     'size': stat.st_size,
                     'created': datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                    'download_url': f'/api/download/{filename}'
+                    'download_url': f'/api/download/{filename}',
+                    'job_filename': os.path.basename(job_path) if os.path.exists(job_path) else None
                 })
         
         # Ordenar por fecha de creación (más reciente primero)
@@ -379,9 +633,9 @@ def cleanup_files():
         deleted_count = 0
         total_size = 0
         
-        # Limpiar archivos en el directorio de salida
+        # Limpiar archivos en el directorio de salida (G-code y trabajos binarios)
         for filename in os.listdir(OUTPUT_FOLDER):
-            if filename.endswith('.gcode'):
+            if filename.endswith(('.gcode', JobFile.EXTENSION)):
                 filepath = os.path.join(OUTPUT_FOLDER, filename)
                 try:
                     # Obtener información del archivo antes de eliminarlo
@@ -587,7 +841,8 @@ def generate_gcode_from_image():
             num_layers=num_layers,
             feed_rate=feed_rate,  # Usar velocidad específica de la imagen
             line_height=line_height,
-            focus_height=focus_height
+            focus_height=focus_height,
+            **get_generator_options(data)
         )
         
         # Generar G-code desde contornos
@@ -598,15 +853,23 @@ def generate_gcode_from_image():
         filename = f"image_laser_output_{timestamp}.gcode"
         filepath = os.path.join(OUTPUT_FOLDER, filename)
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(gcode)
+        generator.save_gcode(gcode.split('\n'), filepath)
         
         return jsonify({
             'success': True,
             'message': 'G-code generado correctamente desde imagen',
             'filename': filename,
             'download_url': f'/api/download/{filename}',
-            'gcode': gcode
+            'gcode': gcode,
+            'arc_fitting': generator.get_arc_stats(),
+            'simplification': generator.get_simplify_stats(),
+            'quantization': generator.get_quantize_stats(),
+            'clipping': generator.get_clip_stats(),
+            'deduplication': generator.get_dedupe_stats(),
+            'pass_orders': generator.get_pass_order_stats(),
+            'step_repeat': generator.get_step_repeat_stats(),
+            'job_filename': save_job(generator, filepath),
+            'estimate': estimate_job(filepath, data)
         })
         
     except Exception as e:
@@ -672,7 +935,7 @@ def upload_svg():
         
         # Obtener información del SVG
         try:
-            svg_info = svg_processor.get_svg_info(filepath)
+            svg_info = svg_cache.info(filepath)
         except Exception as svg_error:
             # Si falla al obtener info, al menos devolver que se subió correctamente
             # pero sin información detallada
@@ -707,11 +970,26 @@ def upload_svg():
         print(f"Error en upload_svg: {error_details}")
         return jsonify({'error': str(e), 'details': error_details}), 500
 
-@app.route('/api/svg-elements', methods=['POST'])
+@app.route('/api/svg-elements', methods=['GET', 'POST'])
 def get_svg_elements():
-    """Obtener elementos del SVG"""
+    """
+    Obtener elementos del SVG
+    
+    Parámetros opcionales (cuerpo JSON o URL) para devolver solo una parte:
+    - bbox: región [xmin, ymin, xmax, ymax] o 'xmin,ymin,xmax,ymax'; elementos
+      cuya caja envolvente la corta, en orden de documento
+    - point: punto [x, y] o 'x,y' y radius (por defecto 0); elementos a menos de
+      radius del punto (o que lo contienen si tienen relleno), el más cercano primero
+    
+    Los puntos de vista previa salen de la pirámide de niveles de detalle según
+    tolerance (unidades del documento) o zoom (píxeles por unidad; tolerancia de
+    medio píxel). offset y limit paginan el resultado (limit por defecto
+    SVG_ELEMENTS_PAGE_SIZE, como máximo SVG_ELEMENTS_MAX_PAGE_SIZE) e
+    include_d=false omite el atributo d.
+    """
     try:
-        data = request.get_json()
+        data = dict(request.args)
+        data.update(request.get_json(silent=True) or {})
         
         if 'filepath' not in data:
             return jsonify({'error': 'Ruta de archivo requerida'}), 400
@@ -721,30 +999,88 @@ def get_svg_elements():
         if not os.path.exists(filepath):
             return jsonify({'error': 'Archivo no encontrado'}), 404
         
-        # Extraer elementos
-        elements = svg_processor.extract_elements(filepath)
+        try:
+            bbox = parse_query_numbers(data['bbox'], 4, 'bbox') if data.get('bbox') is not None else None
+            point = parse_query_numbers(data['point'], 2, 'point') if data.get('point') is not None else None
+            radius = abs(float(data.get('radius', 0.0)))
+            tolerance = float(data['tolerance']) if data.get('tolerance') is not None else None
+            zoom = float(data['zoom']) if data.get('zoom') is not None else None
+            offset = int(data.get('offset', 0))
+            limit = int(data['limit']) if data.get('limit') is not None else SVG_ELEMENTS_PAGE_SIZE
+            include_d = str(data.get('include_d', True)).lower() not in ('false', '0', 'no')
+            if (tolerance is not None and not tolerance > 0) or (zoom is not None and not zoom > 0):
+                raise ValueError("'tolerance' y 'zoom' deben ser positivos")
+            if offset < 0 or limit < 0:
+                raise ValueError("'offset' y 'limit' no pueden ser negativos")
+            limit = min(limit, SVG_ELEMENTS_MAX_PAGE_SIZE)
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Extraer elementos y la pirámide de vista previa en coordenadas del documento (desde caché)
+        elements = svg_cache.elements(filepath)
+        lod = svg_cache.lod(filepath)
+        if tolerance is None:
+            tolerance = 0.5 / zoom if zoom is not None else lod.default_tolerance
+        level = lod.level_for(tolerance)
+        # Decimales suficientes para la tolerancia del nivel
+        decimals = max(0, int(np.ceil(-np.log10(lod.tolerances[level]))) + 1)
+        
+        # Consultas sobre el índice espacial del documento: O(log n + k)
+        query = None
+        selected = range(len(elements))
+        if bbox is not None:
+            selected = svg_cache.index(filepath).search(*bbox).tolist()
+            query = {'bbox': bbox}
+        elif point is not None:
+            candidates = svg_cache.index(filepath).pick(point[0], point[1], radius).tolist()
+            distances = [(polyline_distance(lod.points(i, 0), point[0], point[1],
+                                            filled=elements[i]['fill'] not in (None, 'none')), i)
+                         for i in candidates]
+            selected = [i for distance, i in sorted(distances) if distance <= radius]
+            query = {'point': point, 'radius': radius}
+        
+        # Paginación
+        total = len(selected)
+        end = min(total, offset + limit)
+        page = selected[offset:end]
         
         # Convertir elementos a formato JSON serializable
         elements_data = []
-        for elem in elements:
-            # Convertir path a puntos para preview
-            points = svg_processor.path_to_points(elem['d'], num_points=50)
+        returned_points = 0
+        for i in page:
+            elem = elements[i]
+            points = [tuple(point) for point in np.round(lod.points(i, level), decimals).tolist()]
+            returned_points += len(points)
             
-            elements_data.append({
+            element_data = {
+                'index': i,
                 'id': elem['id'],
                 'type': elem['type'],
-                'd': elem['d'],
                 'fill': elem['fill'],
                 'stroke': elem['stroke'],
                 'stroke_width': elem['stroke_width'],
-                'points': points[:100],  # Limitar puntos para respuesta
+                'points': points,
                 'transform': elem.get('transform', '')
-            })
+            }
+            if include_d:
+                element_data['d'] = elem['d']
+            elements_data.append(element_data)
         
         return jsonify({
             'success': True,
             'elements': elements_data,
-            'total_elements': len(elements_data)
+            'total_elements': total,
+            'document_elements': len(elements),
+            'offset': offset,
+            'next_offset': end if end < total else None,
+            'query': query,
+            'lod': {
+                'level': level,
+                'tolerance': float(lod.tolerances[level]),
+                'levels': [float(t) for t in lod.tolerances],
+                'points': returned_points
+            },
+            'svg_cache': svg_cache.get_stats()
         })
         
     except Exception as e:
@@ -771,35 +1107,49 @@ def generate_gcode_from_svg():
         scale_factor = float(data.get('scale_factor', 1.0))
         offset_x = float(data.get('offset_x', 0.0))
         offset_y = float(data.get('offset_y', 0.0))
+        # Tolerancia cordal del aplanado adaptativo (mm en la pieza final)
+        flatten_tolerance = float(data.get('flatten_tolerance', 0.02))
+        # Conservar círculos, arcos y rectas como G2/G3/G1 exactos
+        native_arcs = bool(data.get('native_arcs', True))
         
         if not os.path.exists(filepath):
             return jsonify({'error': 'Archivo no encontrado'}), 404
         
-        # Extraer elementos del SVG
-        all_elements = svg_processor.extract_elements(filepath)
+        # Convertir la tolerancia de mm a unidades SVG
+        svg_tolerance = flatten_tolerance / scale_factor if scale_factor > 0 else flatten_tolerance
+        
+        # Extraer elementos del SVG (desde caché)
+        all_elements = svg_cache.elements(filepath)
         
-        # Crear diccionario de elementos por ID para acceso rápido
-        elements_dict = {elem['id']: elem for elem in all_elements}
+        # Crear diccionario de índices de elementos por ID para acceso rápido
+        elements_dict = {elem['id']: i for i, elem in enumerate(all_elements)}
+        
+        # Elementos solicitados por cada capa
+        requested = [[elements_dict[elem_id] for elem_id in layer_config.get('element_ids', [])
+                      if elem_id in elements_dict] for layer_config in layers_config]
+        
+        # Geometría aplanada y transformada de todo el documento (una multiplicación por
+        # grupo SVG), calculada una vez por tolerancia; con native_arcs los círculos y
+        # arcos circulares se conservan como arcos exactos
+        all_geometry = svg_cache.geometry(filepath, tolerance=svg_tolerance, native_arcs=native_arcs)
+        geometry = iter(all_geometry[i] for elems in requested for i in elems)
         
         # Procesar capas
         layers = []
-        for layer_config in layers_config:
+        for layer_config, elems in zip(layers_config, requested):
             layer_name = layer_config.get('layer_name', 'Layer')
             speed = float(layer_config.get('speed', 300.0))
             power = float(layer_config.get('power', 100.0))
-            element_ids = layer_config.get('element_ids', [])
             
             # Obtener elementos de esta capa
             layer_elements = []
-            for elem_id in element_ids:
-                if elem_id in elements_dict:
-                    elem = elements_dict[elem_id]
-                    # Convertir path a puntos
-                    points = svg_processor.path_to_points(elem['d'], num_points=200)
-                    layer_elements.append({
-                        'id': elem_id,
-                        'points': points
-                    })
+            for i in elems:
+                points, bulges = next(geometry)
+                layer_elements.append({
+                    'id': all_elements[i]['id'],
+                    'points': points.tolist(),
+                    'bulges': bulges.tolist()
+                })
             
             if layer_elements:
                 num_passes = int(layer_config.get('num_passes', 1))
@@ -819,7 +1169,8 @@ def generate_gcode_from_svg():
             table_width=table_width,
             table_height=table_height,
             feed_rate=300.0,  # Valor por defecto, se sobrescribe por capa
-            laser_power_max=100.0  # Valor por defecto, se sobrescribe por capa
+            laser_power_max=100.0,  # Valor por defecto, se sobrescribe por capa
+            **get_generator_options(data)
         )
         
         # Generar G-code
@@ -837,8 +1188,7 @@ def generate_gcode_from_svg():
         filename = f"svg_laser_output_{timestamp}.gcode"
         filepath = os.path.join(OUTPUT_FOLDER, filename)
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(gcode)
+        generator.save_gcode(gcode.split('\n'), filepath)
         
         return jsonify({
             'success': True,
@@ -846,7 +1196,18 @@ def generate_gcode_from_svg():
             'filename': filename,
             'download_url': f'/api/download/{filename}',
             'gcode': gcode,
-            'layers_processed': len(layers)
+            'layers_processed': len(layers),
+            'arc_fitting': generator.get_arc_stats(),
+            'simplification': generator.get_simplify_stats(),
+            'quantization': generator.get_quantize_stats(),
+            'clipping': generator.get_clip_stats(),
+            'deduplication': generator.get_dedupe_stats(),
+            'pass_orders': generator.get_pass_order_stats(),
+            'step_repeat': generator.get_step_repeat_stats(),
+            'svg_cache': svg_cache.get_stats(),
+            'flatten_pool': flatten_pool.get_stats(),
+            'job_filename': save_job(generator, filepath),
+            'estimate': estimate_job(filepath, data)
         })
         
     except Exception as e:
@@ -874,7 +1235,8 @@ def generate_cut_gcode():
             font_name='Arial',  # No relevante para cortes
             laser_power_max=float(data.get('cut_power', 100.0)),
             num_layers=1,  # No relevante para cortes
-            focus_height=float(data.get('focus_height', 0.0))
+            focus_height=float(data.get('focus_height', 0.0)),
+            **get_generator_options(data)
         )
         
         # Parámetros del corte
@@ -917,7 +1279,12 @@ def generate_cut_gcode():
                 'start_position': [start_x, start_y],
                 'power': cut_power,
                 'speed': cut_speed
-            }
+            },
+            'clipping': generator.get_clip_stats(),
+            'deduplication': generator.get_dedupe_stats(),
+            'pass_orders': generator.get_pass_order_stats(),
+            'job_filename': save_job(generator, filepath),
+            'estimate': estimate_job(filepath, data)
         })
         
     except Exception as e:
@@ -956,7 +1323,8 @@ def generate_multiple_cuts_gcode():
             font_name='Arial',  # No relevante para cortes
             laser_power_max=float(data.get('cut_power', 100.0)),
             num_layers=1,  # No relevante para cortes
-            focus_height=float(data.get('focus_height', 0.0))
+            focus_height=float(data.get('focus_height', 0.0)),
+            **get_generator_options(data)
         )
         
         # Parámetros globales
@@ -985,7 +1353,12 @@ def generate_multiple_cuts_gcode():
             'download_url': f'/api/download/{filename}',
             'cuts_count': len(cuts),
             'cut_power': cut_power,
-            'cut_speed': cut_speed
+            'cut_speed': cut_speed,
+            'clipping': generator.get_clip_stats(),
+            'deduplication': generator.get_dedupe_stats(),
+            'pass_orders': generator.get_pass_order_stats(),
+            'job_filename': save_job(generator, filepath),
+            'estimate': estimate_job(filepath, data)
         })
         
     except Exception as e:
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ajuste de arcos (G2/G3) para polilíneas muestreadas
+Reemplaza tramos de puntos que caen sobre un arco circular por un único movimiento de arco
+"""
+
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+# Tipos de movimiento de corte producidos por el ajustador
+MOVE_LINE = 1      # G1
+MOVE_ARC_CW = 2    # G2 (sentido horario)
+MOVE_ARC_CCW = 3   # G3 (sentido antihorario)
+
+
+class ArcFitter:
+    """Ajustador de arcos circulares sobre polilíneas (SVG, contornos de imagen, texto)"""
+
+    def __init__(self, tolerance: float = 0.01, min_points: int = 4,
+                 max_radius: float = 1000.0, max_sweep_deg: float = 350.0):
+        """
+        Inicializar ajustador de arcos
+
+        Args:
+            tolerance: Desviación radial máxima permitida en mm
+            min_points: Número mínimo de puntos que debe cubrir un arco
+            max_radius: Radio máximo en mm (radios mayores se tratan como rectas)
+            max_sweep_deg: Barrido angular máximo de un arco en grados
+        """
+        self.tolerance = tolerance
+        self.min_points = max(3, int(min_points))
+        self.max_radius = max_radius
+        self.max_sweep = np.radians(max_sweep_deg)
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Reiniciar contadores de compresión"""
+        self.input_moves = 0
+        self.output_moves = 0
+        self.arcs = 0
+
+    def get_stats(self) -> Dict:
+        """
+        Obtener estadísticas acumuladas del ajuste
+
+        Returns:
+            Diccionario con movimientos de entrada/salida y ratio de compresión
+        """
+        ratio = self.input_moves / self.output_moves if self.output_moves else 1.0
+        return {
+            'input_moves': self.input_moves,
+            'output_moves': self.output_moves,
+            'arcs': self.arcs,
+            'compression_ratio': round(ratio, 3)
+        }
+
+    def _circle_through(self, p0: np.ndarray, p1: np.ndarray, p2: np.ndarray) -> Optional[Tuple[np.ndarray, float]]:
+        """Calcular centro y radio del círculo que pasa por tres puntos"""
+        ax, ay = p0
+        bx, by = p1
+        cx, cy = p2
+        d = 2.0 * (ax * (by - cy) + bx * (cy - ay) + cx * (ay - by))
+        if abs(d) < 1e-12:
+            return None
+        a2 = ax * ax + ay * ay
+        b2 = bx * bx + by * by
+        c2 = cx * cx + cy * cy
+        ux = (a2 * (by - cy) + b2 * (cy - ay) + c2 * (ay - by)) / d
+        uy = (a2 * (cx - bx) + b2 * (ax - cx) + c2 * (bx - ax)) / d
+        center = np.array([ux, uy])
+        return center, float(np.hypot(ax - ux, ay - uy))
+
+    def _fit_run(self, points: np.ndarray, start: int, end: int):
+        """
+        Verificar si los puntos start..end caen sobre un arco dentro de la tolerancia
+
+        Returns:
+            (centro, sentido) si el tramo es un arco válido, None en caso contrario
+        """
+        run = points[start:end + 1]
+        # Círculo por los extremos y el punto medio: el centro queda sobre la
+        # mediatriz de la cuerda, así el radio inicial y final coinciden exactamente
+        circle = self._circle_through(run[0], run[len(run) // 2], run[-1])
+        if circle is None:
+            return None
+        center, radius = circle
+        if radius > self.max_radius or radius < self.tolerance:
+            return None
+
+        rel = run - center
+        # Desviación radial de los vértices
+        if np.max(np.abs(np.hypot(rel[:, 0], rel[:, 1]) - radius)) > self.tolerance:
+            return None
+
+        # Desviación de las cuerdas (sagita) respecto al arco
+        chords = np.hypot(*np.diff(run, axis=0).T)
+        half = np.minimum(chords / 2.0, radius)
+        if np.max(radius - np.sqrt(radius * radius - half * half)) > self.tolerance:
+            return None
+
+        # Progresión angular monótona en un solo sentido
+        cross = rel[:-1, 0] * rel[1:, 1] - rel[:-1, 1] * rel[1:, 0]
+        dot = rel[:-1, 0] * rel[1:, 0] + rel[:-1, 1] * rel[1:, 1]
+        steps = np.arctan2(cross, dot)
+        if np.all(steps > 0):
+            direction = MOVE_ARC_CCW
+        elif np.all(steps < 0):
+            direction = MOVE_ARC_CW
+        else:
+            return None
+        if abs(np.sum(steps)) > self.max_sweep:
+            return None
+
+        return center, direction
+
+    def fit(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Ajustar arcos sobre una polilínea
+
+        Args:
+            points: Array (n, 2) de puntos; el primero es la posición inicial
+
+        Returns:
+            Tupla (tipos, destinos, centros_relativos):
+            - tipos: array (m,) con MOVE_LINE / MOVE_ARC_CW / MOVE_ARC_CCW
+            - destinos: array (m, 2) con el punto final de cada movimiento
+            - centros_relativos: array (m, 2) con I/J (centro respecto al inicio del movimiento)
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        n = len(points)
+        types = []
+        targets = []
+        offsets = []
+
+        i = 0
+        while i < n - 1:
+            first = i + self.min_points - 1
+            fitted = self._fit_run(points, i, first) if first < n else None
+            if fitted is None:
+                types.append(MOVE_LINE)
+                targets.append(points[i + 1])
+                offsets.append((0.0, 0.0))
+                i += 1
+                continue
+
+            # Búsqueda exponencial seguida de búsqueda binaria del tramo más largo
+            good, good_fit = first, fitted
+            step = 1
+            bad = None
+            while True:
+                probe = good + step
+                if probe >= n:
+                    probe = n - 1
+                    if probe == good:
+                        break
+                probe_fit = self._fit_run(points, i, probe)
+                if probe_fit is None:
+                    bad = probe
+                    break
+                good, good_fit = probe, probe_fit
+                if probe == n - 1:
+                    break
+                step *= 2
+            if bad is not None:
+                lo, hi = good, bad
+                while hi - lo > 1:
+                    mid = (lo + hi) // 2
+                    mid_fit = self._fit_run(points, i, mid)
+                    if mid_fit is None:
+                        hi = mid
+                    else:
+                        lo, good_fit = mid, mid_fit
+                good = lo
+
+            center, direction = good_fit
+            types.append(direction)
+            targets.append(points[good])
+            offsets.append(tuple(center - points[i]))
+            self.arcs += 1
+            i = good
+
+        self.input_moves += max(0, n - 1)
+        self.output_moves += len(types)
+
+        return (np.array(types, dtype=np.int8),
+                np.array(targets, dtype=np.float64).reshape(-1, 2),
+                np.array(offsets, dtype=np.float64).reshape(-1, 2))
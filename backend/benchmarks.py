@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks del backend
+Mide tiempo y memoria de las etapas costosas con documentos sintéticos del tamaño de
+las exportaciones grandes de FreeCAD/Inkscape
+
+Uso:
+    python benchmarks.py extract --elements 100000
+    python benchmarks.py naming --elements 100000
+    python benchmarks.py flatten --segments 20000
+    python benchmarks.py pool --elements 20000 --workers 1 2 4 8
+    python benchmarks.py numbers --megabytes 4
+"""
+
+import argparse
+import gc
+import os
+import random
+import re
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from typing import Callable, Dict, List, Tuple
+from svg_processor import SVGProcessor
+from svg_path import SVGPath
+from svg_pool import FlattenPool
+from svg_numbers import NUMBER_RE, parse_points, split_number_lists
+
+
+def synthetic_svg(path: str, elements: int, per_group: int = 50, seed: int = 0) -> int:
+    """
+    Escribir un SVG sintético al estilo de una exportación de FreeCAD
+
+    Grupos con <title> y transform, paths con ids técnicos y <title> propio, y
+    algunos círculos y rectángulos.
+
+    Args:
+        path: Ruta del archivo a crear
+        elements: Número de formas
+        per_group: Formas por grupo
+        seed: Semilla del generador aleatorio
+
+    Returns:
+        Tamaño del archivo en bytes
+    """
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<svg xmlns="http://www.w3.org/2000/svg" width="500mm" height="500mm" viewBox="0 0 500 500">\n')
+        for start in range(0, elements, per_group):
+            group = start // per_group
+            f.write(f'<g id="Part__Feature{group:05d}" transform="translate({rng.uniform(0, 400):.3f},'
+                    f'{rng.uniform(0, 400):.3f})">\n<title>b\'Pieza{group}\'</title>\n')
+            for i in range(start, min(start + per_group, elements)):
+                x, y = rng.uniform(0, 90), rng.uniform(0, 90)
+                kind = i % 10
+                if kind == 0:
+                    f.write(f'<circle id="Part__Circle{i}" cx="{x:.3f}" cy="{y:.3f}" r="{rng.uniform(1, 5):.3f}"/>\n')
+                elif kind == 1:
+                    f.write(f'<rect id="Part__Rect{i}" x="{x:.3f}" y="{y:.3f}" width="8" height="5"/>\n')
+                else:
+                    segments = ' '.join(f'C {x + rng.uniform(-9, 9):.4f},{y + rng.uniform(-9, 9):.4f} '
+                                        f'{x + rng.uniform(-9, 9):.4f},{y + rng.uniform(-9, 9):.4f} '
+                                        f'{x + rng.uniform(-9, 9):.4f},{y + rng.uniform(-9, 9):.4f}'
+                                        for _ in range(6))
+                    f.write(f'<path id="Part__Feature{i}_w0" d="M {x:.4f},{y:.4f} {segments} Z" '
+                            f'style="stroke:#000000;fill:none"><title>b\'Part__Feature{i}\'</title></path>\n')
+            f.write('</g>\n')
+        f.write('</svg>\n')
+    return os.path.getsize(path)
+
+
+def synthetic_deep_svg(path: str, elements: int, depth: int = 40) -> int:
+    """
+    Escribir un SVG sintético con grupos anidados y formas sin nombre
+
+    Una cadena de grupos con ids técnicos de profundidad depth (como los cuerpos de
+    FreeCAD) reparte las formas entre sus niveles; ni las formas ni los grupos tienen
+    nombres naturales, así que todas comparten los nombres base 'trayectoria' y
+    'circunferencia'.
+
+    Args:
+        path: Ruta del archivo a crear
+        elements: Número de formas
+        depth: Niveles de grupos anidados
+
+    Returns:
+        Tamaño del archivo en bytes
+    """
+    per_level = max(1, elements // depth)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 500 500">\n')
+        written = 0
+        for level in range(depth):
+            f.write(f'<g id="Part__Body{level:03d}">\n')
+            count = per_level if level < depth - 1 else elements - written
+            for i in range(count):
+                x = (written + i) % 400
+                if i % 5 == 0:
+                    f.write(f'<circle cx="{x}" cy="{level}" r="2"/>\n')
+                else:
+                    f.write(f'<path d="M {x},{level} L {x + 3},{level + 4} Z"/>\n')
+            written += count
+        f.write('</g>\n' * depth)
+        f.write('</svg>\n')
+    return os.path.getsize(path)
+
+
+def synthetic_path(segments: int, seed: int = 0) -> str:
+    """
+    Atributo d sintético con curvas cúbicas, cuadráticas, arcos y rectas relativos
+
+    Args:
+        segments: Número de segmentos
+        seed: Semilla del generador aleatorio
+
+    Returns:
+        Atributo d
+    """
+    rng = random.Random(seed)
+    parts = ['M 0,0']
+    for i in range(segments):
+        kind = i % 8
+        if kind < 4:
+            parts.append('c ' + ' '.join(f'{rng.uniform(-9, 9):.4f}' for _ in range(6)))
+        elif kind < 6:
+            parts.append('q ' + ' '.join(f'{rng.uniform(-9, 9):.4f}' for _ in range(4)))
+        elif kind == 6:
+            radius = rng.uniform(5, 10)
+            parts.append(f'a {radius:.3f} {radius * rng.choice((1, 0.5)):.3f} {rng.uniform(0, 90):.1f} '
+                         f'0 {rng.randint(0, 1)} {rng.uniform(-9, 9):.4f} {rng.uniform(-9, 9):.4f}')
+        else:
+            parts.append(f'l {rng.uniform(-9, 9):.4f} {rng.uniform(-9, 9):.4f}')
+    return ' '.join(parts)
+
+
+def reference_flatten(path, tolerance: float) -> np.ndarray:
+    """
+    Aplanado adaptativo de referencia con svgpathtools, segmento a segmento
+
+    Mismo criterio que SVGPath.flatten (subdivisión inicial, desviación del punto
+    medio respecto a la cuerda, profundidad 16) evaluando punto a punto con
+    svgpathtools.
+
+    Args:
+        path: Path de svgpathtools
+        tolerance: Tolerancia cordal
+
+    Returns:
+        Array complejo de puntos
+    """
+    from svgpathtools import Arc, Line
+
+    def evaluate(segment, t):
+        return np.array([segment.point(float(value)) for value in t], dtype=complex)
+
+    chunks = []
+    current = None
+    for segment in path:
+        if current is None or abs(segment.start - current) > 1e-12:
+            chunks.append(np.array([segment.start]))
+        if isinstance(segment, Line):
+            chunks.append(np.array([segment.end]))
+        else:
+            initial = max(4, int(np.ceil(abs(segment.delta) / 45.0))) if isinstance(segment, Arc) else 4
+            done = [np.linspace(0.0, 1.0, initial + 1)]
+            lo, hi = done[0][:-1], done[0][1:]
+            for _ in range(16):
+                if lo.size == 0:
+                    break
+                mid = 0.5 * (lo + hi)
+                p_lo, p_hi, p_mid = evaluate(segment, lo), evaluate(segment, hi), evaluate(segment, mid)
+                chord = p_hi - p_lo
+                chord_len = np.abs(chord)
+                deviation = np.where(chord_len > 0, np.abs((chord.conj() * (p_mid - p_lo)).imag)
+                                     / np.where(chord_len > 0, chord_len, 1.0), np.abs(p_mid - p_lo))
+                split = deviation > tolerance
+                if not np.any(split):
+                    break
+                done.append(mid[split])
+                lo, hi = np.concatenate([lo[split], mid[split]]), np.concatenate([mid[split], hi[split]])
+            chunks.append(evaluate(segment, np.unique(np.concatenate(done)))[1:])
+        current = segment.end
+    return np.concatenate(chunks)
+
+
+def measure(func: Callable[[], object]) -> Tuple[object, Dict]:
+    """
+    Ejecutar una función midiendo tiempo y memoria con tracemalloc
+
+    La función se ejecuta dos veces: una para el tiempo y otra, con tracemalloc
+    activo (que la ralentiza), para la memoria.
+
+    Args:
+        func: Función sin argumentos
+
+    Returns:
+        Tupla (resultado, {'seconds', 'peak_mb', 'retained_mb'}); retained_mb es la
+        memoria que sigue ocupando el resultado
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {
+        'seconds': round(seconds, 3),
+        'peak_mb': round(peak / 2 ** 20, 1),
+        'retained_mb': round(retained / 2 ** 20, 1)
+    }
+
+
+def bench_extract(elements: int) -> None:
+    """Comparar extract_elements (árbol completo) con extract_document (iterparse)"""
+    processor = SVGProcessor()
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'bench.svg')
+        size = synthetic_svg(path, elements)
+        print(f"SVG sintético: {elements} formas, {size / 2 ** 20:.1f} MB")
+
+        result, dom = measure(lambda: processor.extract_elements(path))
+        count = len(result)
+        del result
+        result, stream = measure(lambda: processor.extract_document(path)['elements'])
+        assert len(result) == count
+        del result
+
+    print(f"{'extractor':<20}{'tiempo (s)':>12}{'pico (MB)':>12}{'retenido (MB)':>15}")
+    for name, stats in (('extract_elements', dom), ('extract_document', stream)):
+        print(f"{name:<20}{stats['seconds']:>12}{stats['peak_mb']:>12}{stats['retained_mb']:>15}")
+
+
+def bench_naming(elements: int) -> None:
+    """Escalado de la asignación de nombres con tamaños crecientes (tiempo por forma)"""
+    processor = SVGProcessor()
+    sizes = [elements // 8, elements // 4, elements // 2, elements]
+    print(f"{'formas':>10}{'extract_elements (s)':>22}{'us/forma':>10}{'extract_document (s)':>22}{'us/forma':>10}")
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'naming.svg')
+        for size in sizes:
+            synthetic_deep_svg(path, size)
+            row = f"{size:>10}"
+            for extract in (processor.extract_elements, lambda p: processor.extract_document(p)['elements']):
+                gc.collect()
+                start = time.perf_counter()
+                result = extract(path)
+                seconds = time.perf_counter() - start
+                assert len(result) == size
+                del result
+                row += f"{seconds:>22.3f}{seconds / size * 1e6:>10.1f}"
+            print(row)
+
+
+def bench_flatten(segments: int, tolerance: float = 0.01, samples: int = 200) -> None:
+    """Comparar SVGPath con svgpathtools (referencia) en parseo, aplanado adaptativo y muestreo"""
+    from svgpathtools import parse_path
+    path_d = synthetic_path(segments)
+    print(f"Path sintético: {segments} segmentos, tolerancia {tolerance}")
+    print(f"{'operación':<22}{'svgpathtools (s)':>18}{'SVGPath (s)':>14}{'aceleración':>13}{'desviación máx.':>17}")
+
+    def timed(func, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+        return result, best
+
+    def row(name, reference, native, compare=True):
+        expected, reference_seconds = timed(reference, 1)
+        result, native_seconds = timed(native, 3)
+        error = f"{float(np.max(np.abs(result - expected))):>17.2e}" if compare else f"{'-':>17}"
+        print(f"{name:<22}{reference_seconds:>18.3f}{native_seconds:>14.4f}"
+              f"{reference_seconds / native_seconds:>12.0f}x{error}")
+
+    reference_path = parse_path(path_d)
+    native_path = SVGPath.parse(path_d)
+
+    def native_flatten():
+        points, _ = native_path.flatten(tolerance)
+        return points[:, 0] + 1j * points[:, 1]
+
+    row('parseo', lambda: parse_path(path_d), lambda: SVGPath.parse(path_d), compare=False)
+    row('aplanado adaptativo', lambda: reference_flatten(reference_path, tolerance), native_flatten)
+    # Incluye el cálculo de longitudes de la primera llamada a point() de svgpathtools
+    row(f'muestreo ({samples} pts)',
+        lambda: np.array([reference_path.point(i / samples) for i in range(samples + 1)]),
+        lambda: native_path.sample(samples))
+
+
+def bench_pool(elements: int, workers: List[int], tolerance: float = 0.02) -> None:
+    """Escalado del aplanado de un documento (elements_to_geometry) con el número de procesos"""
+    processor = SVGProcessor()
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'pool.svg')
+        synthetic_svg(path, elements)
+        document = processor.extract_document(path)['elements']
+    print(f"SVG sintético: {elements} formas, tolerancia {tolerance}, {os.cpu_count()} núcleos")
+    print(f"{'procesos':>10}{'arranque (s)':>14}{'aplanado (s)':>14}{'aceleración':>13}{'idéntico':>10}")
+
+    start = time.perf_counter()
+    expected = processor.elements_to_geometry(document, tolerance=tolerance)
+    serial = time.perf_counter() - start
+    print(f"{'serie':>10}{'-':>14}{serial:>14.3f}{1:>12.1f}x{'-':>10}")
+    for count in workers:
+        pool = FlattenPool(workers=count, min_elements=1)
+        try:
+            # La primera llamada arranca los procesos e importa numpy en cada uno
+            start = time.perf_counter()
+            pool.map('flatten_element', [('M 0,0 L 1,1', tolerance, True, True)] * count)
+            startup = time.perf_counter() - start
+            start = time.perf_counter()
+            result = processor.elements_to_geometry(document, tolerance=tolerance, pool=pool)
+            seconds = time.perf_counter() - start
+        finally:
+            pool.shutdown()
+        same = all(np.array_equal(a, b) and np.array_equal(c, d) for (a, c), (b, d) in zip(result, expected))
+        print(f"{count:>10}{startup:>14.3f}{seconds:>14.3f}{serial / seconds:>12.1f}x{str(same):>10}")
+
+
+def bench_numbers(megabytes: float) -> None:
+    """Comparar la lectura número a número (regex + float) con svg_numbers en atributos grandes"""
+    path_d = synthetic_path(max(1, int(megabytes * 2 ** 20 / 38)))
+    # Forma minificada (svgo): sin espacios antes de signos ni ceros iniciales ("1.5.5-2")
+    compact = re.sub(r'(?<![0-9.])0\.', '.', path_d)
+    compact = re.sub(r'(\.[0-9]+) (?=\.)', r'\1', re.sub(r'(?<=[0-9]) (?=-)', '', compact))
+    rng = np.random.default_rng(0)
+    points = ' '.join(f"{x:.3f},{y:.3f}" for x, y in rng.uniform(-500, 500, (int(megabytes * 2 ** 20 / 18), 2)))
+    print(f"{'atributo':<14}{'MB':>6}{'números':>10}{'regex (s)':>12}{'svg_numbers (s)':>17}{'aceleración':>13}{'idéntico':>10}")
+
+    def timed(func, repeat=3):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+        return result, best
+
+    commands = re.compile(r'[MmZzLlHhVvCcSsQqTtAa]')
+    for name, text in (('d', path_d), ('d compacto', compact)):
+        chunks = commands.split(text)[1:]
+        expected, regex = timed(lambda: [[float(v) for v in NUMBER_RE.findall(c)] for c in chunks])
+        result, bulk = timed(lambda: split_number_lists(chunks))
+        count = sum(len(values) for values in result)
+        print(f"{name:<14}{len(text) / 2 ** 20:>6.1f}{count:>10}{regex:>12.3f}{bulk:>17.3f}"
+              f"{regex / bulk:>12.1f}x{str(result == expected):>10}")
+    expected, regex = timed(lambda: np.array([float(v) for v in NUMBER_RE.findall(points)]).reshape(-1, 2))
+    result, bulk = timed(lambda: parse_points(points))
+    print(f"{'points':<14}{len(points) / 2 ** 20:>6.1f}{result.size:>10}{regex:>12.3f}{bulk:>17.3f}"
+          f"{regex / bulk:>12.1f}x{str(np.array_equal(result, expected)):>10}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmarks del backend')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+    extract = subparsers.add_parser('extract', help='Memoria y tiempo de la extracción de elementos SVG')
+    extract.add_argument('--elements', type=int, default=100000, help='Número de formas del SVG sintético')
+    naming = subparsers.add_parser('naming', help='Escalado de la asignación de nombres de elementos SVG')
+    naming.add_argument('--elements', type=int, default=100000, help='Número de formas del SVG sintético más grande')
+    flatten = subparsers.add_parser('flatten', help='Aplanado de paths SVG frente a svgpathtools')
+    flatten.add_argument('--segments', type=int, default=20000, help='Segmentos del path sintético')
+    flatten.add_argument('--tolerance', type=float, default=0.01, help='Tolerancia cordal')
+    flatten.add_argument('--samples', type=int, default=200, help='Puntos del muestreo uniforme')
+    pool = subparsers.add_parser('pool', help='Escalado del aplanado de SVG con el número de procesos')
+    pool.add_argument('--elements', type=int, default=20000, help='Número de formas del SVG sintético')
+    pool.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help='Números de procesos a medir')
+    numbers = subparsers.add_parser('numbers', help='Lectura de números de atributos d y points grandes')
+    numbers.add_argument('--megabytes', type=float, default=4, help='Tamaño aproximado de cada atributo')
+    args = parser.parse_args()
+
+    if args.benchmark == 'extract':
+        bench_extract(args.elements)
+    elif args.benchmark == 'naming':
+        bench_naming(args.elements)
+    elif args.benchmark == 'flatten':
+        bench_flatten(args.segments, args.tolerance, args.samples)
+    elif args.benchmark == 'pool':
+        bench_pool(args.elements, args.workers)
+    elif args.benchmark == 'numbers':
+        bench_numbers(args.megabytes)
+
+
+if __name__ == '__main__':
+    main()
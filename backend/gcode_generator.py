@@ -14,20 +14,46 @@ from matplotlib.path import Path
 from PIL import Image, ImageDraw, ImageFont
 import cv2
 from scipy import ndimage
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Dict
 import tempfile
+from arc_fitter import ArcFitter, MOVE_LINE, MOVE_ARC_CW
+from machine_profile import MachineProfile, LASER_POWER_MAX_VALUE
+from path_simplifier import PathSimplifier
+from toolpath_clipper import ToolpathClipper
+from segment_dedup import SegmentDeduplicator
+from toolpath import Toolpath, arc_centers
+from step_repeat import StepRepeat
+from motion_simulator import MotionSimulator
 
 class LaserGCodeGenerator:
     """Generador profesional de G-code para láser"""
     
     # Rango de potencia del controlador láser (0-1000 es común en GRBL y controladores modernos)
-    LASER_POWER_MAX_VALUE = 1000  # Valor máximo del comando M3 S (100% = 1000)
+    LASER_POWER_MAX_VALUE = LASER_POWER_MAX_VALUE  # Valor máximo del comando M3 S (100% = 1000)
+    
+    # Dialectos soportados: GRBL no tiene bucles; LinuxCNC soporta O-word repeat
+    SUPPORTED_DIALECTS = ('grbl', 'linuxcnc')
+    
+    # Modos de emisión: 'm3' enciende/apaga el láser en cada path; 'm4' activa M4
+    # (potencia dinámica, GRBL $32=1) una vez por capa y lleva la potencia en el G1
+    SUPPORTED_EMISSION_MODES = ('m3', 'm4')
+    
+    # Orden de pasadas: 'group' repite cada grupo del generador (texto: todos los
+    # contornos por capa; SVG: cada elemento), 'layer' (layer-major), 'path'
+    # (path-major) y 'hybrid' (bloques con un tiempo mínimo de enfriamiento)
+    SUPPORTED_PASS_ORDERS = Toolpath.PASS_ORDERS
     
     def __init__(self, table_width: float = 50.0, table_height: float = 50.0, 
                  font_size: float = 8.0, line_height: float = 0.7, 
                  feed_rate: float = 60.0, font_name: str = "Arial", 
                  laser_power_max: float = 100.0, num_layers: int = 30, 
-                 focus_height: float = 0.0):
+                 focus_height: float = 0.0, arc_tolerance: float = 0.0,
+                 gcode_dialect: str = "grbl", emission_mode: str = "m3",
+                 simplify_tolerance: float = 0.0,
+                 machine_profile: Optional[MachineProfile] = None,
+                 clip_to_table: bool = True, pass_order: str = "group",
+                 cooling_interval: float = 0.0, step_repeat: Optional[StepRepeat] = None,
+                 dedupe_tolerance: float = 0.0):
         """
         Inicializar generador de G-code
         
@@ -41,7 +67,24 @@ class LaserGCodeGenerator:
             laser_power_max: Potencia máxima del láser (%)
             num_layers: Número de capas/pasadas
             focus_height: Altura de enfoque en mm
+            arc_tolerance: Tolerancia en mm para ajustar arcos G2/G3 (0 = desactivado)
+            gcode_dialect: Dialecto del controlador ('grbl' o 'linuxcnc')
+            emission_mode: Modo de emisión del láser ('m3' o 'm4')
+            simplify_tolerance: Tolerancia en mm para simplificar trayectorias (0 = desactivado)
+            machine_profile: Perfil cinemático de la máquina (opcional)
+            clip_to_table: Recortar las trayectorias al área de la tabla
+            pass_order: Orden de ejecución de las pasadas ('group', 'layer', 'path' o 'hybrid')
+            cooling_interval: Tiempo mínimo en segundos entre pasadas sobre un mismo path ('hybrid')
+            step_repeat: Repetición en matriz de la pieza (solo SVG e imagen; None = una copia)
+            dedupe_tolerance: Tolerancia en mm para eliminar segmentos repetidos o solapados (0 = desactivado)
         """
+        if gcode_dialect not in self.SUPPORTED_DIALECTS:
+            raise ValueError(f"Dialecto de G-code no soportado: {gcode_dialect}")
+        if emission_mode not in self.SUPPORTED_EMISSION_MODES:
+            raise ValueError(f"Modo de emisión no soportado: {emission_mode}")
+        if pass_order not in self.SUPPORTED_PASS_ORDERS:
+            raise ValueError(f"Orden de pasadas no soportado: {pass_order}")
+        
         self.table_width = table_width
         self.table_height = table_height
         self.font_size = font_size
@@ -51,6 +94,23 @@ class LaserGCodeGenerator:
         self.laser_power_max = laser_power_max
         self.num_layers = num_layers
         self.focus_height = focus_height
+        self.arc_fitter = ArcFitter(tolerance=arc_tolerance) if arc_tolerance > 0 else None
+        self.gcode_dialect = gcode_dialect
+        self.emission_mode = emission_mode
+        self.machine_profile = machine_profile or MachineProfile()
+        self.path_simplifier = (PathSimplifier(simplify_tolerance, self.machine_profile)
+                                if simplify_tolerance > 0 else None)
+        # Cuantización a la resolución de pasos de la máquina
+        self.quantize = bool(self.machine_profile.steps_per_mm)
+        self.coord_decimals = self.machine_profile.output_decimals()
+        self.zero_moves_removed = 0
+        self.clipper = ToolpathClipper(table_width, table_height) if clip_to_table else None
+        self.deduplicator = SegmentDeduplicator(dedupe_tolerance) if dedupe_tolerance > 0 else None
+        self.pass_order = pass_order
+        self.cooling_interval = cooling_interval
+        self.step_repeat = step_repeat
+        self._next_loop_id = 100  # Número del próximo bucle O-word (LinuxCNC)
+        self.last_toolpath = None  # Último toolpath emitido (IR ya procesado)
     
     def _convert_power_percent_to_value(self, power_percent: float) -> int:
         """
@@ -70,6 +130,659 @@ class LaserGCodeGenerator:
         
         return power_value
     
+    def get_arc_stats(self) -> Optional[Dict]:
+        """
+        Obtener estadísticas de compresión del ajuste de arcos
+        
+        Returns:
+            Diccionario con ratio de compresión o None si el ajuste está desactivado
+        """
+        if self.arc_fitter is None:
+            return None
+        return self.arc_fitter.get_stats()
+    
+    def get_simplify_stats(self) -> Optional[Dict]:
+        """
+        Obtener estadísticas de la simplificación de trayectorias
+        
+        Returns:
+            Diccionario con segmentos eliminados o None si la simplificación está desactivada
+        """
+        if self.path_simplifier is None:
+            return None
+        return self.path_simplifier.get_stats()
+    
+    def get_quantize_stats(self) -> Optional[Dict]:
+        """
+        Obtener estadísticas de la cuantización de coordenadas
+        
+        Returns:
+            Diccionario con la resolución usada y los movimientos nulos eliminados,
+            o None si la cuantización está desactivada
+        """
+        if not self.quantize:
+            return None
+        return {
+            'steps_per_mm': self.machine_profile.steps_per_mm,
+            'decimals': self.coord_decimals,
+            'zero_moves_removed': self.zero_moves_removed
+        }
+    
+    def get_clip_stats(self) -> Optional[Dict]:
+        """
+        Obtener estadísticas del recorte al área de la tabla
+        
+        Returns:
+            Diccionario con la longitud recortada o None si el recorte está desactivado
+        """
+        if self.clipper is None:
+            return None
+        return self.clipper.get_stats()
+    
+    def get_dedupe_stats(self) -> Optional[Dict]:
+        """
+        Obtener estadísticas de la eliminación de segmentos repetidos
+        
+        Returns:
+            Diccionario con los segmentos eliminados y la longitud de corte ahorrada,
+            o None si la eliminación está desactivada
+        """
+        if self.deduplicator is None:
+            return None
+        return self.deduplicator.get_stats()
+    
+    def get_step_repeat_stats(self) -> Optional[Dict]:
+        """
+        Obtener estadísticas de la repetición en matriz
+        
+        Returns:
+            Diccionario con la matriz, el paso, el orden y las copias, o None si está desactivada
+        """
+        if self.step_repeat is None:
+            return None
+        return self.step_repeat.get_stats()
+    
+    def get_pass_order_stats(self) -> Optional[Dict]:
+        """
+        Estimar el último trabajo con cada orden de pasadas
+        
+        Returns:
+            Diccionario con el tiempo, el recorrido en vacío y el menor intervalo entre
+            pasadas sobre un mismo path de cada estrategia, y la más rápida que respeta
+            cooling_interval; None si ningún path tiene varias pasadas
+        """
+        toolpath = self.last_toolpath
+        if toolpath is None or not np.any(toolpath.group_passes > 1):
+            return None
+        style = self._toolpath_style(toolpath.meta.get('kind', 'svg'))
+        simulator = MotionSimulator(self.machine_profile)
+        strategies = {}
+        for order in self.SUPPORTED_PASS_ORDERS:
+            schedule = toolpath.schedule(order, self.cooling_interval)
+            moves = toolpath.to_moves(self.LASER_POWER_MAX_VALUE, self.emission_mode,
+                                      order=order, cooling_interval=self.cooling_interval)
+            estimate = simulator.estimate_moves(moves, self._schedule_dwell(toolpath, schedule, style))
+            reheat = toolpath.min_reheat_interval(schedule)
+            strategies[order] = {
+                'estimated_time_s': estimate['estimated_time_s'],
+                'travel_distance_mm': estimate['travel_distance_mm'],
+                'min_reheat_interval_s': round(reheat, 3) if reheat is not None else None,
+                'respects_cooling': reheat is None or reheat >= self.cooling_interval
+            }
+        allowed = [order for order, result in strategies.items() if result['respects_cooling']]
+        return {
+            'selected': self.pass_order,
+            'cooling_interval_s': self.cooling_interval,
+            'recommended': min(allowed, key=lambda order: strategies[order]['estimated_time_s']) if allowed else None,
+            'strategies': strategies
+        }
+    
+    def _xy(self, x: float, y: float) -> str:
+        """
+        Formatear las palabras X/Y de una posición con la precisión de la máquina
+        
+        Args:
+            x: Coordenada X en mm
+            y: Coordenada Y en mm
+            
+        Returns:
+            Texto "X... Y..." cuantizado a la resolución de pasos
+        """
+        x, y = self.machine_profile.quantize((x, y))
+        d = self.coord_decimals
+        return f"X{x:.{d}f} Y{y:.{d}f}"
+    
+    def _cut_moves_to_gcode(self, points: np.ndarray, feed: float, comment: str = "",
+                            power: Optional[int] = None, bulge: Optional[np.ndarray] = None) -> List[str]:
+        """
+        Convertir una polilínea de corte en movimientos G1 (o G2/G3 si hay ajuste de arcos)
+        
+        Los segmentos con bulge distinto de cero son arcos exactos (círculos, esquinas
+        redondeadas) y se emiten como G2/G3; los tramos rectos entre ellos pasan por el
+        ajuste de arcos si está activo.
+        
+        Args:
+            points: Array (n, 2) de puntos absolutos; el primero es la posición actual
+            feed: Velocidad de corte en mm/min
+            comment: Comentario opcional agregado a cada línea
+            power: Valor S agregado al primer movimiento (modo de emisión M4)
+            bulge: Bulge de cada vértice (ver Toolpath); None = solo rectas
+            
+        Returns:
+            Lista de líneas de G-code (sin incluir el punto inicial)
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        d = self.coord_decimals
+        
+        if bulge is not None and np.any(bulge[1:] != 0):
+            gcode_lines = []
+            arcs = np.flatnonzero(bulge != 0)
+            arcs = arcs[arcs > 0]
+            centers = arc_centers(points[arcs - 1], points[arcs], bulge[arcs]) - points[arcs - 1]
+            start = 0
+            for idx, (i, j) in zip(arcs, centers):
+                if idx - 1 > start:
+                    gcode_lines.extend(self._cut_moves_to_gcode(points[start:idx], feed, comment))
+                x, y = points[idx]
+                code = "G3" if bulge[idx] > 0 else "G2"
+                i, j = round(i, 4) + 0.0, round(j, 4) + 0.0  # Evitar "-0.0000"
+                gcode_lines.append(f"{code} X{x:.{d}f} Y{y:.{d}f} I{i:.4f} J{j:.4f} F{feed}{comment}")
+                start = idx
+            if start < len(points) - 1:
+                gcode_lines.extend(self._cut_moves_to_gcode(points[start:], feed, comment))
+        elif self.arc_fitter is None:
+            if len(points) < 2:
+                return []
+            # Plantilla repetida y formateada en una sola operación sobre todos los puntos
+            tail = f" F{feed}{comment}".replace('%', '%%')
+            template = f"G1 X%.{d}f Y%.{d}f{tail}\n"
+            gcode_lines = ((template * (len(points) - 1)) % tuple(points[1:].ravel().tolist())).split('\n')[:-1]
+        else:
+            gcode_lines = []
+            types, targets, centers = self.arc_fitter.fit(points)
+            for move, (x, y), (i, j) in zip(types, targets, centers):
+                if move == MOVE_LINE:
+                    gcode_lines.append(f"G1 X{x:.{d}f} Y{y:.{d}f} F{feed}{comment}")
+                else:
+                    code = "G2" if move == MOVE_ARC_CW else "G3"
+                    i, j = round(i, 4) + 0.0, round(j, 4) + 0.0  # Evitar "-0.0000"
+                    gcode_lines.append(f"{code} X{x:.{d}f} Y{y:.{d}f} I{i:.4f} J{j:.4f} F{feed}{comment}")
+        
+        if power is not None and gcode_lines:
+            # La palabra S viaja con el movimiento: sin sincronización del planificador
+            tail = f"F{feed}{comment}"
+            gcode_lines[0] = gcode_lines[0][:-len(tail)] + f"F{feed} S{power}{comment}"
+        return gcode_lines
+    
+    def _process_toolpath(self, toolpath: Toolpath) -> Toolpath:
+        """
+        Aplicar recorte, eliminación de segmentos repetidos, simplificación y
+        cuantización sobre el toolpath
+        
+        Args:
+            toolpath: Toolpath producido por un generador
+            
+        Returns:
+            Toolpath listo para emitir (también queda en self.last_toolpath)
+        """
+        if self.clipper is not None:
+            toolpath = toolpath.clip(self.clipper)
+        if self.deduplicator is not None:
+            toolpath = toolpath.deduplicate(self.deduplicator)
+        if self.path_simplifier is not None:
+            toolpath = toolpath.simplify(self.path_simplifier)
+        if self.quantize:
+            toolpath, removed = toolpath.quantize(self.machine_profile)
+            self.zero_moves_removed += removed
+        self.last_toolpath = toolpath
+        return toolpath
+    
+    def _emit_toolpath(self, toolpath: Toolpath, style: Dict) -> List[str]:
+        """
+        Emitir el G-code de un toolpath ya procesado
+        
+        Cada generador conserva sus comentarios y su secuencia de encendido mediante
+        un estilo de plantillas; el recorrido de capas, grupos, pasadas y paths es común.
+        Las plantillas reciben {xy}, {feed}, {value} (valor S), {power} (%) y {layer}.
+        
+        Args:
+            toolpath: Toolpath procesado (ver _process_toolpath)
+            style: Diccionario de plantillas:
+                - 'rapid' / 'first_rapid': G0 hacia el inicio de cada path / del primero
+                - 'skip_first_rapid': no mover al primer path (se asume ya en posición)
+                - 'skip_rapid_within': omitir el G0 si ya se está a esta distancia del inicio
+                - 'pre_rapid', 'laser_on', 'lead_in', 'close', 'laser_off': líneas por path
+                - 'cut_comment': comentario de cada movimiento de corte
+                - 'm4': llevar la potencia S en el primer movimiento de corte
+                - 'group_on' / 'group_off': líneas al inicio/final de cada pasada
+                - 'layer_on' / 'layer_off': líneas alrededor de una capa con cortes
+                - 'separator', 'pass_label', 'label_single': repetición de pasadas (un
+                  grupo con 'separator' propio, p. ej. de un trabajo combinado, usa el suyo)
+                - 'empty_group': comentario para un grupo sin paths (p. ej. recortado)
+              Los grupos con 'footer' propio lo emiten tras el bloque que contiene su
+              último path.
+            
+        Returns:
+            Lista de líneas de G-code
+        """
+        gcode_lines = []
+        use_m4 = style.get('m4', False)
+        skip_within = style.get('skip_rapid_within')
+        toolpath.pack()
+        points = toolpath.points
+        offsets = toolpath.offsets
+        values = [self._convert_power_percent_to_value(p) for p in toolpath.power]
+        first_path = True
+        position = None
+        group_separators = any('separator' in group for group in toolpath.groups)
+        # Último path de cada grupo con pie propio (trabajos combinados)
+        group_footers = {g: paths[-1] for g, paths in enumerate(toolpath.group_paths())
+                         if toolpath.groups[g].get('footer') and len(paths)}
+        
+        schedule = toolpath.schedule(self.pass_order, self.cooling_interval)
+        for layer, items in zip(toolpath.layers, schedule):
+            layer_fields = {'layer': layer['name']}
+            has_cuts = any(item[0] == 'block' and item[2] > 0 and
+                           np.any(offsets[item[1] + 1] - offsets[item[1]] > 1) for item in items)
+            gcode_lines.extend(layer['header'])
+            if has_cuts and 'layer_on' in style:
+                gcode_lines.append(style['layer_on'].format(**layer_fields))
+            
+            for item in items:
+                if item[0] == 'empty':
+                    gcode_lines.extend(toolpath.groups[item[1]]['header'])
+                    if 'empty_group' in style:
+                        gcode_lines.append(style['empty_group'])
+                    continue
+                
+                _, paths, passes, whole_group = item
+                if whole_group is not None:
+                    # Bloque de un grupo completo: encabezado fuera de la repetición
+                    gcode_lines.extend(toolpath.groups[whole_group]['header'])
+                
+                # Formatear el bloque de una pasada una sola vez
+                block = list(style.get('group_on', []))
+                last_group = whole_group
+                for k in paths:
+                    if toolpath.path_group[k] != last_group:
+                        last_group = toolpath.path_group[k]
+                        block.extend(toolpath.groups[last_group]['header'])
+                    path = points[offsets[k]:offsets[k + 1]]
+                    if len(path) < 2:
+                        continue
+                    feed = float(toolpath.feed[k])
+                    fields = dict(layer_fields, xy=self._xy(*path[0]), feed=feed,
+                                  value=values[k], power=float(toolpath.power[k]))
+                    
+                    if first_path and style.get('skip_first_rapid'):
+                        pass
+                    elif (skip_within is not None and position is not None and
+                          np.all(np.abs(position - path[0]) <= skip_within)):
+                        pass
+                    else:
+                        if 'pre_rapid' in style:
+                            block.append(style['pre_rapid'])
+                        rapid = style['first_rapid'] if first_path and 'first_rapid' in style else style['rapid']
+                        block.append(rapid.format(**fields))
+                    first_path = False
+                    
+                    if 'laser_on' in style:
+                        block.append(style['laser_on'].format(**fields))
+                    cut_power = values[k] if use_m4 else None
+                    if 'lead_in' in style:
+                        if self.quantize:
+                            # El G1 al mismo punto del G0 es un movimiento nulo
+                            self.zero_moves_removed += 1
+                        else:
+                            block.append(style['lead_in'].format(**fields))
+                            cut_power = None
+                    
+                    block.extend(self._cut_moves_to_gcode(path, feed, style.get('cut_comment', '').format(**fields),
+                                                          power=cut_power, bulge=toolpath.bulge[offsets[k]:offsets[k + 1]]))
+                    position = path[-1]
+                    if toolpath.closed[k] and 'close' in style:
+                        block.append(style['close'].format(**fields))
+                        position = path[0]
+                    if 'laser_off' in style:
+                        block.append(style['laser_off'])
+                block.extend(style.get('group_off', []))
+                
+                # Repetir el bloque según el número de pasadas
+                label = style.get('pass_label') if passes > 1 or style.get('label_single') else None
+                separator = (self._block_separator(toolpath, paths, style) if group_separators
+                             else style.get('separator', ''))
+                gcode_lines.extend(self._repeat_block(block, passes, separator, label))
+                # Pie de los grupos que terminan en este bloque, después de todas sus pasadas
+                for g in dict.fromkeys(toolpath.path_group[paths].tolist()) if group_footers else ():
+                    if g in group_footers and group_footers[g] in paths:
+                        gcode_lines.extend(toolpath.groups[g]['footer'])
+            
+            if has_cuts and 'layer_off' in style:
+                gcode_lines.append(style['layer_off'].format(**layer_fields))
+            gcode_lines.extend(layer['footer'])
+        
+        return gcode_lines
+    
+    def _emit_copies(self, toolpath: Toolpath, style: Dict) -> List[str]:
+        """
+        Emitir un toolpath procesado y, con step-and-repeat, todas sus copias
+        
+        El bloque de la pieza se emite una vez; las copias desplazan sus coordenadas
+        ya formateadas (ver StepRepeat.tile). self.last_toolpath pasa a contener todas
+        las copias para estimar, previsualizar o volver a emitir el trabajo.
+        
+        Args:
+            toolpath: Toolpath procesado (ver _process_toolpath)
+            style: Plantillas del generador (ver _emit_toolpath)
+            
+        Returns:
+            Lista de líneas de G-code
+        """
+        loop_start = self._next_loop_id
+        block = self._emit_toolpath(toolpath, style)
+        if self.step_repeat is None or not len(toolpath.points):
+            return block
+        
+        bbox = (*toolpath.points.min(axis=0), *toolpath.points.max(axis=0))
+        table = None
+        if self.clipper is not None:
+            table = (self.clipper.x_min, self.clipper.y_min, self.clipper.x_max, self.clipper.y_max)
+        offsets, cells = self.step_repeat.layout(bbox, table)
+        # Desplazamientos sobre la rejilla de pasos: las copias conservan la cuantización
+        offsets = np.round(self.machine_profile.quantize(offsets), self.coord_decimals) + 0.0
+        
+        loops = self._next_loop_id - loop_start
+        gcode_lines = self.step_repeat.tile(block, offsets, cells, self.coord_decimals, loops)
+        self._next_loop_id += loops * (len(offsets) - 1)
+        headers = [[StepRepeat.header(i, len(offsets), cell)] for i, cell in enumerate(cells)]
+        self.last_toolpath = toolpath.tile(offsets, headers)
+        return gcode_lines
+    
+    def _toolpath_style(self, kind: str) -> Dict:
+        """
+        Plantillas de emisión de cada generador (ver _emit_toolpath)
+        
+        Args:
+            kind: Tipo de generador ('text', 'image', 'cut', 'svg' o 'merge')
+            
+        Returns:
+            Diccionario de plantillas para el modo de emisión actual
+        """
+        use_m4 = self.emission_mode == 'm4'
+        if kind == 'text':
+            style = {
+                # Para el primer contorno, asumir que ya estamos en la posición correcta (home)
+                'skip_first_rapid': True,
+                'skip_rapid_within': 0.001,
+                'rapid': "G0 {xy}",
+                'separator': "G4 P1",
+            }
+            if use_m4:
+                # Modo láser dinámico una vez por capa; G0 no dispara con $32=1
+                style.update({'group_on': ["M4 S0"], 'group_off': ["M5"]})
+            else:
+                style.update({'laser_on': "M3 S{value}", 'laser_off': "M5"})
+        elif kind == 'image':
+            style = {
+                'first_rapid': "G0 {xy} ; Posicionar en primer punto",
+                'rapid': "G0 {xy} ; Posicionar",
+            }
+            if use_m4:
+                style.update({
+                    'layer_on': "M4 S0 ; Modo láser dinámico (M4) - Capa 1",
+                    'lead_in': "G1 {xy} F{feed} S{value} ; Iniciar grabado",
+                    'layer_off': "M5 ; Apagar láser",
+                })
+            else:
+                style.update({
+                    'laser_on': "M3 S{value} ; Encender láser - Capa 1",
+                    'lead_in': "G1 {xy} F{feed} ; Iniciar grabado",
+                    'laser_off': "M5 ; Apagar láser",
+                })
+        elif kind == 'cut':
+            style = {
+                'rapid': "G0 {xy} ; Posicionar en inicio",
+                'pass_label': "; Pasada {pass_num} de {count}",
+                'label_single': True,
+                'separator': "G4 P0.5 ; Pausa entre pasadas",
+                'empty_group': "; Corte fuera del área de la tabla: omitido",
+            }
+            if use_m4:
+                style.update({
+                    'layer_on': "M4 S0 ; Modo láser dinámico (M4)",
+                    'cut_comment': " ; Realizar corte - Potencia {power}%",
+                    'layer_off': "M5 ; Apagar láser",
+                })
+            else:
+                style.update({
+                    'laser_on': "M3 S{value} ; Encender láser - Potencia {power}%",
+                    'cut_comment': " ; Realizar corte",
+                    'laser_off': "M5 ; Apagar láser",
+                })
+        elif kind in ('svg', 'merge'):
+            # Los trabajos combinados usan la secuencia por elemento del SVG (con la
+            # pausa entre pasadas de cada trabajo de origen, ver generate_merged_gcode)
+            style = {
+                'cut_comment': " ; Corte con láser encendido",
+                'close': "G1 {xy} F{feed} ; Cerrar path",
+                'pass_label': "; Pasada {pass_num} de {count}",
+                'separator': "G4 P0.5 ; Pausa entre pasadas",
+                'empty_group': "; Elemento fuera del área de la tabla: omitido",
+            }
+            if use_m4:
+                # En modo láser el G0 no dispara: sin M3/M5 que vacíen el planificador
+                style.update({
+                    'layer_on': "M4 S0 ; Modo láser dinámico (M4) - {layer}",
+                    'rapid': "G0 {xy} ; Desplazamiento rápido (sin disparo en modo láser)",
+                    'layer_off': "M5 ; Apagar láser al terminar la capa {layer}",
+                })
+            else:
+                # Encender láser SOLO cuando vamos a cortar (G1) y apagarlo inmediatamente después
+                style.update({
+                    'pre_rapid': "M5 ; Asegurar láser apagado para desplazamiento",
+                    'rapid': "G0 {xy} ; Desplazamiento rápido (láser apagado)",
+                    'laser_on': "M3 S{value} ; Encender láser - {layer} ({power}% = {value})",
+                    'laser_off': "M5 ; Apagar láser después del corte",
+                })
+        else:
+            raise ValueError(f"Tipo de trabajo no soportado: {kind}")
+        style['m4'] = use_m4
+        return style
+    
+    def _record_job(self, kind: str, preamble: List[str], postamble: List[str]) -> None:
+        """
+        Guardar en el último toolpath los datos necesarios para volver a emitirlo
+        
+        Args:
+            kind: Tipo de generador (ver _toolpath_style)
+            preamble: Líneas emitidas antes de las trayectorias
+            postamble: Líneas emitidas después de las trayectorias
+        """
+        toolpath = self.last_toolpath
+        if toolpath is None:
+            return
+        schedule = toolpath.schedule(self.pass_order, self.cooling_interval)
+        if self.clipper is not None:
+            table = (self.clipper.x_max - self.clipper.x_min, self.clipper.y_max - self.clipper.y_min)
+        else:
+            table = (self.table_width, self.table_height)
+        toolpath.meta = {
+            'kind': kind,
+            'emission_mode': self.emission_mode,
+            'gcode_dialect': self.gcode_dialect,
+            'table_width': float(table[0]),
+            'table_height': float(table[1]),
+            'pass_order': self.pass_order,
+            'cooling_interval': self.cooling_interval,
+            'preamble': list(preamble),
+            'postamble': list(postamble),
+            'dwell_s': self._schedule_dwell(toolpath, schedule, self._toolpath_style(kind)),
+        }
+    
+    def _block_separator(self, toolpath: Toolpath, paths: np.ndarray, style: Dict) -> str:
+        """
+        Separador entre pasadas de un bloque de paths
+        
+        Los grupos de un trabajo combinado conservan la pausa de su trabajo de origen;
+        si un bloque reúne grupos con pausas distintas se usa la más larga.
+        
+        Args:
+            toolpath: Toolpath del trabajo
+            paths: Índices de los paths del bloque
+            style: Plantillas del generador (separador por defecto)
+            
+        Returns:
+            Línea emitida entre pasadas
+        """
+        default = style.get('separator', '')
+        separators = {toolpath.groups[g].get('separator', default) for g in np.unique(toolpath.path_group[paths])}
+        return max(separators, key=lambda line: (self._dwell_seconds([line]), line))
+    
+    def _schedule_dwell(self, toolpath: Toolpath, schedule: List, style: Dict) -> float:
+        """
+        Segundos de pausa G4 entre pasadas y entre capas de un orden de pasadas
+        
+        Args:
+            toolpath: Toolpath del trabajo
+            schedule: Resultado de Toolpath.schedule
+            style: Plantillas del generador (separador entre pasadas)
+            
+        Returns:
+            Tiempo total de pausa en segundos
+        """
+        separator = self._dwell_seconds([style.get('separator', '')])
+        group_separators = any('separator' in group for group in toolpath.groups)
+        total = 0.0
+        for items in schedule:
+            for item in items:
+                if item[0] != 'block' or item[2] < 2:
+                    continue
+                if group_separators:
+                    separator = self._dwell_seconds([self._block_separator(toolpath, item[1], style)])
+                total += separator * (item[2] - 1)
+        footers = self._dwell_seconds([line for layer in toolpath.layers for line in layer['footer']] +
+                                      [line for group in toolpath.groups for line in group.get('footer', [])])
+        return total + footers
+    
+    @staticmethod
+    def _dwell_seconds(lines: List[str]) -> float:
+        """Sumar los segundos de las pausas G4 P<s> de un conjunto de líneas"""
+        total = 0.0
+        for line in lines:
+            words = line.split(';', 1)[0].split()
+            if words[:1] == ['G4']:
+                total += sum(float(word[1:]) for word in words[1:] if word.startswith('P'))
+        return total
+    
+    def generate_gcode_from_toolpath(self, toolpath: Toolpath, power_scale: float = 1.0) -> List[str]:
+        """
+        Volver a emitir un trabajo guardado (ver JobFile) con las opciones de este generador
+        
+        Permite cambiar dialecto, modo de emisión, ajuste de arcos o cuantización sin
+        regenerar ni parsear el G-code original.
+        
+        Args:
+            toolpath: Toolpath con metadatos del trabajo (kind, preámbulo, postámbulo)
+            power_scale: Factor aplicado a la potencia de todos los paths
+            
+        Returns:
+            Lista de líneas de G-code
+        """
+        meta = toolpath.meta
+        kind = meta.get('kind', 'svg')
+        toolpath = toolpath.copy()
+        if power_scale != 1.0:
+            toolpath.power = np.clip(toolpath.power * power_scale, 0.0, 100.0)
+        
+        gcode_lines = list(meta.get('preamble', []))
+        gcode_lines.extend(self._emit_toolpath(self._process_toolpath(toolpath), self._toolpath_style(kind)))
+        gcode_lines.extend(meta.get('postamble', []))
+        self._record_job(kind, meta.get('preamble', []), meta.get('postamble', []))
+        return gcode_lines
+    
+    def generate_merged_gcode(self, toolpath: Toolpath, sources: List[str]) -> List[str]:
+        """
+        Generar un único programa desde trabajos combinados (ver JobMerger)
+        
+        Args:
+            toolpath: Toolpath combinado
+            sources: Nombres de los trabajos de origen
+            
+        Returns:
+            Lista de líneas de G-code
+        """
+        gcode_lines = [f"; G-code combinado de {len(sources)} trabajos"]
+        gcode_lines.extend(f"; - {name}" for name in sources)
+        gcode_lines.extend([
+            f"; Dimensiones de tabla: {self.table_width}x{self.table_height}mm",
+            "",
+            "G21 ; Unidades en milímetros",
+            "G90 ; Posicionamiento absoluto",
+            "M5 ; Asegurar que el láser esté apagado",
+            "G0 X0 Y0 ; Ir al HOME (origen)"
+        ])
+        
+        # Cada grupo repite sus pasadas con la pausa de su trabajo de origen
+        for group in toolpath.groups:
+            if group.get('separator') is None:
+                group['separator'] = self._toolpath_style(group.get('kind', 'svg')).get('separator', '')
+        
+        preamble = list(gcode_lines)
+        gcode_lines.extend(self._emit_toolpath(self._process_toolpath(toolpath), self._toolpath_style('merge')))
+        
+        postamble = [
+            "",
+            "G0 X0 Y0 ; Regresar al HOME",
+            "M30 ; Fin del programa"
+        ]
+        gcode_lines.extend(postamble)
+        self._record_job('merge', preamble, postamble)
+        return gcode_lines
+    
+    def _repeat_block(self, block: List[str], count: int, separator: str,
+                      label: Optional[str] = None) -> List[str]:
+        """
+        Repetir un bloque de G-code ya formateado para múltiples pasadas
+        
+        Las líneas del bloque se formatean una sola vez y se reutilizan en cada
+        pasada. Con el dialecto 'linuxcnc' se emite un bucle O-word en lugar de
+        copiar el bloque.
+        
+        Args:
+            block: Líneas del bloque de una pasada
+            count: Número de pasadas
+            separator: Línea emitida entre pasadas (p. ej. una pausa G4)
+            label: Plantilla de comentario por pasada con {pass_num} y {count} (opcional)
+            
+        Returns:
+            Lista de líneas de G-code
+        """
+        gcode_lines = []
+        if count <= 0 or not block:
+            return gcode_lines
+        
+        if self.gcode_dialect == 'linuxcnc' and count > 1:
+            # Primera pasada explícita y el resto dentro de un bucle repeat
+            loop_id = self._next_loop_id
+            self._next_loop_id += 1
+            if label:
+                gcode_lines.append(label.format(pass_num=1, count=count))
+            gcode_lines.extend(block)
+            gcode_lines.append(f"o{loop_id} repeat [{count - 1}]")
+            gcode_lines.append(separator)
+            gcode_lines.extend(block)
+            gcode_lines.append(f"o{loop_id} endrepeat")
+            return gcode_lines
+        
+        for pass_num in range(count):
+            if label:
+                gcode_lines.append(label.format(pass_num=pass_num + 1, count=count))
+            gcode_lines.extend(block)
+            # Pausa entre pasadas (excepto en la última)
+            if pass_num < count - 1:
+                gcode_lines.append(separator)
+        return gcode_lines
+    
     def _get_text_contours_pil(self, text: str) -> List[np.ndarray]:
         """
         Extraer contornos del texto usando PIL y OpenCV (método mejorado)
@@ -259,8 +972,6 @@ class LaserGCodeGenerator:
         Returns:
             Lista de líneas de G-code
         """
-        gcode_lines = []
-        
         # Usar el orden optimizado de contornos (ya ordenados de izquierda a derecha)
         contours_with_area = []
         for contour in contours:
@@ -274,62 +985,25 @@ class LaserGCodeGenerator:
         
         # NO reordenar - usar el orden optimizado que ya viene de la función generate_gcode
         
-        # Procesar cada capa
-        for layer in range(self.num_layers):
-            # Convertir porcentaje a valor del controlador (100% = 1000)
-            power_value = self._convert_power_percent_to_value(self.laser_power_max)
-            
-            # Variable para rastrear la posición actual del láser
-            current_x = None
-            current_y = None
+        # Todas las capas son idénticas: un único grupo repetido num_layers veces
+        toolpath = Toolpath()
+        group = toolpath.add_group(toolpath.add_layer('Capa 1'), passes=self.num_layers)
+        
+        for contour, area in contours_with_area:
+            if len(contour) < 2:
+                continue
             
-            for i, (contour, area) in enumerate(contours_with_area):
-                if len(contour) < 2:
-                    continue
-                
-                # Obtener el punto más a la izquierda del contorno
-                leftmost_idx = np.argmin(contour[:, :, 0])
-                leftmost_point = contour[leftmost_idx][0]
-                target_x = start_x + leftmost_point[0]
-                target_y = start_y + leftmost_point[1]
-                
-                # Solo mover si no estamos ya en la posición correcta
-                # Para el primer contorno, asumir que ya estamos en la posición correcta (home)
-                if current_x is None:
-                    # Primer contorno - asumir que ya estamos en la posición correcta
-                    current_x = target_x
-                    current_y = target_y
-                elif abs(current_x - target_x) > 0.001 or abs(current_y - target_y) > 0.001:
-                    # Solo mover si no estamos ya en la posición correcta
-                    gcode_lines.append(f"G0 X{target_x:.3f} Y{target_y:.3f}")
-                    current_x = target_x
-                    current_y = target_y
-                
-                # Configurar potencia del láser para esta capa
-                gcode_lines.append(f"M3 S{power_value}")
-                
-                # Dibujar contorno
-                for j, point in enumerate(contour):
-                    x, y = point[0]
-                    gcode_lines.append(f"G1 X{start_x + x:.3f} Y{start_y + y:.3f} F{self.feed_rate}")
-                    current_x = start_x + x
-                    current_y = start_y + y
-                
-                # Cerrar contorno si es necesario
-                if len(contour) > 2:
-                    first_point = contour[0][0]
-                    gcode_lines.append(f"G1 X{start_x + first_point[0]:.3f} Y{start_y + first_point[1]:.3f}")
-                    current_x = start_x + first_point[0]
-                    current_y = start_y + first_point[1]
-                
-                # Apagar láser
-                gcode_lines.append("M5")
+            # Entrar por el punto más a la izquierda del contorno y recorrerlo desde su inicio
+            contour_points = contour.reshape(-1, 2) + (start_x, start_y)
+            leftmost = contour_points[np.argmin(contour_points[:, 0])]
+            path = np.vstack([leftmost, contour_points])
             
-            # Pausa entre capas (opcional)
-            if layer < self.num_layers - 1:
-                gcode_lines.append("G4 P1")
+            # Cerrar contorno si es necesario (vuelve al primer punto del contorno)
+            if len(contour) > 2:
+                path = np.vstack([path, contour_points[:1]])
+            toolpath.add_path(group, path, self.feed_rate, self.laser_power_max)
         
-        return gcode_lines
+        return self._emit_toolpath(self._process_toolpath(toolpath), self._toolpath_style('text'))
     
     def generate_gcode(self, text: str, center_text: bool = True) -> List[str]:
         """
@@ -419,14 +1093,17 @@ class LaserGCodeGenerator:
         
         # Convertir contornos a G-code
         print("Generando G-code...")
+        preamble = list(gcode_lines)
         contour_gcode = self._contours_to_gcode(contours, start_x, start_y)
         gcode_lines.extend(contour_gcode)
         
         # Finalizar - Regresar al inicio
-        gcode_lines.extend([
+        postamble = [
             "G0 X0 Y0",
             "M30"
-        ])
+        ]
+        gcode_lines.extend(postamble)
+        self._record_job('text', preamble, postamble)
         
         return gcode_lines
     
@@ -453,60 +1130,28 @@ class LaserGCodeGenerator:
             "G0 X0 Y0 ; Ir al HOME (origen)"
         ])
         
-        # Procesar contornos
-        current_layer = 1
-        laser_on = False
-        first_point = True
-        
-        for i, (x, y) in enumerate(contours):
-            # Verificar si es un punto de salto (NaN)
-            if np.isnan(x) or np.isnan(y):
-                if laser_on:
-                    gcode_lines.append("M5 ; Apagar láser")
-                    laser_on = False
-                continue
-            
-            # Verificar si necesitamos cambiar de capa
-            if current_layer <= self.num_layers:
-                if i == 0 or (i > 0 and (np.isnan(contours[i-1][0]) or np.isnan(contours[i-1][1]))):
-                    # Inicio de nuevo contorno
-                    if first_point:
-                        # Para el primer punto: posicionar, encender láser, empezar a dibujar
-                        gcode_lines.append(f"G0 X{x:.3f} Y{y:.3f} ; Posicionar en primer punto")
-                        # Convertir porcentaje a valor del controlador
-                        power_value = self._convert_power_percent_to_value(self.laser_power_max)
-                        gcode_lines.append(f"M3 S{power_value} ; Encender láser - Capa {current_layer}")
-                        gcode_lines.append(f"G1 X{x:.3f} Y{y:.3f} F{self.feed_rate} ; Iniciar grabado")
-                        laser_on = True
-                        first_point = False
-                    else:
-                        # Para contornos siguientes: posicionar, encender láser, empezar a dibujar
-                        gcode_lines.append(f"G0 X{x:.3f} Y{y:.3f} ; Posicionar")
-                        if not laser_on:
-                            # Convertir porcentaje a valor del controlador
-                            power_value = self._convert_power_percent_to_value(self.laser_power_max)
-                            gcode_lines.append(f"M3 S{power_value} ; Encender láser - Capa {current_layer}")
-                            laser_on = True
-                        gcode_lines.append(f"G1 X{x:.3f} Y{y:.3f} F{self.feed_rate} ; Iniciar grabado")
-                else:
-                    # Continuar contorno
-                    gcode_lines.append(f"G1 X{x:.3f} Y{y:.3f} F{self.feed_rate}")
-            else:
-                # Apagar láser si hemos terminado todas las capas
-                if laser_on:
-                    gcode_lines.append("M5 ; Apagar láser")
-                    laser_on = False
-                break
-        
-        # Asegurar que el láser esté apagado al final
-        if laser_on:
-            gcode_lines.append("M5 ; Apagar láser")
+        # Separar contornos por los puntos de salto (NaN)
+        points = np.asarray(contours, dtype=np.float64).reshape(-1, 2)
+        jumps = np.isnan(points).any(axis=1)
+        bounds = np.flatnonzero(np.diff(np.concatenate(([True], jumps, [True])).astype(np.int8)))
+        paths = [points[a:b] for a, b in zip(bounds[::2], bounds[1::2])]
+        
+        # Un único grupo de una pasada; el recorte puede dividir un contorno en varios tramos
+        toolpath = Toolpath()
+        group = toolpath.add_group(toolpath.add_layer('Capa 1'))
+        for path in paths:
+            toolpath.add_path(group, path, self.feed_rate, self.laser_power_max)
+        
+        preamble = list(gcode_lines)
+        gcode_lines.extend(self._emit_copies(self._process_toolpath(toolpath), self._toolpath_style('image')))
         
         # Finalizar - regresar al HOME
-        gcode_lines.extend([
+        postamble = [
             "G0 X0 Y0 ; Regresar al HOME",
             "M30 ; Fin del programa"
-        ])
+        ]
+        gcode_lines.extend(postamble)
+        self._record_job('image', preamble, postamble)
         
         return '\n'.join(gcode_lines)
     
@@ -558,24 +1203,20 @@ class LaserGCodeGenerator:
         ])
         
         # Realizar múltiples pasadas para la profundidad
-        for pass_num in range(int(cut_depth)):
-            gcode_lines.extend([
-                f"; Pasada {pass_num + 1} de {int(cut_depth)}",
-                f"G0 X{start_x:.3f} Y{start_y:.3f} ; Posicionar en inicio",
-                f"M3 S{self._convert_power_percent_to_value(cut_power)} ; Encender láser - Potencia {cut_power}%",
-                f"G1 X{end_x:.3f} Y{end_y:.3f} F{cut_speed} ; Realizar corte",
-                "M5 ; Apagar láser"
-            ])
-            
-            # Pausa entre pasadas (excepto en la última)
-            if pass_num < int(cut_depth) - 1:
-                gcode_lines.append("G4 P0.5 ; Pausa entre pasadas")
+        toolpath = Toolpath()
+        group = toolpath.add_group(toolpath.add_layer('Corte'), passes=int(cut_depth))
+        toolpath.add_path(group, [(start_x, start_y), (end_x, end_y)], cut_speed, cut_power)
+        
+        preamble = list(gcode_lines)
+        gcode_lines.extend(self._emit_toolpath(self._process_toolpath(toolpath), self._toolpath_style('cut')))
         
         # Finalizar
-        gcode_lines.extend([
+        postamble = [
             "G0 X0 Y0 ; Regresar al origen",
             "M30 ; Fin del programa"
-        ])
+        ]
+        gcode_lines.extend(postamble)
+        self._record_job('cut', preamble, postamble)
         
         return gcode_lines
     
@@ -614,6 +1255,8 @@ class LaserGCodeGenerator:
         ])
         
         # Procesar cada corte
+        preamble = list(gcode_lines)
+        toolpaths = []
         for i, cut in enumerate(cuts):
             gcode_lines.extend([
                 f"; Corte {i + 1} de {len(cuts)}",
@@ -631,6 +1274,9 @@ class LaserGCodeGenerator:
                 cut_speed=cut_speed
             )
             
+            if self.last_toolpath is not None:
+                toolpaths.append(self.last_toolpath)
+            
             # Agregar solo las líneas de movimiento (sin encabezados duplicados)
             for line in cut_gcode:
                 if not line.startswith(';') and not line.startswith('G21') and not line.startswith('G90') and not line.startswith('M5'):
@@ -640,11 +1286,22 @@ class LaserGCodeGenerator:
             if i < len(cuts) - 1:
                 gcode_lines.append("G4 P1 ; Pausa entre cortes")
         
+        if self.emission_mode == 'm4':
+            gcode_lines.append("M5 ; Apagar láser")
+        
         # Finalizar
-        gcode_lines.extend([
+        postamble = [
             "G0 X0 Y0 ; Regresar al origen",
             "M30 ; Fin del programa"
-        ])
+        ]
+        gcode_lines.extend(postamble)
+        
+        # Un trabajo con cada corte como capa, con la pausa entre cortes al final de la capa
+        job = Toolpath.concat(toolpaths)
+        job.layers = [dict(layer, footer=["G4 P1 ; Pausa entre cortes"] if i < len(job.layers) - 1 else [])
+                      for i, layer in enumerate(job.layers)]
+        self.last_toolpath = job
+        self._record_job('cut', preamble, postamble)
         
         return gcode_lines
     
@@ -665,6 +1322,8 @@ class LaserGCodeGenerator:
                    - 'elements': Lista de elementos SVG, cada uno con:
                      - 'id': ID del elemento
                      - 'points': Lista de puntos [(x, y), ...]
+                     - 'bulges': Bulge de cada punto para arcos exactos (opcional,
+                       ver SVGProcessor.path_to_primitives)
             table_width: Ancho de la tabla (opcional, usa self.table_width si no se especifica)
             table_height: Alto de la tabla (opcional, usa self.table_height si no se especifica)
             scale_factor: Factor de escala para los puntos SVG
@@ -693,18 +1352,16 @@ class LaserGCodeGenerator:
         ])
         
         # Calcular bounding box de todos los elementos para normalizar coordenadas
-        all_points_for_bbox = []
-        for layer in layers:
-            for element in layer.get('elements', []):
-                points = element.get('points', [])
-                if points:
-                    for point in points:
-                        all_points_for_bbox.append((point[0] * scale_factor, point[1] * scale_factor))
+        all_points_for_bbox = [
+            np.asarray(element['points'], dtype=np.float64).reshape(-1, 2)
+            for layer in layers
+            for element in layer.get('elements', [])
+            if element.get('points')
+        ]
         
         # Normalizar coordenadas: encontrar mínimo y ajustar para que empiece en (0,0)
         if all_points_for_bbox:
-            min_x = min(p[0] for p in all_points_for_bbox)
-            min_y = min(p[1] for p in all_points_for_bbox)
+            min_x, min_y = np.min(np.vstack(all_points_for_bbox), axis=0) * scale_factor
         else:
             min_x = 0
             min_y = 0
@@ -713,7 +1370,12 @@ class LaserGCodeGenerator:
         margin_x = offset_x
         margin_y = offset_y
         
-        # Procesar cada capa
+        # Recortar al área de la tabla indicada para este trabajo
+        if self.clipper is not None:
+            self.clipper = ToolpathClipper(tw, th)
+        
+        # Cada capa agrupa sus elementos; cada elemento es un grupo que se repite por pasadas
+        toolpath = Toolpath()
         for layer_idx, layer in enumerate(layers):
             layer_name = layer.get('layer_name', f'Layer_{layer_idx + 1}')
             speed = float(layer.get('speed', self.feed_rate))
@@ -724,9 +1386,12 @@ class LaserGCodeGenerator:
             if not elements:
                 continue
             
-            # Comentario de inicio de capa
-            gcode_lines.append(f"; === Capa: {layer_name} ===")
-            gcode_lines.append(f"; Velocidad: {speed}mm/min, Potencia: {power}%, Pasadas: {num_passes}")
+            # Comentario de inicio de capa y pausa entre capas (excepto en la última)
+            layer_id = toolpath.add_layer(
+                layer_name,
+                header=[f"; === Capa: {layer_name} ===",
+                        f"; Velocidad: {speed}mm/min, Potencia: {power}%, Pasadas: {num_passes}"],
+                footer=["G4 P0.5 ; Pausa entre capas"] if layer_idx < len(layers) - 1 else [])
             
             # Procesar cada elemento de la capa
             for elem_idx, element in enumerate(elements):
@@ -736,58 +1401,32 @@ class LaserGCodeGenerator:
                 if not points:
                     continue
                 
-                # Comentario del elemento
-                gcode_lines.append(f"; Elemento: {elem_id}")
+                # Normalizar coordenadas: restar mínimo y agregar margen
+                # Esto asegura que el diseño empiece desde la esquina inferior izquierda (0,0)
+                path = np.asarray(points, dtype=np.float64).reshape(-1, 2) * scale_factor
+                path -= (min_x - margin_x, min_y - margin_y)
                 
-                # Repetir el corte según el número de pasadas
-                for pass_num in range(num_passes):
-                    if num_passes > 1:
-                        gcode_lines.append(f"; Pasada {pass_num + 1} de {num_passes}")
-                    
-                    # Asegurar que el láser esté apagado antes del movimiento rápido
-                    gcode_lines.append("M5 ; Asegurar láser apagado para desplazamiento")
-                    
-                    # Normalizar coordenadas: restar mínimo y agregar margen
-                    # Esto asegura que el diseño empiece desde la esquina inferior izquierda (0,0)
-                    first_point = points[0]
-                    x = (first_point[0] * scale_factor) - min_x + margin_x
-                    y = (first_point[1] * scale_factor) - min_y + margin_y
-                    gcode_lines.append(f"G0 X{x:.3f} Y{y:.3f} ; Desplazamiento rápido (láser apagado)")
-                    
-                    # Encender láser SOLO cuando vamos a cortar (G1)
-                    # Convertir porcentaje a valor del controlador (100% = 1000)
-                    power_value = self._convert_power_percent_to_value(power)
-                    gcode_lines.append(f"M3 S{power_value} ; Encender láser - {layer_name} ({power}% = {power_value})")
-                    
-                    # Dibujar el path (normalizando coordenadas) - SOLO aquí el láser está encendido
-                    for point in points[1:]:
-                        x = (point[0] * scale_factor) - min_x + margin_x
-                        y = (point[1] * scale_factor) - min_y + margin_y
-                        gcode_lines.append(f"G1 X{x:.3f} Y{y:.3f} F{speed} ; Corte con láser encendido")
-                    
-                    # Cerrar path si el primer y último punto son diferentes
-                    if len(points) > 1 and points[0] != points[-1]:
-                        first_x = (points[0][0] * scale_factor) - min_x + margin_x
-                        first_y = (points[0][1] * scale_factor) - min_y + margin_y
-                        gcode_lines.append(f"G1 X{first_x:.3f} Y{first_y:.3f} F{speed} ; Cerrar path")
-                    
-                    # Apagar láser inmediatamente después del corte
-                    gcode_lines.append("M5 ; Apagar láser después del corte")
-                    
-                    # Pausa entre pasadas (excepto en la última)
-                    if pass_num < num_passes - 1:
-                        gcode_lines.append("G4 P0.5 ; Pausa entre pasadas")
-            
-            # Pausa entre capas (excepto en la última)
-            if layer_idx < len(layers) - 1:
-                gcode_lines.append("G4 P0.5 ; Pausa entre capas")
+                # Cerrar path si el primer y último punto son diferentes
+                closes = len(points) > 1 and tuple(points[0]) != tuple(points[-1])
+                
+                # Arcos exactos del elemento (la escala uniforme no cambia los bulges)
+                bulge = element.get('bulges')
+                
+                group = toolpath.add_group(layer_id, passes=num_passes,
+                                           header=[f"; Elemento: {elem_id}"], label=elem_id)
+                toolpath.add_path(group, path, speed, power, closed=closes, bulge=bulge)
+        
+        preamble = list(gcode_lines)
+        gcode_lines.extend(self._emit_copies(self._process_toolpath(toolpath), self._toolpath_style('svg')))
         
         # Finalizar - regresar al HOME
-        gcode_lines.extend([
+        postamble = [
             "",
             "G0 X0 Y0 ; Regresar al HOME",
             "M30 ; Fin del programa"
-        ])
+        ]
+        gcode_lines.extend(postamble)
+        self._record_job('svg', preamble, postamble)
         
         return '\n'.join(gcode_lines)
     
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parser vectorizado de G-code
+Lee archivos G-code por bloques de tamaño fijo (memoria constante) y convierte
+cada bloque de texto en arrays NumPy de movimientos sin recorrer línea por línea en Python.
+Los bucles O-word de LinuxCNC (oN repeat [k] ... oN endrepeat) se expanden parseando
+el cuerpo k veces desde un archivo temporal, también por bloques
+"""
+
+import io
+import re
+import tempfile
+import warnings
+import numpy as np
+from typing import BinaryIO, Dict, Iterator, Optional
+
+# Tipos de movimiento (código G modal)
+MOTION_RAPID = 0   # G0
+MOTION_LINE = 1    # G1
+MOTION_CW = 2      # G2
+MOTION_CCW = 3     # G3
+
+# Letras de palabra que se extraen de cada línea
+WORD_LETTERS = b'GMXYIJFSP'
+
+# Caracteres válidos dentro de un número
+_NUMBER_CHARS = np.zeros(256, dtype=bool)
+_NUMBER_CHARS[list(b'0123456789.+-')] = True
+
+INCH_TO_MM = 25.4
+
+# Línea de inicio o fin de un bucle O-word: "o100 repeat [4]", "o100 endrepeat"
+_LOOP_LINE = re.compile(rb'^[ \t]*[oO]([0-9]+)[ \t]+((?:end)?repeat)\b[^\[\n]*(?:\[[ \t]*([0-9.]+)[ \t]*\])?[^\n]*\n',
+                        re.IGNORECASE | re.MULTILINE)
+_REPEAT_WORD = re.compile(rb'repeat', re.IGNORECASE)
+
+
+def arc_sweep(moves: Dict, arcs: np.ndarray):
+    """
+    Calcular radio, ángulo inicial y barrido con signo de los arcos G2/G3
+
+    Args:
+        moves: Dict de arrays de movimientos (formato de parse_chunk)
+        arcs: Máscara booleana de los movimientos que son arcos
+
+    Returns:
+        Tupla (radio, ángulo_inicial, barrido); barrido > 0 en sentido antihorario
+    """
+    ccw = moves['type'][arcs] == MOTION_CCW
+    sx = moves['x0'][arcs] - moves['cx'][arcs]
+    sy = moves['y0'][arcs] - moves['cy'][arcs]
+    ex = moves['x'][arcs] - moves['cx'][arcs]
+    ey = moves['y'][arcs] - moves['cy'][arcs]
+    radius = np.hypot(sx, sy)
+    sweep = np.arctan2(sx * ey - sy * ex, sx * ex + sy * ey)
+    # Barrido en el sentido del arco; extremos iguales = círculo completo
+    sweep = np.where(ccw, np.where(sweep <= 1e-9, sweep + 2 * np.pi, sweep),
+                     np.where(sweep >= -1e-9, sweep - 2 * np.pi, sweep))
+    return radius, np.arctan2(sy, sx), sweep
+
+
+class GCodeParser:
+    """Parser de G-code por bloques con estado modal persistente entre bloques"""
+
+    def __init__(self, chunk_size: int = 8 * 1024 * 1024):
+        """
+        Inicializar parser
+
+        Args:
+            chunk_size: Tamaño en bytes de cada bloque leído del archivo
+        """
+        self.chunk_size = chunk_size
+        self.reset()
+
+    def reset(self) -> None:
+        """Reiniciar el estado modal (posición, modo de movimiento, potencia, etc.)"""
+        self.state = {
+            'motion': MOTION_RAPID,
+            'x': 0.0,
+            'y': 0.0,
+            'feed': 0.0,
+            'power': 0.0,
+            'spindle': 5,       # 3 = M3, 4 = M4, 5 = M5 (apagado)
+            'relative': False,  # G91
+            'scale': 1.0,       # 25.4 con G20
+            'pending_sync': False,
+        }
+        self.line_base = 0
+
+    def iter_file(self, filepath: str) -> Iterator[Dict]:
+        """
+        Parsear un archivo por bloques
+
+        Args:
+            filepath: Ruta al archivo G-code
+
+        Yields:
+            Diccionario por bloque (ver parse_chunk)
+        """
+        with open(filepath, 'rb') as f:
+            yield from self.iter_stream(f)
+
+    def iter_text(self, text: str) -> Iterator[Dict]:
+        """
+        Parsear G-code en memoria por bloques
+
+        Args:
+            text: Contenido G-code
+
+        Yields:
+            Diccionario por bloque (ver parse_chunk)
+        """
+        yield from self.iter_stream(io.BytesIO(text.encode('utf-8')))
+
+    def iter_stream(self, stream: BinaryIO) -> Iterator[Dict]:
+        """
+        Parsear un flujo binario por bloques de líneas completas
+
+        Args:
+            stream: Objeto con método read() que devuelve bytes
+
+        Yields:
+            Diccionario por bloque (ver parse_chunk)
+        """
+        self.reset()
+        yield from self._iter_blocks(self._read_lines(stream))
+
+    def _read_lines(self, stream: BinaryIO) -> Iterator[bytes]:
+        """Bloques de unos chunk_size bytes de líneas completas (todos terminan en salto de línea)"""
+        remainder = b''
+        while True:
+            data = stream.read(self.chunk_size)
+            if not data:
+                break
+            data = remainder + data
+            cut = data.rfind(b'\n')
+            if cut < 0:
+                remainder = data
+                continue
+            remainder = data[cut + 1:]
+            yield data[:cut + 1]
+        if remainder:
+            yield remainder + b'\n'
+
+    def _iter_blocks(self, blocks: Iterator[bytes]) -> Iterator[Dict]:
+        """
+        Parsear bloques de líneas completas expandiendo los bucles O-word
+
+        El cuerpo de un bucle de primer nivel se copia a un archivo temporal (en
+        memoria hasta chunk_size bytes) mientras se buscan sus líneas de control solo
+        en los bloques nuevos; al cerrarse se vuelve a leer por bloques una vez por
+        repetición, de modo que la memoria no depende del tamaño del bucle. Un bucle
+        sin endrepeat al final del flujo se parsea una vez.
+
+        Args:
+            blocks: Bloques de líneas completas (ver _read_lines)
+
+        Yields:
+            Diccionario por tramo (ver parse_chunk)
+        """
+        stack = []      # Bucles abiertos: (número, repeticiones)
+        spool = None    # Cuerpo del bucle de primer nivel abierto
+        line_base = 0
+        body_lines = 0
+        try:
+            for block in blocks:
+                position = 0
+                if stack or _REPEAT_WORD.search(block):
+                    for match in _LOOP_LINE.finditer(block):
+                        loop_id, keyword, count = match.group(1), match.group(2).lower(), match.group(3)
+                        if keyword == b'repeat':
+                            if not stack:
+                                # Texto anterior, incluida la línea repeat
+                                yield self.parse_chunk(block[position:match.end()])
+                                position = match.end()
+                                spool = tempfile.SpooledTemporaryFile(max_size=self.chunk_size)
+                                line_base, body_lines = self.line_base, 0
+                            stack.append((loop_id, count))
+                            continue
+                        # endrepeat: cierra el bucle abierto con el mismo número
+                        if all(entry[0] != loop_id for entry in stack):
+                            continue
+                        while stack[-1][0] != loop_id:
+                            stack.pop()
+                        _, count = stack.pop()
+                        if not stack:
+                            body = block[position:match.start()]
+                            spool.write(body)
+                            body_lines += body.count(b'\n')
+                            yield from self._replay(spool, self._repeats(count), line_base, body_lines)
+                            spool = None
+                            # La línea endrepeat se parsea con el texto siguiente
+                            position = match.start()
+                if stack:
+                    body = block[position:]
+                    spool.write(body)
+                    body_lines += body.count(b'\n')
+                elif position < len(block):
+                    yield self.parse_chunk(block[position:])
+            if spool is not None:
+                yield from self._replay(spool, 1, line_base, body_lines)
+                spool = None
+        finally:
+            if spool is not None:
+                spool.close()
+
+    def _replay(self, spool, repeats: int, line_base: int, body_lines: int) -> Iterator[Dict]:
+        """
+        Parsear el cuerpo de un bucle una vez por repetición y cerrar su archivo
+
+        Cada repetición continúa el estado modal; los movimientos conservan los
+        números de línea del archivo y las repeticiones no suman líneas.
+
+        Args:
+            spool: Archivo temporal con el cuerpo del bucle
+            repeats: Número de repeticiones
+            line_base: Líneas anteriores al cuerpo
+            body_lines: Líneas del cuerpo
+
+        Yields:
+            Diccionario por tramo (ver parse_chunk)
+        """
+        try:
+            for repetition in range(repeats):
+                self.line_base = line_base
+                spool.seek(0)
+                for chunk in self._iter_blocks(self._read_lines(spool)):
+                    if repetition:
+                        chunk['lines'] = 0
+                    yield chunk
+        finally:
+            spool.close()
+        self.line_base = line_base + body_lines
+
+    @staticmethod
+    def _repeats(count: Optional[bytes]) -> int:
+        """Repeticiones de una línea repeat (1 si no tiene número válido)"""
+        try:
+            return max(0, int(float(count))) if count else 1
+        except ValueError:
+            return 1
+
+    def _blank_comments(self, buf: np.ndarray, nl_pos: np.ndarray) -> np.ndarray:
+        """
+        Reemplazar por espacios los comentarios ";" (hasta fin de línea) y "( ... )"
+
+        Args:
+            buf: Bytes del bloque (uint8), en mayúsculas
+            nl_pos: Posiciones de los saltos de línea
+
+        Returns:
+            Buffer sin comentarios
+        """
+        # Marcas +1/-1 al inicio y al final de cada comentario; la suma acumulada
+        # positiva indica los bytes comentados
+        marks = np.zeros(len(buf) + 1, dtype=np.int32)
+        semi = np.flatnonzero(buf == 59)
+        if semi.size:
+            semi_line = np.searchsorted(nl_pos, semi)
+            first = np.flatnonzero(np.concatenate(([True], semi_line[1:] != semi_line[:-1])))
+            np.add.at(marks, semi[first], 1)
+            np.add.at(marks, nl_pos[semi_line[first]], -1)
+            comment = np.cumsum(marks[:-1]) > 0
+            buf = np.where(comment, np.uint8(32), buf)
+            marks[:] = 0
+
+        paren = np.flatnonzero((buf == 40) | (buf == 41))
+        if paren.size:
+            # Profundidad de paréntesis relativa a cada línea
+            paren_line = np.searchsorted(nl_pos, paren)
+            step = np.where(buf[paren] == 40, 1, -1)
+            depth = np.cumsum(step)
+            new_line = np.concatenate(([True], paren_line[1:] != paren_line[:-1]))
+            line_start = np.maximum.accumulate(np.where(new_line, np.arange(len(paren)), 0))
+            depth = depth - (depth - step)[line_start]
+            before = depth - step
+            opens = (before <= 0) & (depth > 0)
+            closes = (before > 0) & (depth <= 0)
+            np.add.at(marks, paren[opens], 1)
+            np.add.at(marks, paren[closes] + 1, -1)
+            # Comentarios sin cerrar terminan en el salto de línea
+            last = np.concatenate((paren_line[1:] != paren_line[:-1], [True]))
+            unclosed = last & (depth > 0)
+            np.add.at(marks, nl_pos[paren_line[unclosed]], -1)
+            comment = np.cumsum(marks[:-1]) > 0
+            buf = np.where(comment, np.uint8(32), buf)
+        return buf
+
+    def _extract_words(self, buf: np.ndarray, nl_pos: np.ndarray) -> Dict[str, tuple]:
+        """
+        Extraer todas las palabras (letra + número) del bloque de forma vectorizada
+
+        Args:
+            buf: Bytes del bloque (uint8), en mayúsculas y sin comentarios
+            nl_pos: Posiciones de los saltos de línea
+
+        Returns:
+            Diccionario letra -> (líneas, valores)
+        """
+        is_num = _NUMBER_CHARS[buf]
+        prev_num = np.concatenate(([False], is_num[:-1]))
+        run_start = np.flatnonzero(is_num & ~prev_num)
+        letters = buf[np.maximum(run_start - 1, 0)]
+        letters = np.where(run_start > 0, letters, 0)
+
+        # Un único paso de conversión sobre el texto con solo caracteres numéricos
+        cleaned = np.where(is_num, buf, np.uint8(32)).tobytes()
+        values = None
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            try:
+                values = np.fromstring(cleaned, dtype=np.float64, sep=' ')
+            except (ValueError, DeprecationWarning):
+                values = None
+        if values is None or len(values) != len(run_start):
+            # Tokens mal formados (p. ej. "X-" o "1-2"): conversión individual
+            tokens = cleaned.split()
+            values = np.empty(len(tokens), dtype=np.float64)
+            for k, token in enumerate(tokens):
+                try:
+                    values[k] = float(token)
+                except ValueError:
+                    values[k] = np.nan
+
+        run_line = np.searchsorted(nl_pos, run_start)
+        words = {}
+        for letter in WORD_LETTERS:
+            sel = letters == letter
+            words[chr(letter)] = (run_line[sel], values[sel])
+        return words
+
+    def _forward_fill(self, values: np.ndarray, initial: float) -> np.ndarray:
+        """Propagar el último valor definido (modal) sobre los NaN"""
+        defined = ~np.isnan(values)
+        idx = np.where(defined, np.arange(len(values)), -1)
+        np.maximum.accumulate(idx, out=idx)
+        filled = np.where(idx >= 0, values[np.maximum(idx, 0)], initial)
+        return filled
+
+    def _resolve_axis(self, values: np.ndarray, relative: np.ndarray,
+                      scale: np.ndarray, initial: float) -> np.ndarray:
+        """
+        Calcular la posición absoluta por línea mezclando tramos G90 y G91
+
+        Args:
+            values: Valor de la palabra por línea (NaN si no aparece)
+            relative: Modo relativo por línea
+            scale: Factor de unidades por línea
+            initial: Posición al inicio del bloque
+
+        Returns:
+            Posición absoluta al final de cada línea
+        """
+        has = ~np.isnan(values)
+        scaled = np.where(has, values, 0.0) * scale
+        delta = np.where(relative, scaled, 0.0)
+        cumulative = np.cumsum(delta)
+        reset = has & ~relative
+        idx = np.where(reset, np.arange(len(values)), -1)
+        np.maximum.accumulate(idx, out=idx)
+        safe = np.maximum(idx, 0)
+        base = np.where(idx >= 0, scaled[safe] - cumulative[safe], initial)
+        return base + cumulative
+
+    def parse_chunk(self, data: bytes) -> Dict:
+        """
+        Parsear un bloque de líneas completas
+
+        Args:
+            data: Bytes del bloque terminados en salto de línea
+
+        Returns:
+            Diccionario con:
+            - 'lines': número de líneas del bloque (0 en las repeticiones de un bucle)
+            - 'line_base': número de la primera línea del bloque (base 1)
+            - 'moves': dict de arrays por movimiento (type, line, x0, y0, x, y,
+              cx, cy, feed, power, spindle, sync)
+            - 'power_words': arrays 'line' y 'value' de cada palabra S
+            - 'dwell': segundos de pausa G4 en el bloque
+            - 'program_end': True si aparece M2/M30
+        """
+        buf = np.frombuffer(data, dtype=np.uint8)
+        # Mayúsculas
+        lower = (buf >= 97) & (buf <= 122)
+        buf = np.where(lower, buf - 32, buf).astype(np.uint8)
+
+        nl_pos = np.flatnonzero(buf == 10)
+        n_lines = len(nl_pos)
+        buf = self._blank_comments(buf, nl_pos)
+        words = self._extract_words(buf, nl_pos)
+
+        state = self.state
+
+        def per_line(letter):
+            values = np.full(n_lines, np.nan)
+            lines, vals = words[letter]
+            values[lines] = vals
+            return values
+
+        # Palabras G: movimiento, pausa, distancia y unidades
+        g_lines, g_vals = words['G']
+        motion_word = np.full(n_lines, np.nan)
+        sel = np.isin(g_vals, (0, 1, 2, 3))
+        motion_word[g_lines[sel]] = g_vals[sel]
+        dwell_line = np.zeros(n_lines, dtype=bool)
+        dwell_line[g_lines[g_vals == 4]] = True
+        distance_word = np.full(n_lines, np.nan)
+        sel = np.isin(g_vals, (90, 91))
+        distance_word[g_lines[sel]] = g_vals[sel] - 90
+        units_word = np.full(n_lines, np.nan)
+        sel = np.isin(g_vals, (20, 21))
+        units_word[g_lines[sel]] = np.where(g_vals[sel] == 20, INCH_TO_MM, 1.0)
+
+        # Palabras M: estado del láser y fin de programa
+        m_lines, m_vals = words['M']
+        spindle_word = np.full(n_lines, np.nan)
+        sel = np.isin(m_vals, (3, 4, 5))
+        spindle_word[m_lines[sel]] = m_vals[sel]
+        program_end = bool(np.any(np.isin(m_vals, (2, 30))))
+
+        # Estado modal por línea
+        motion = self._forward_fill(motion_word, state['motion'])
+        relative = self._forward_fill(distance_word, float(state['relative'])) > 0.5
+        scale = self._forward_fill(units_word, state['scale'])
+        spindle = self._forward_fill(spindle_word, state['spindle'])
+        feed_word = per_line('F')
+        feed = self._forward_fill(feed_word * scale, state['feed'])
+        power_word = per_line('S')
+        power = self._forward_fill(power_word, state['power'])
+
+        x_word = per_line('X')
+        y_word = per_line('Y')
+        x = self._resolve_axis(x_word, relative, scale, state['x'])
+        y = self._resolve_axis(y_word, relative, scale, state['y'])
+        prev_x = np.concatenate(([state['x']], x[:-1]))
+        prev_y = np.concatenate(([state['y']], y[:-1]))
+        prev_spindle = np.concatenate(([state['spindle']], spindle[:-1]))
+        prev_power = np.concatenate(([state['power']], power[:-1]))
+
+        i_word = per_line('I')
+        j_word = per_line('J')
+        has_xy = ~np.isnan(x_word) | ~np.isnan(y_word)
+        has_ij = ~np.isnan(i_word) | ~np.isnan(j_word)
+        is_arc = motion >= MOTION_CW
+        is_move = (has_xy | (is_arc & has_ij)) & ~dwell_line
+
+        # Sincronizaciones del planificador: cambios de estado M3/M4/M5, pausas G4
+        # y cambios de potencia en líneas sin movimiento con el láser encendido
+        spindle_change = spindle != prev_spindle
+        power_change = (power != prev_power) & (spindle != 5) & ~is_move
+        sync_line = spindle_change | power_change | dwell_line
+        sync_count = np.cumsum(sync_line)
+
+        p_word = per_line('P')
+        dwell = float(np.nansum(np.where(dwell_line, p_word, 0.0)))
+
+        move_idx = np.flatnonzero(is_move)
+        # Sincronización pendiente desde el último movimiento del bloque anterior
+        prev_sync = np.concatenate(([0], sync_count[move_idx[:-1]])) if move_idx.size else np.empty(0, int)
+        sync = (sync_count[move_idx] - prev_sync) > 0
+        if move_idx.size:
+            sync[0] = sync[0] or state['pending_sync']
+
+        arc_scale = scale[move_idx]
+        moves = {
+            'type': motion[move_idx].astype(np.int8),
+            'line': move_idx + self.line_base + 1,
+            'x0': prev_x[move_idx],
+            'y0': prev_y[move_idx],
+            'x': x[move_idx],
+            'y': y[move_idx],
+            'cx': prev_x[move_idx] + np.nan_to_num(i_word[move_idx]) * arc_scale,
+            'cy': prev_y[move_idx] + np.nan_to_num(j_word[move_idx]) * arc_scale,
+            'feed': feed[move_idx],
+            'power': power[move_idx],
+            'spindle': spindle[move_idx].astype(np.int8),
+            'sync': sync,
+        }
+
+        s_lines, s_vals = words['S']
+
+        # Guardar estado modal para el siguiente bloque
+        if n_lines:
+            if move_idx.size:
+                pending_sync = bool(sync_count[-1] - sync_count[move_idx[-1]] > 0)
+            else:
+                pending_sync = state['pending_sync'] or bool(sync_count[-1] > 0)
+            state.update({
+                'motion': float(motion[-1]),
+                'x': float(x[-1]),
+                'y': float(y[-1]),
+                'feed': float(feed[-1]),
+                'power': float(power[-1]),
+                'spindle': float(spindle[-1]),
+                'relative': bool(relative[-1]),
+                'scale': float(scale[-1]),
+                'pending_sync': pending_sync,
+            })
+
+        result = {
+            'lines': n_lines,
+            'line_base': self.line_base + 1,
+            'moves': moves,
+            'power_words': {'line': s_lines + self.line_base + 1, 'value': s_vals},
+            'dwell': dwell,
+            'program_end': program_end,
+        }
+        self.line_base += n_lines
+        return result
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Validador y analizador de G-code
+Recorre el archivo por bloques con el parser vectorizado (memoria constante) y
+verifica límites de la tabla, rango de potencia y desplazamientos rápidos con el láser encendido
+"""
+
+import numpy as np
+from typing import Dict, Iterator, Optional
+from gcode_parser import GCodeParser, arc_sweep, MOTION_RAPID, MOTION_CW, MOTION_CCW
+from machine_profile import LASER_POWER_MAX_VALUE
+
+
+class GCodeValidator:
+    """Validador de G-code por bloques"""
+
+    def __init__(self, table_width: Optional[float] = None, table_height: Optional[float] = None,
+                 max_power: float = LASER_POWER_MAX_VALUE,
+                 laser_mode: bool = True, max_messages: int = 100):
+        """
+        Inicializar validador
+
+        Args:
+            table_width: Ancho de la tabla en mm (None = no verificar límites en X)
+            table_height: Alto de la tabla en mm (None = no verificar límites en Y)
+            max_power: Valor S máximo del controlador
+            laser_mode: Modo láser del controlador ($32=1): G0 nunca dispara el láser
+            max_messages: Máximo de mensajes reportados por tipo de problema
+        """
+        self.table_width = table_width
+        self.table_height = table_height
+        self.max_power = max_power
+        self.laser_mode = laser_mode
+        self.max_messages = max_messages
+        self.parser = GCodeParser()
+
+    def validate_file(self, filepath: str) -> Dict:
+        """
+        Validar un archivo G-code leyéndolo por bloques
+
+        Args:
+            filepath: Ruta al archivo G-code
+
+        Returns:
+            Diccionario con el resultado (ver _finish)
+        """
+        return self._validate_chunks(self.parser.iter_file(filepath))
+
+    def validate_gcode(self, gcode: str) -> Dict:
+        """
+        Validar un programa G-code en memoria
+
+        Args:
+            gcode: Contenido G-code
+
+        Returns:
+            Diccionario con el resultado (ver _finish)
+        """
+        return self._validate_chunks(self.parser.iter_text(gcode))
+
+    def _validate_chunks(self, chunks: Iterator[Dict]) -> Dict:
+        """Acumular verificaciones y estadísticas sobre todos los bloques"""
+        run = {
+            'lines': 0,
+            'motion': 0,
+            'rapid': 0,
+            'cut': 0,
+            'arc': 0,
+            'power_words': 0,
+            'cut_length': 0.0,
+            'travel_length': 0.0,
+            'bbox': np.array([np.inf, np.inf, -np.inf, -np.inf]),
+            'cut_bbox': np.array([np.inf, np.inf, -np.inf, -np.inf]),
+            'program_end': False,
+            'issues': {},
+        }
+        for chunk in chunks:
+            self._check_chunk(run, chunk)
+        return self._finish(run)
+
+    def _report(self, run: Dict, kind: str, severity: str, lines: np.ndarray, messages) -> None:
+        """
+        Registrar problemas de un tipo, guardando solo los primeros mensajes
+
+        Args:
+            run: Acumulador de la validación
+            kind: Identificador del tipo de problema
+            severity: 'error' o 'warning'
+            lines: Números de línea afectados
+            messages: Función que recibe los índices a reportar y devuelve los textos
+        """
+        if lines.size == 0:
+            return
+        issue = run['issues'].setdefault(kind, {'severity': severity, 'count': 0, 'messages': []})
+        room = self.max_messages - len(issue['messages'])
+        if room > 0:
+            issue['messages'].extend(messages(np.arange(min(room, lines.size))))
+        issue['count'] += int(lines.size)
+
+    def _move_extents(self, moves: Dict, arcs: np.ndarray):
+        """
+        Calcular la caja envolvente de cada movimiento incluyendo el abombamiento de los arcos
+
+        Returns:
+            Tupla (min_x, min_y, max_x, max_y) de arrays por movimiento
+        """
+        min_x = np.minimum(moves['x0'], moves['x'])
+        max_x = np.maximum(moves['x0'], moves['x'])
+        min_y = np.minimum(moves['y0'], moves['y'])
+        max_y = np.maximum(moves['y0'], moves['y'])
+        if np.any(arcs):
+            radius, start, sweep = arc_sweep(moves, arcs)
+            cx = moves['cx'][arcs]
+            cy = moves['cy'][arcs]
+            # Ángulos cardinales (0°, 90°, 180°, 270°) recorridos por cada arco
+            cardinal = np.arange(4) * (np.pi / 2)
+            offset = np.mod((cardinal[None, :] - start[:, None]) * np.sign(sweep)[:, None], 2 * np.pi)
+            crossed = offset <= np.abs(sweep)[:, None]
+            ext_x = cx[:, None] + radius[:, None] * np.array([1.0, 0.0, -1.0, 0.0])
+            ext_y = cy[:, None] + radius[:, None] * np.array([0.0, 1.0, 0.0, -1.0])
+            min_x[arcs] = np.minimum(min_x[arcs], np.where(crossed, ext_x, np.inf).min(axis=1))
+            max_x[arcs] = np.maximum(max_x[arcs], np.where(crossed, ext_x, -np.inf).max(axis=1))
+            min_y[arcs] = np.minimum(min_y[arcs], np.where(crossed, ext_y, np.inf).min(axis=1))
+            max_y[arcs] = np.maximum(max_y[arcs], np.where(crossed, ext_y, -np.inf).max(axis=1))
+        return min_x, min_y, max_x, max_y
+
+    def _check_chunk(self, run: Dict, chunk: Dict) -> None:
+        """Verificar un bloque parseado y acumular sus estadísticas"""
+        run['lines'] += chunk['lines']
+        run['program_end'] = run['program_end'] or chunk['program_end']
+
+        # Rango de potencia de cada palabra S
+        power_lines = chunk['power_words']['line']
+        power_values = chunk['power_words']['value']
+        run['power_words'] += int(power_lines.size)
+        bad = (power_values < 0) | (power_values > self.max_power) | np.isnan(power_values)
+        self._report(run, 'power_range', 'error', power_lines[bad], lambda idx: [
+            f"Línea {line}: potencia S{value:g} fuera de rango (0-{self.max_power:g})"
+            for line, value in zip(power_lines[bad][idx], power_values[bad][idx])])
+
+        moves = chunk['moves']
+        mtype = moves['type']
+        if mtype.size == 0:
+            return
+        line = moves['line']
+        rapid = mtype == MOTION_RAPID
+        arcs = (mtype == MOTION_CW) | (mtype == MOTION_CCW)
+        spindle_on = (moves['spindle'] != 5) & (moves['power'] > 0)
+        laser_on = ~rapid & spindle_on
+
+        # Longitudes (arcos por barrido angular)
+        length = np.hypot(moves['x'] - moves['x0'], moves['y'] - moves['y0'])
+        if np.any(arcs):
+            radius, _, sweep = arc_sweep(moves, arcs)
+            length[arcs] = np.abs(sweep) * radius
+
+        run['motion'] += int(mtype.size)
+        run['rapid'] += int(np.count_nonzero(rapid))
+        run['cut'] += int(np.count_nonzero(laser_on))
+        run['arc'] += int(np.count_nonzero(arcs))
+        run['cut_length'] += float(length[laser_on].sum())
+        run['travel_length'] += float(length[~laser_on].sum())
+
+        min_x, min_y, max_x, max_y = self._move_extents(moves, arcs)
+        for key, mask in (('bbox', np.ones(mtype.size, dtype=bool)), ('cut_bbox', laser_on)):
+            if np.any(mask):
+                box = run[key]
+                box[0] = min(box[0], min_x[mask].min())
+                box[1] = min(box[1], min_y[mask].min())
+                box[2] = max(box[2], max_x[mask].max())
+                box[3] = max(box[3], max_y[mask].max())
+
+        # Límites de la tabla
+        eps = 1e-6
+        outside = np.zeros(mtype.size, dtype=bool)
+        if self.table_width is not None:
+            outside |= (min_x < -eps) | (max_x > self.table_width + eps)
+        if self.table_height is not None:
+            outside |= (min_y < -eps) | (max_y > self.table_height + eps)
+        sel = np.flatnonzero(outside)
+        self._report(run, 'out_of_bounds', 'error', line[sel], lambda idx: [
+            f"Línea {line[k]}: movimiento fuera de la tabla "
+            f"(X {min_x[k]:.3f}..{max_x[k]:.3f}, Y {min_y[k]:.3f}..{max_y[k]:.3f})"
+            for k in sel[idx]])
+
+        # Desplazamientos rápidos con el láser encendido: en modo láser GRBL no dispara
+        # en G0, pero con M3 sin modo láser el G0 quema a lo largo de todo el recorrido
+        hot_rapid = rapid & spindle_on
+        sel = np.flatnonzero(hot_rapid)
+        severity = 'warning' if self.laser_mode else 'error'
+        self._report(run, 'rapid_laser_on', severity, line[sel], lambda idx: [
+            f"Línea {line[k]}: G0 con el láser encendido (M{moves['spindle'][k]} S{moves['power'][k]:g})"
+            for k in sel[idx]])
+
+        # Movimientos de corte sin velocidad de avance
+        sel = np.flatnonzero(~rapid & (moves['feed'] <= 0))
+        self._report(run, 'missing_feed', 'error', line[sel], lambda idx: [
+            f"Línea {line[k]}: movimiento de corte sin velocidad F" for k in sel[idx]])
+
+    def _finish(self, run: Dict) -> Dict:
+        """
+        Construir el resultado de la validación
+
+        Returns:
+            Diccionario con:
+            - 'is_valid': True si no hay errores
+            - 'errors' / 'warnings': mensajes (limitados a max_messages por tipo)
+            - 'issue_counts': número total de ocurrencias por tipo de problema
+            - 'stats': conteos de líneas, longitudes y cajas envolventes
+        """
+        if not run['program_end']:
+            self._report(run, 'missing_program_end', 'warning', np.array([run['lines']]),
+                         lambda idx: ["El programa no termina con M2/M30"])
+
+        errors = []
+        warnings = []
+        for issue in run['issues'].values():
+            (errors if issue['severity'] == 'error' else warnings).extend(issue['messages'])
+
+        def box_to_dict(box):
+            if not np.all(np.isfinite(box)):
+                return None
+            return {
+                'min_x': round(float(box[0]), 3),
+                'min_y': round(float(box[1]), 3),
+                'max_x': round(float(box[2]), 3),
+                'max_y': round(float(box[3]), 3),
+                'width': round(float(box[2] - box[0]), 3),
+                'height': round(float(box[3] - box[1]), 3),
+            }
+
+        return {
+            'is_valid': not errors,
+            'errors': errors,
+            'warnings': warnings,
+            'issue_counts': {kind: issue['count'] for kind, issue in run['issues'].items()},
+            'stats': {
+                'total_lines': run['lines'],
+                'motion_lines': run['motion'],
+                'rapid_moves': run['rapid'],
+                'cut_moves': run['cut'],
+                'arc_moves': run['arc'],
+                'power_words': run['power_words'],
+                'cut_length_mm': round(run['cut_length'], 3),
+                'travel_length_mm': round(run['travel_length'], 3),
+                'bbox': box_to_dict(run['bbox']),
+                'cut_bbox': box_to_dict(run['cut_bbox']),
+            },
+        }
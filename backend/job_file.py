@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contenedor binario de trabajos (.lcjob)
+Guarda el toolpath de cada trabajo junto a su .gcode como arrays NumPy alineados que se
+pueden abrir con np.memmap: re-emitir, estimar o previsualizar sin parsear el texto
+"""
+
+import json
+import os
+import struct
+import numpy as np
+from typing import Dict, Optional
+from toolpath import Toolpath
+
+
+class JobFile:
+    """
+    Lectura y escritura de archivos .lcjob
+
+    Formato:
+    - 8 bytes: firma MAGIC
+    - uint64 little-endian: longitud del encabezado JSON
+    - encabezado JSON (UTF-8): metadatos, capas, grupos y descriptor de cada array
+      (dtype, forma y desplazamiento en bytes)
+    - datos de los arrays, cada uno alineado a ALIGNMENT bytes
+    """
+
+    MAGIC = b'LCJOB\x00\x01\x00'
+    VERSION = 1
+    ALIGNMENT = 64
+    EXTENSION = '.lcjob'
+
+    # Arrays del toolpath y tipo con el que se guardan (little-endian)
+    ARRAYS = {
+        'points': '<f8',
+        'bulge': '<f8',
+        'offsets': '<i8',
+        'path_group': '<i4',
+        'path_layer': '<i4',
+        'feed': '<f8',
+        'power': '<f8',
+        'closed': '|b1',
+        'group_layer': '<i4',
+        'group_passes': '<i4',
+    }
+
+    def __init__(self, filepath: str):
+        """
+        Inicializar contenedor
+
+        Args:
+            filepath: Ruta del archivo .lcjob
+        """
+        self.filepath = filepath
+        self._header: Optional[Dict] = None
+
+    @classmethod
+    def path_for(cls, gcode_path: str) -> str:
+        """Ruta del .lcjob que acompaña a un archivo .gcode"""
+        return os.path.splitext(gcode_path)[0] + cls.EXTENSION
+
+    def write(self, toolpath: Toolpath) -> int:
+        """
+        Guardar un toolpath
+
+        Args:
+            toolpath: Toolpath procesado (con metadatos del trabajo)
+
+        Returns:
+            Tamaño del archivo en bytes
+        """
+        toolpath.pack()
+        arrays = {
+            'points': toolpath.points,
+            'bulge': toolpath.bulge,
+            'offsets': toolpath.offsets,
+            'path_group': toolpath.path_group,
+            'path_layer': toolpath.path_layer,
+            'feed': toolpath.feed,
+            'power': toolpath.power,
+            'closed': toolpath.closed,
+            'group_layer': toolpath.group_layer,
+            'group_passes': toolpath.group_passes,
+        }
+        arrays = {name: np.ascontiguousarray(arrays[name], dtype=dtype) for name, dtype in self.ARRAYS.items()}
+
+        # Desplazamientos relativos al inicio de la zona de datos
+        descriptors = {}
+        position = 0
+        for name, array in arrays.items():
+            position = -(-position // self.ALIGNMENT) * self.ALIGNMENT
+            descriptors[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': position}
+            position += array.nbytes
+
+        header = json.dumps({
+            'version': self.VERSION,
+            'meta': toolpath.meta,
+            'layers': toolpath.layers,
+            'groups': toolpath.groups,
+            'num_paths': toolpath.num_paths,
+            'num_points': int(len(toolpath.points)),
+            'arrays': descriptors,
+        }, ensure_ascii=False).encode('utf-8')
+        data_start = -(-(len(self.MAGIC) + 8 + len(header)) // self.ALIGNMENT) * self.ALIGNMENT
+
+        with open(self.filepath, 'wb') as f:
+            f.write(self.MAGIC)
+            f.write(struct.pack('<Q', len(header)))
+            f.write(header)
+            for name, array in arrays.items():
+                f.seek(data_start + descriptors[name]['offset'])
+                f.write(array.tobytes())
+            size = f.tell()
+        self._header = None
+        return size
+
+    def read_header(self) -> Dict:
+        """
+        Leer el encabezado sin cargar los arrays
+
+        Returns:
+            Diccionario del encabezado con 'data_start' (inicio de la zona de datos)
+        """
+        if self._header is None:
+            with open(self.filepath, 'rb') as f:
+                if f.read(len(self.MAGIC)) != self.MAGIC:
+                    raise ValueError(f"Archivo de trabajo inválido: {self.filepath}")
+                (length,) = struct.unpack('<Q', f.read(8))
+                header = json.loads(f.read(length).decode('utf-8'))
+            header['data_start'] = -(-(len(self.MAGIC) + 8 + length) // self.ALIGNMENT) * self.ALIGNMENT
+            self._header = header
+        return self._header
+
+    def array(self, name: str, mmap: bool = True) -> np.ndarray:
+        """
+        Obtener un array del trabajo
+
+        Args:
+            name: Nombre del array (ver ARRAYS)
+            mmap: Mapear el archivo en memoria (solo lectura) en lugar de leerlo
+
+        Returns:
+            Array con la forma y el tipo guardados
+        """
+        header = self.read_header()
+        desc = header['arrays'][name]
+        shape = tuple(desc['shape'])
+        offset = header['data_start'] + desc['offset']
+        if int(np.prod(shape)) == 0:
+            return np.empty(shape, dtype=desc['dtype'])
+        if mmap:
+            return np.memmap(self.filepath, dtype=desc['dtype'], mode='r', offset=offset, shape=shape)
+        with open(self.filepath, 'rb') as f:
+            f.seek(offset)
+            return np.fromfile(f, dtype=desc['dtype'], count=int(np.prod(shape))).reshape(shape)
+
+    def read(self, mmap: bool = True) -> Toolpath:
+        """
+        Cargar el toolpath del trabajo
+
+        Args:
+            mmap: Mapear los arrays en memoria (solo lectura) en lugar de copiarlos
+
+        Returns:
+            Toolpath con capas, grupos, trayectorias y metadatos
+        """
+        header = self.read_header()
+        toolpath = Toolpath()
+        toolpath.meta = header['meta']
+        toolpath.layers = header['layers']
+        toolpath.groups = header['groups']
+        for name in ('points', 'bulge', 'offsets', 'path_group', 'feed', 'power', 'closed',
+                     'group_layer', 'group_passes'):
+            setattr(toolpath, name, self.array(name, mmap))
+        return toolpath
+
+    def preview(self, mmap: bool = True) -> Dict:
+        """
+        Geometría para previsualizar el trabajo
+
+        Returns:
+            Diccionario con la caja envolvente y, por path, capa, velocidad, potencia,
+            cierre, puntos y bulges (solo en paths con arcos)
+        """
+        header = self.read_header()
+        points = self.array('points', mmap)
+        offsets = self.array('offsets', mmap)
+        layers = self.array('path_layer', mmap)
+        feed = self.array('feed', mmap)
+        power = self.array('power', mmap)
+        closed = self.array('closed', mmap)
+        bulge = self.array('bulge', mmap)
+
+        bbox = None
+        if len(points):
+            (min_x, min_y), (max_x, max_y) = points.min(axis=0), points.max(axis=0)
+            bbox = {'min_x': float(min_x), 'min_y': float(min_y), 'max_x': float(max_x), 'max_y': float(max_y)}
+        flat = np.asarray(points).tolist()
+        bounds = np.asarray(offsets).tolist()
+        arcs = np.flatnonzero(np.add.reduceat(np.asarray(bulge) != 0, bounds[:-1])) if len(flat) else []
+        bulges = {int(k): np.asarray(bulge[bounds[k]:bounds[k + 1]]).tolist() for k in arcs}
+        paths = [{
+            'layer': int(layers[k]),
+            'feed': float(feed[k]),
+            'power': float(power[k]),
+            'closed': bool(closed[k]),
+            'points': flat[bounds[k]:bounds[k + 1]],
+        } for k in range(header['num_paths'])]
+        for k, values in bulges.items():
+            paths[k]['bulges'] = values
+        return {
+            'kind': header['meta'].get('kind'),
+            'layers': [layer['name'] for layer in header['layers']],
+            'num_paths': header['num_paths'],
+            'num_points': header['num_points'],
+            'bbox': bbox,
+            'paths': paths,
+        }
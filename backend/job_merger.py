@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Combinación de trabajos generados en un único programa
+Une los toolpaths de varios trabajos (.lcjob) sin sus preámbulos ni regresos al
+origen, agrupa los elementos por potencia y velocidad y los ordena para reducir
+los desplazamientos entre ellos
+"""
+
+import numpy as np
+from typing import Dict, List, Tuple
+from toolpath import Toolpath
+
+
+class JobMerger:
+    """Combinador de toolpaths de varios trabajos"""
+
+    def __init__(self, start: Tuple[float, float] = (0.0, 0.0)):
+        """
+        Inicializar combinador
+
+        Args:
+            start: Posición de la máquina al comenzar y terminar cada programa (HOME)
+        """
+        self.start = np.asarray(start, dtype=np.float64)
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Reiniciar contadores"""
+        self.sources = 0
+        self.groups = 0
+        self.layers = 0
+        self.travel_before = 0.0
+        self.travel_after = 0.0
+
+    def get_stats(self) -> Dict:
+        """
+        Obtener estadísticas de la última combinación
+
+        Returns:
+            Diccionario con trabajos, grupos y capas combinados y el desplazamiento
+            entre grupos antes (trabajos en secuencia, con regreso al origen) y después
+        """
+        return {
+            'sources': self.sources,
+            'groups': self.groups,
+            'layers': self.layers,
+            'travel_before_mm': round(self.travel_before, 3),
+            'travel_after_mm': round(self.travel_after, 3)
+        }
+
+    def _travel(self, starts: np.ndarray, ends: np.ndarray, order: np.ndarray) -> float:
+        """Desplazamiento desde el origen por los grupos en orden y de regreso al origen"""
+        if not len(order):
+            return 0.0
+        route = np.vstack([self.start, np.column_stack([starts[order], ends[order]]).reshape(-1, 2), self.start])
+        # Solo los tramos fin de grupo -> inicio del siguiente (posiciones pares -> impares)
+        jumps = route[1::2] - route[0::2]
+        return float(np.hypot(jumps[:, 0], jumps[:, 1]).sum())
+
+    def _nearest_order(self, starts: np.ndarray, ends: np.ndarray,
+                       position: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Ordenar grupos por vecino más cercano
+
+        Args:
+            starts: Inicio de cada grupo
+            ends: Final de cada grupo
+            position: Posición de partida
+
+        Returns:
+            Tupla (orden de los grupos, posición final)
+        """
+        remaining = np.ones(len(starts), dtype=bool)
+        order = np.empty(len(starts), dtype=np.int64)
+        for i in range(len(starts)):
+            distance = np.hypot(starts[:, 0] - position[0], starts[:, 1] - position[1])
+            distance[~remaining] = np.inf
+            k = int(np.argmin(distance))
+            order[i] = k
+            remaining[k] = False
+            position = ends[k]
+        return order, position
+
+    def merge(self, toolpaths: List[Toolpath], names: List[str]) -> Toolpath:
+        """
+        Combinar toolpaths en uno solo
+
+        Cada grupo (elemento, texto, corte) conserva sus paths y pasadas. Los grupos se
+        reparten en capas por potencia y velocidad, de menor a mayor potencia (grabados
+        antes que cortes), y dentro de cada capa se ordenan por vecino más cercano. Un
+        comentario "; Origen: archivo" marca cada cambio de trabajo de origen. Cada
+        grupo guarda el tipo de su trabajo de origen ('kind') para emitir sus pasadas
+        con la pausa de ese trabajo (ver LaserGCodeGenerator.generate_merged_gcode), y
+        el último grupo de cada capa de origen lleva el pie de esa capa ('footer', p. ej.
+        la pausa entre cortes).
+
+        Args:
+            toolpaths: Toolpaths de los trabajos
+            names: Nombre de cada trabajo para las anotaciones
+
+        Returns:
+            Toolpath combinado (sin metadatos de trabajo)
+        """
+        self.reset_stats()
+        combined = Toolpath.concat(toolpaths)
+        group_source = np.repeat(np.arange(len(toolpaths)), [len(tp.groups) for tp in toolpaths])
+        # Tipo de origen de cada grupo (un trabajo ya combinado conserva el de sus grupos)
+        group_kind = [group.get('kind') or tp.meta.get('kind', 'svg') for tp in toolpaths for group in tp.groups]
+        group_paths = combined.group_paths()
+        group_footer = [list(group.get('footer', [])) for group in combined.groups]
+        for layer, footer in enumerate(layer['footer'] for layer in combined.layers):
+            members = [g for g in np.flatnonzero(combined.group_layer == layer) if len(group_paths[g])]
+            if footer and members:
+                group_footer[members[-1]].extend(footer)
+        groups = np.array([g for g in range(len(combined.groups)) if len(group_paths[g])], dtype=np.int64)
+        result = Toolpath()
+        self.sources = len(toolpaths)
+        if not len(groups):
+            return result
+
+        first = np.array([group_paths[g][0] for g in groups])
+        last = np.array([group_paths[g][-1] for g in groups])
+        starts = combined.points[combined.offsets[first]]
+        # Un path cerrado termina en su primer vértice
+        ends = np.where(combined.closed[last][:, None], combined.points[combined.offsets[last]],
+                        combined.points[combined.offsets[last + 1] - 1])
+        power = np.round(combined.power[first], 3)
+        feed = np.round(combined.feed[first], 3)
+
+        # Trabajos en secuencia: cada uno parte del origen y regresa a él
+        self.travel_before = sum(self._travel(starts, ends, np.flatnonzero(group_source[groups] == s))
+                                 for s in range(len(toolpaths)))
+
+        # Capas por (potencia, velocidad), de menor a mayor potencia
+        keys, bucket = np.unique(np.column_stack([power, feed]), axis=0, return_inverse=True)
+        bucket = bucket.reshape(-1)
+        position = self.start
+        order = []
+        for b, (layer_power, layer_feed) in enumerate(keys):
+            members = np.flatnonzero(bucket == b)
+            local, position = self._nearest_order(starts[members], ends[members], position)
+            order.append(members[local])
+            name = f"Potencia {layer_power}% - {layer_feed}mm/min"
+            result.add_layer(name, header=[f"; === Capa: {name} ===",
+                                           f"; Velocidad: {layer_feed}mm/min, Potencia: {layer_power}%"])
+        order = np.concatenate(order)
+        self.travel_after = self._travel(starts, ends, order)
+
+        previous = None
+        for i in order:
+            g = groups[i]
+            source = int(group_source[g])
+            header = list(combined.groups[g]['header'])
+            if source != previous:
+                header.insert(0, f"; Origen: {names[source]}")
+                previous = source
+            result.add_group(int(bucket[i]), passes=int(combined.group_passes[g]), header=header,
+                             label=combined.groups[g]['label'])
+            result.groups[-1]['kind'] = group_kind[g]
+            if combined.groups[g].get('separator') is not None:
+                result.groups[-1]['separator'] = combined.groups[g]['separator']
+            if group_footer[g]:
+                result.groups[-1]['footer'] = group_footer[g]
+
+        # Paths en el nuevo orden de grupos
+        selected = combined.select(np.concatenate([group_paths[g] for g in groups[order]]))
+        new_group = np.empty(len(combined.groups), dtype=np.int32)
+        new_group[groups[order]] = np.arange(len(order), dtype=np.int32)
+        result.points = selected.points
+        result.bulge = selected.bulge
+        result.offsets = selected.offsets
+        result.path_group = new_group[selected.path_group]
+        result.feed = selected.feed
+        result.power = selected.power
+        result.closed = selected.closed
+        self.groups = len(order)
+        self.layers = len(keys)
+        return result
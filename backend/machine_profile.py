@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Perfil de máquina
+Parámetros cinemáticos del controlador (estilo GRBL) usados para simular y optimizar trabajos
+"""
+
+import numpy as np
+from typing import Dict, Optional
+
+# Valor máximo de la potencia S del controlador ($30 en GRBL: 100% = 1000)
+LASER_POWER_MAX_VALUE = 1000
+
+
+class MachineProfile:
+    """Perfil cinemático de la máquina láser"""
+
+    def __init__(self, max_rate: float = 6000.0, rapid_rate: float = 3000.0,
+                 acceleration: float = 500.0, junction_deviation: float = 0.01,
+                 planner_blocks: int = 16, laser_mode: bool = True,
+                 steps_per_mm: Optional[float] = None, decimals: Optional[int] = None):
+        """
+        Inicializar perfil de máquina
+
+        Args:
+            max_rate: Velocidad máxima de avance en mm/min ($110/$111 en GRBL)
+            rapid_rate: Velocidad de los movimientos rápidos G0 en mm/min
+            acceleration: Aceleración en mm/s² ($120/$121 en GRBL)
+            junction_deviation: Desviación de unión en mm ($11 en GRBL)
+            planner_blocks: Tamaño del buffer del planificador (16 en GRBL)
+            laser_mode: Modo láser activo ($32=1 en GRBL)
+            steps_per_mm: Resolución de los ejes en pasos/mm ($100/$101 en GRBL);
+                          None = sin cuantizar coordenadas
+            decimals: Decimales de las coordenadas emitidas (None = según steps_per_mm)
+        """
+        self.max_rate = max_rate
+        self.rapid_rate = rapid_rate
+        self.acceleration = acceleration
+        self.junction_deviation = junction_deviation
+        self.planner_blocks = max(2, int(planner_blocks))
+        self.laser_mode = laser_mode
+        self.steps_per_mm = steps_per_mm
+        self.decimals = decimals
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> 'MachineProfile':
+        """
+        Crear perfil desde un diccionario (p. ej. el cuerpo JSON de una petición)
+
+        Args:
+            data: Diccionario con los parámetros del perfil (opcional)
+
+        Returns:
+            Perfil de máquina
+        """
+        profile = cls()
+        if not data:
+            return profile
+        for key in ('max_rate', 'rapid_rate', 'acceleration', 'junction_deviation'):
+            if key in data:
+                setattr(profile, key, float(data[key]))
+        if 'planner_blocks' in data:
+            profile.planner_blocks = max(2, int(data['planner_blocks']))
+        if 'laser_mode' in data:
+            profile.laser_mode = bool(data['laser_mode'])
+        if data.get('steps_per_mm'):
+            profile.steps_per_mm = float(data['steps_per_mm'])
+        if data.get('decimals') is not None:
+            profile.decimals = int(data['decimals'])
+        return profile
+
+    def to_dict(self) -> Dict:
+        """Convertir perfil a diccionario serializable"""
+        return {
+            'max_rate': self.max_rate,
+            'rapid_rate': self.rapid_rate,
+            'acceleration': self.acceleration,
+            'junction_deviation': self.junction_deviation,
+            'planner_blocks': self.planner_blocks,
+            'laser_mode': self.laser_mode,
+            'steps_per_mm': self.steps_per_mm,
+            'decimals': self.output_decimals()
+        }
+
+    def output_decimals(self) -> int:
+        """
+        Decimales necesarios para representar la resolución de los ejes
+
+        Se usa el menor número de decimales que representa exactamente la rejilla de
+        pasos (10^d múltiplo de pasos/mm) o, si no existe, el primero cuya mitad de
+        resolución es menor que medio paso, de modo que el controlador recupera el
+        mismo paso al redondear.
+
+        Returns:
+            Número de decimales (3 si no hay resolución configurada)
+        """
+        if self.decimals is not None:
+            return self.decimals
+        if not self.steps_per_mm:
+            return 3
+        steps = self.steps_per_mm
+        for d in range(0, 7):
+            scaled = 10 ** d / steps
+            if abs(scaled - round(scaled)) < 1e-9 or 10 ** d > steps:
+                return d
+        return 6
+
+    def quantize(self, values: np.ndarray) -> np.ndarray:
+        """
+        Redondear coordenadas a la rejilla de pasos de la máquina
+
+        Args:
+            values: Array de coordenadas en mm
+
+        Returns:
+            Coordenadas cuantizadas (sin cambios si no hay resolución configurada)
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if not self.steps_per_mm:
+            return values
+        # + 0.0 evita imprimir "-0.000"
+        return np.round(values * self.steps_per_mm) / self.steps_per_mm + 0.0
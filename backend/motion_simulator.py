@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Simulador de movimiento y estimador de tiempo de trabajo
+Modela el planificador de GRBL (aceleración trapezoidal, desviación de unión,
+buffer de bloques limitado) de forma vectorizada sobre los movimientos del G-code
+"""
+
+import numpy as np
+from typing import Dict, Optional
+from gcode_parser import GCodeParser, arc_sweep, MOTION_RAPID, MOTION_CW, MOTION_CCW
+from machine_profile import MachineProfile
+
+
+class MotionSimulator:
+    """Simulador cinemático de trabajos láser"""
+
+    def __init__(self, profile: Optional[MachineProfile] = None):
+        """
+        Inicializar simulador
+
+        Args:
+            profile: Perfil de máquina (usa valores por defecto si no se especifica)
+        """
+        self.profile = profile or MachineProfile()
+        self.parser = GCodeParser()
+
+    def estimate_file(self, filepath: str) -> Dict:
+        """
+        Estimar el tiempo de un archivo G-code leyéndolo por bloques
+
+        Args:
+            filepath: Ruta al archivo G-code
+
+        Returns:
+            Diccionario con la estimación (ver _finish)
+        """
+        run = self._new_run()
+        for chunk in self.parser.iter_file(filepath):
+            self._consume_chunk(run, chunk)
+        return self._finish(run)
+
+    def estimate_gcode(self, gcode: str) -> Dict:
+        """
+        Estimar el tiempo de un programa G-code en memoria
+
+        Args:
+            gcode: Contenido G-code
+
+        Returns:
+            Diccionario con la estimación (ver _finish)
+        """
+        run = self._new_run()
+        for chunk in self.parser.iter_text(gcode):
+            self._consume_chunk(run, chunk)
+        return self._finish(run)
+
+    def estimate_moves(self, moves: Dict, dwell: float = 0.0) -> Dict:
+        """
+        Estimar el tiempo directamente desde arrays de movimientos (sin G-code)
+
+        Args:
+            moves: Dict de arrays con las claves type, x0, y0, x, y, cx, cy,
+                   feed (mm/min), power, spindle y sync (mismo formato que GCodeParser)
+            dwell: Segundos de pausa adicionales
+
+        Returns:
+            Diccionario con la estimación (ver _finish)
+        """
+        run = self._new_run()
+        self._consume_chunk(run, {'lines': 0, 'moves': moves, 'dwell': dwell})
+        return self._finish(run)
+
+    def _new_run(self) -> Dict:
+        """Crear el acumulador de una simulación"""
+        return {
+            'lines': 0,
+            'blocks': 0,
+            'dwell': 0.0,
+            'cut_distance': 0.0,
+            'travel_distance': 0.0,
+            'cut_time': 0.0,
+            'travel_time': 0.0,
+            'laser_on_time': 0.0,
+            'naive_time': 0.0,
+            'pending': None,     # Bloques aún sin planificar (ventana de anticipación)
+            'entry': 0.0,        # Velocidad² de entrada del primer bloque pendiente
+            'last_dir': None,    # Dirección final del último bloque recibido
+            'last_speed': 0.0,   # Velocidad nominal del último bloque recibido
+        }
+
+    def _block_geometry(self, moves: Dict):
+        """
+        Calcular longitud y tangentes inicial/final de cada movimiento
+
+        Returns:
+            Tupla (longitud, dirección_inicial, dirección_final)
+        """
+        mtype = moves['type']
+        dx = moves['x'] - moves['x0']
+        dy = moves['y'] - moves['y0']
+        length = np.hypot(dx, dy)
+        safe = np.where(length > 0, length, 1.0)
+        start_dir = np.column_stack([dx / safe, dy / safe])
+        end_dir = start_dir.copy()
+
+        arcs = (mtype == MOTION_CW) | (mtype == MOTION_CCW)
+        if np.any(arcs):
+            ccw = mtype[arcs] == MOTION_CCW
+            sx = moves['x0'][arcs] - moves['cx'][arcs]
+            sy = moves['y0'][arcs] - moves['cy'][arcs]
+            ex = moves['x'][arcs] - moves['cx'][arcs]
+            ey = moves['y'][arcs] - moves['cy'][arcs]
+            radius, _, sweep = arc_sweep(moves, arcs)
+            length[arcs] = np.abs(sweep) * radius
+            sign = np.where(ccw, 1.0, -1.0)
+            safe_r = np.where(radius > 0, radius, 1.0)
+            end_r = np.where(np.hypot(ex, ey) > 0, np.hypot(ex, ey), 1.0)
+            start_dir[arcs] = np.column_stack([-sy * sign / safe_r, sx * sign / safe_r])
+            end_dir[arcs] = np.column_stack([-ey * sign / end_r, ex * sign / end_r])
+
+        return length, start_dir, end_dir
+
+    def _consume_chunk(self, run: Dict, chunk: Dict) -> None:
+        """Acumular distancias de un bloque parseado y planificar los bloques completos"""
+        profile = self.profile
+        run['lines'] += chunk['lines']
+        run['dwell'] += chunk['dwell']
+        moves = chunk['moves']
+        if len(moves['type']) == 0:
+            return
+
+        length, start_dir, end_dir = self._block_geometry(moves)
+        keep = length > 1e-9
+        mtype = moves['type'][keep]
+        length = length[keep]
+        start_dir = start_dir[keep]
+        end_dir = end_dir[keep]
+        sync = moves['sync'][keep]
+        # Una sincronización en un movimiento nulo se transfiere al siguiente
+        dropped_sync = np.cumsum(moves['sync'] & ~keep)
+        sync = sync | (np.diff(np.concatenate(([0], dropped_sync[keep]))) > 0)
+        if length.size == 0:
+            return
+
+        rapid = mtype == MOTION_RAPID
+        feed = np.where(rapid, profile.rapid_rate,
+                        np.minimum(np.where(moves['feed'][keep] > 0, moves['feed'][keep], profile.max_rate),
+                                   profile.max_rate))
+        speed = feed / 60.0
+        emitting = ~rapid & (moves['spindle'][keep] != 5) & (moves['power'][keep] > 0)
+        if not profile.laser_mode:
+            # Sin modo láser, M3 mantiene el haz encendido también en G0
+            emitting = emitting | ((moves['spindle'][keep] != 5) & (moves['power'][keep] > 0))
+
+        # Velocidad² máxima en la unión con el bloque anterior (desviación de unión)
+        prev_dir = np.vstack([run['last_dir'] if run['last_dir'] is not None else start_dir[:1] * 0,
+                              end_dir[:-1]])
+        prev_speed = np.concatenate(([run['last_speed']], speed[:-1]))
+        cos_theta = -np.sum(prev_dir * start_dir, axis=1)
+        sin_half = np.sqrt(np.clip(0.5 * (1.0 - cos_theta), 0.0, 1.0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            junction = profile.acceleration * profile.junction_deviation * sin_half / (1.0 - sin_half)
+        junction = np.where(sin_half >= 0.999999, np.inf, junction)
+        junction = np.where(cos_theta >= 0.999999, 0.0, junction)
+        junction = np.minimum(junction, np.minimum(prev_speed, speed) ** 2)
+        junction[sync] = 0.0
+        if run['last_dir'] is None:
+            junction[0] = 0.0
+
+        run['last_dir'] = end_dir[-1]
+        run['last_speed'] = speed[-1]
+
+        # Contabilidad de distancias
+        cut_length = np.where(emitting & ~rapid, length, 0.0)
+        run['cut_distance'] += float(cut_length.sum())
+        run['travel_distance'] += float(length.sum() - cut_length.sum())
+        run['naive_time'] += float(np.sum(length / speed))
+        run['blocks'] += int(length.size)
+
+        block = {
+            'length': length,
+            'speed': speed,
+            'junction': junction,
+            'rapid': rapid,
+            'emitting': emitting,
+        }
+        if run['pending'] is not None:
+            block = {k: np.concatenate([run['pending'][k], v]) for k, v in block.items()}
+        run['pending'] = block
+        self._plan(run, final=False)
+
+    def _plan(self, run: Dict, final: bool) -> None:
+        """
+        Planificar los bloques pendientes cuya ventana de anticipación está completa
+
+        Cada bloque se ejecuta con la velocidad que permite el buffer del planificador:
+        solo ve los siguientes `planner_blocks` bloques y debe poder detenerse al final
+        de ellos. Las pasadas hacia atrás y hacia adelante de GRBL se resuelven en forma
+        cerrada con mínimos acumulados sobre v² (sin bucles por bloque).
+        """
+        block = run['pending']
+        if block is None:
+            return
+        n = block['length'].size
+        window = self.profile.planner_blocks
+        ready = n if final else n - window
+        if ready <= 0:
+            return
+
+        accel = self.profile.acceleration
+        length = block['length']
+        speed = block['speed']
+        # S[k] = 2·a·(distancia acumulada antes del bloque k)
+        prefix = np.concatenate(([0.0], np.cumsum(2.0 * accel * length)))
+
+        # Pasada hacia atrás con ventana: v²_entrada[k] <= J[m] + S[m] - S[k] para m en
+        # la ventana y parada obligatoria al final del buffer
+        limits = block['junction'] + prefix[:-1]
+        padded = np.concatenate([limits, np.full(window, np.inf)])
+        windowed = np.lib.stride_tricks.sliding_window_view(padded, window)[:n].min(axis=1)
+        stop_idx = np.minimum(np.arange(n) + window, n)
+        backward = np.minimum(windowed, prefix[stop_idx]) - prefix[:-1]
+        backward = np.minimum(backward, speed ** 2)
+        backward[0] = min(backward[0], run['entry'])
+
+        # Pasada hacia adelante: v²_entrada[k] <= v²_entrada[k-1] + 2·a·L[k-1]
+        entry = prefix[:-1] + np.minimum.accumulate(backward - prefix[:-1])
+        entry = np.maximum(entry, 0.0)
+        exit_ = np.concatenate([entry[1:], [0.0]])
+
+        # Tiempo de cada bloque con perfil trapezoidal
+        sel = slice(0, ready)
+        v_entry = np.sqrt(entry[sel])
+        v_exit = np.sqrt(exit_[sel])
+        v_nom = np.maximum(speed[sel], np.maximum(v_entry, v_exit))
+        dist = length[sel]
+        d_accel = (v_nom ** 2 - v_entry ** 2) / (2.0 * accel)
+        d_decel = (v_nom ** 2 - v_exit ** 2) / (2.0 * accel)
+        cruise = d_accel + d_decel <= dist
+        t_cruise = (v_nom - v_entry) / accel + (v_nom - v_exit) / accel + \
+            np.maximum(dist - d_accel - d_decel, 0.0) / v_nom
+        v_peak = np.sqrt(np.maximum((2.0 * accel * dist + v_entry ** 2 + v_exit ** 2) / 2.0, 0.0))
+        t_peak = (v_peak - v_entry) / accel + (v_peak - v_exit) / accel
+        times = np.where(cruise, t_cruise, t_peak)
+
+        emitting = block['emitting'][sel]
+        rapid = block['rapid'][sel]
+        cut = emitting & ~rapid
+        run['cut_time'] += float(times[cut].sum())
+        run['travel_time'] += float(times[~cut].sum())
+        run['laser_on_time'] += float(times[emitting].sum())
+
+        if ready < n:
+            run['pending'] = {k: v[ready:] for k, v in block.items()}
+            run['entry'] = float(entry[ready])
+        else:
+            run['pending'] = None
+            run['entry'] = 0.0
+
+    def _finish(self, run: Dict) -> Dict:
+        """
+        Planificar los bloques restantes y construir el resultado
+
+        Returns:
+            Diccionario con tiempo estimado, distancias de corte/desplazamiento y
+            tiempo de láser encendido
+        """
+        self._plan(run, final=True)
+        total = run['cut_time'] + run['travel_time'] + run['dwell']
+        cut_feed = run['cut_distance'] / run['cut_time'] * 60.0 if run['cut_time'] > 0 else 0.0
+        return {
+            'estimated_time_s': round(total, 3),
+            'estimated_time': self.format_duration(total),
+            'cut_time_s': round(run['cut_time'], 3),
+            'travel_time_s': round(run['travel_time'], 3),
+            'dwell_time_s': round(run['dwell'], 3),
+            'laser_on_time_s': round(run['laser_on_time'], 3),
+            'cut_distance_mm': round(run['cut_distance'], 3),
+            'travel_distance_mm': round(run['travel_distance'], 3),
+            'average_cut_feed': round(cut_feed, 1),
+            'naive_time_s': round(run['naive_time'] + run['dwell'], 3),
+            'motion_blocks': run['blocks'],
+            'total_lines': run['lines'],
+            'machine_profile': self.profile.to_dict()
+        }
+
+    @staticmethod
+    def format_duration(seconds: float) -> str:
+        """Formatear segundos como HH:MM:SS"""
+        seconds = int(round(seconds))
+        return f"{seconds // 3600:02d}:{(seconds % 3600) // 60:02d}:{seconds % 60:02d}"
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Simplificación de trayectorias consciente del planificador
+Elimina micro-segmentos y puntos colineales antes de emitir el G-code para que el
+buffer de bloques del controlador no se quede sin distancia de anticipación
+"""
+
+import numpy as np
+from typing import Dict, Optional
+from machine_profile import MachineProfile
+
+
+class PathSimplifier:
+    """Simplificador de polilíneas (Ramer-Douglas-Peucker vectorizado + longitud mínima)"""
+
+    def __init__(self, tolerance: float = 0.02, profile: Optional[MachineProfile] = None):
+        """
+        Inicializar simplificador
+
+        Args:
+            tolerance: Desviación máxima permitida respecto a la polilínea original en mm
+            profile: Perfil de máquina usado para calcular la longitud mínima de segmento
+        """
+        self.tolerance = tolerance
+        self.profile = profile or MachineProfile()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Reiniciar contadores"""
+        self.input_segments = 0
+        self.output_segments = 0
+        self.max_min_segment = 0.0
+
+    def get_stats(self) -> Dict:
+        """
+        Obtener estadísticas acumuladas de la simplificación
+
+        Returns:
+            Diccionario con segmentos de entrada/salida y eliminados
+        """
+        return {
+            'input_segments': self.input_segments,
+            'output_segments': self.output_segments,
+            'segments_removed': self.input_segments - self.output_segments,
+            'tolerance': self.tolerance,
+            'min_segment_length': round(self.max_min_segment, 4)
+        }
+
+    def min_segment_length(self, feed: float) -> float:
+        """
+        Longitud mínima de segmento para sostener un avance con el buffer del planificador
+
+        Para frenar desde v hasta 0 el planificador necesita v²/(2a) de distancia dentro
+        de sus N bloques; con segmentos más cortos la máquina avanza por debajo de F.
+
+        Args:
+            feed: Velocidad programada en mm/min
+
+        Returns:
+            Longitud mínima en mm
+        """
+        profile = self.profile
+        v = min(feed, profile.max_rate) / 60.0
+        return v * v / (2.0 * profile.acceleration * (profile.planner_blocks - 1))
+
+    def _segment_distance(self, points: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Distancia de cada punto al segmento a-b correspondiente"""
+        ab = b - a
+        length2 = np.einsum('ij,ij->i', ab, ab)
+        t = np.einsum('ij,ij->i', points - a, ab) / np.where(length2 > 0, length2, 1.0)
+        t = np.clip(t, 0.0, 1.0)
+        closest = a + t[:, None] * ab
+        return np.hypot(*(points - closest).T)
+
+    def _refine(self, points: np.ndarray, keep: np.ndarray, tolerance: float) -> np.ndarray:
+        """
+        Agregar vértices hasta que todos los puntos queden dentro de la tolerancia
+
+        Cada iteración procesa todos los tramos a la vez y divide cada tramo que
+        excede la tolerancia en su punto más alejado (Douglas-Peucker por niveles).
+
+        Args:
+            points: Array (n, 2) de puntos
+            keep: Máscara de vértices iniciales (incluye primero y último)
+            tolerance: Desviación máxima en mm
+
+        Returns:
+            Máscara de vértices conservados
+        """
+        n = len(points)
+        positions = np.arange(n)
+        while True:
+            kept = np.flatnonzero(keep)
+            span = np.minimum(np.searchsorted(kept, positions, side='right') - 1, len(kept) - 2)
+            dist = self._segment_distance(points, points[kept[span]], points[kept[span + 1]])
+            dist[keep] = 0.0
+            worst = np.maximum.reduceat(dist, kept[:-1])
+            split = (dist > tolerance) & (dist == worst[span])
+            if not np.any(split):
+                return keep
+            # Un único punto por tramo (el primero con la desviación máxima)
+            candidates = np.flatnonzero(split)
+            _, first = np.unique(span[candidates], return_index=True)
+            keep[candidates[first]] = True
+
+    def simplify(self, points: np.ndarray, feed: float) -> np.ndarray:
+        """
+        Simplificar una polilínea de corte
+
+        Args:
+            points: Array (n, 2) de puntos; el primero es la posición inicial
+            feed: Velocidad de corte en mm/min
+
+        Returns:
+            Array (m, 2) con los puntos conservados (mismo inicio y final)
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        n = len(points)
+        self.input_segments += max(0, n - 1)
+        if n < 3:
+            self.output_segments += max(0, n - 1)
+            return points
+
+        # Puntos duplicados consecutivos
+        moved = np.concatenate(([True], np.any(points[1:] != points[:-1], axis=1)))
+        moved[-1] = True
+        points = points[moved]
+        n = len(points)
+
+        # Ramer-Douglas-Peucker (con tolerancia 0 solo fusiona puntos colineales)
+        tolerance = max(self.tolerance, 1e-9)
+        keep = np.zeros(n, dtype=bool)
+        keep[[0, -1]] = True
+        keep = self._refine(points, keep, tolerance)
+
+        # Longitud mínima de segmento: conservar un vértice por cada tramo de
+        # longitud mínima y volver a refinar donde se pierda la tolerancia
+        min_length = self.min_segment_length(feed)
+        self.max_min_segment = max(self.max_min_segment, min_length)
+        kept = np.flatnonzero(keep)
+        if min_length > 0 and len(kept) > 2:
+            steps = np.hypot(*np.diff(points[kept], axis=0).T)
+            bucket = np.floor(np.concatenate(([0.0], np.cumsum(steps))) / min_length)
+            coarse = np.concatenate(([True], bucket[1:] != bucket[:-1]))
+            coarse[-1] = True
+            if not np.all(coarse):
+                keep = np.zeros(n, dtype=bool)
+                keep[kept[coarse]] = True
+                keep = self._refine(points, keep, tolerance)
+
+        result = points[keep]
+        self.output_segments += len(result) - 1
+        return result
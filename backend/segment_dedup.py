@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Eliminación de segmentos repetidos y solapados
+Los SVG exportados desde CAD (FreeCAD, conversiones DXF) repiten aristas: el lado
+común de dos piezas contiguas o contornos duplicados. Los segmentos con los mismos
+extremos cuantizados se detectan con un hash y los tramos rectos colineales que se
+solapan con un R-tree sobre sus cajas, de modo que cada tramo se corta una sola vez
+"""
+
+import numpy as np
+from typing import Dict, Optional, Tuple
+from spatial_index import SpatialIndex
+
+
+class SegmentDeduplicator:
+    """Detector de segmentos ya cortados por otro segmento anterior"""
+
+    def __init__(self, tolerance: float):
+        """
+        Inicializar detector
+
+        Args:
+            tolerance: Distancia en mm por debajo de la cual dos segmentos coinciden
+        """
+        self.tolerance = max(float(tolerance), 1e-9)
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Reiniciar contadores"""
+        self.input_segments = 0
+        self.segments_removed = 0
+        self.segments_trimmed = 0
+        self.removed_length = 0.0
+        self.saved_length = 0.0
+
+    def get_stats(self) -> Dict:
+        """
+        Obtener estadísticas acumuladas
+
+        Returns:
+            Diccionario con los segmentos eliminados o recortados, la longitud de
+            geometría eliminada y la longitud de corte ahorrada (con pasadas)
+        """
+        return {
+            'tolerance': self.tolerance,
+            'input_segments': self.input_segments,
+            'segments_removed': self.segments_removed,
+            'segments_trimmed': self.segments_trimmed,
+            'removed_length_mm': round(self.removed_length, 3),
+            'cut_length_saved_mm': round(self.saved_length, 3)
+        }
+
+    def _duplicates(self, start: np.ndarray, end: np.ndarray, bulge: np.ndarray,
+                    kind: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Segmentos iguales a uno anterior según sus extremos cuantizados
+
+        La clave de cada segmento es su tipo, sus extremos en la rejilla de la
+        tolerancia en orden canónico (un segmento recorrido al revés coincide) y la
+        flecha del arco cuantizada (0 en las rectas).
+
+        Returns:
+            Tupla (repetidos, degenerados): máscaras de los segmentos que repiten uno
+            anterior y de los que empiezan y terminan en la misma celda
+        """
+        q0 = np.round(start / self.tolerance).astype(np.int64)
+        q1 = np.round(end / self.tolerance).astype(np.int64)
+        degenerate = np.all(q0 == q1, axis=1)
+        swap = (q0[:, 0] > q1[:, 0]) | ((q0[:, 0] == q1[:, 0]) & (q0[:, 1] > q1[:, 1]))
+        low = np.where(swap[:, None], q1, q0)
+        high = np.where(swap[:, None], q0, q1)
+        chord = np.hypot(*(end - start).T)
+        sagitta = np.round(np.where(swap, -bulge, bulge) * chord / 2 / self.tolerance).astype(np.int64)
+
+        duplicate = np.zeros(len(start), dtype=bool)
+        ids = np.flatnonzero(~degenerate)
+        if len(ids):
+            keys = np.column_stack([kind[ids], low[ids], high[ids], sagitta[ids]])
+            _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+            duplicate[ids] = first[inverse.reshape(-1)] != np.arange(len(ids))
+        return duplicate, degenerate
+
+    def _overlaps(self, start: np.ndarray, end: np.ndarray, kind: np.ndarray,
+                  ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Tramos de cada recta cubiertos por rectas colineales anteriores
+
+        Dos rectas son colineales si los extremos de la más corta están a menos de
+        la tolerancia de la línea de la más larga; el solape se mide proyectando
+        ambas sobre esa línea.
+
+        Args:
+            ids: Índices de las rectas candidatas, en orden de corte
+
+        Returns:
+            Tupla (segmento, t0, t1) con cada intervalo cubierto en el parámetro
+            (0..1) del segmento, ordenados por segmento y t0
+        """
+        tol = self.tolerance
+        a, b = start[ids], end[ids]
+        boxes = np.column_stack([np.minimum(a, b) - tol, np.maximum(a, b) + tol])
+        query, other = SpatialIndex(boxes).search_all(boxes)
+        # Solo cubren los segmentos anteriores con los mismos parámetros de corte
+        valid = (other < query) & (kind[ids[other]] == kind[ids[query]])
+        query, other = query[valid], other[valid]
+
+        qa, qb, oa, ob = a[query], b[query], a[other], b[other]
+        q_length = np.hypot(*(qb - qa).T)
+        o_length = np.hypot(*(ob - oa).T)
+        query_longer = q_length >= o_length
+        origin = np.where(query_longer[:, None], qa, oa)
+        axis = np.where(query_longer[:, None], qb - qa, ob - oa)
+        axis = axis / np.maximum(np.maximum(q_length, o_length), 1e-300)[:, None]
+        short_a = np.where(query_longer[:, None], oa, qa)
+        short_b = np.where(query_longer[:, None], ob, qb)
+
+        def offset(p):
+            return np.abs(axis[:, 0] * (p[:, 1] - origin[:, 1]) - axis[:, 1] * (p[:, 0] - origin[:, 0]))
+
+        def along(p):
+            return np.einsum('ij,ij->i', p - origin, axis)
+
+        collinear = (offset(short_a) <= tol) & (offset(short_b) <= tol)
+        u0, u1 = along(qa), along(qb)
+        v0, v1 = along(oa), along(ob)
+        low = np.maximum(np.minimum(u0, u1), np.minimum(v0, v1))
+        high = np.minimum(np.maximum(u0, u1), np.maximum(v0, v1))
+        span = u1 - u0
+        # Una consulta más corta que la tolerancia puede quedar perpendicular al eje:
+        # está cubierta por completo si su proyección cae dentro de la otra recta
+        flat = np.abs(span) <= 1e-12
+        covered = collinear & np.where(flat, high >= low, high > low)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ta = np.where(flat, 0.0, (low - u0) / np.where(flat, 1.0, span))
+            tb = np.where(flat, 1.0, (high - u0) / np.where(flat, 1.0, span))
+        t0 = np.clip(np.minimum(ta, tb), 0.0, 1.0)
+        t1 = np.clip(np.maximum(ta, tb), 0.0, 1.0)
+        # Los solapes no mayores que la tolerancia (extremos de rectas que continúan
+        # una a otra) no cuentan, salvo que cubran el segmento entero
+        covered &= ((t1 - t0) * q_length > tol) | ((t0 == 0.0) & (t1 == 1.0))
+        t0, t1 = t0[covered], t1[covered]
+        segment = ids[query[covered]]
+        order = np.lexsort((t0, segment))
+        return segment[order], t0[order], t1[order]
+
+    def pieces(self, start: np.ndarray, end: np.ndarray, bulge: np.ndarray, kind: np.ndarray,
+               lengths: np.ndarray, passes: Optional[np.ndarray] = None
+               ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Tramos de cada segmento que ningún segmento anterior cubre
+
+        Los segmentos se consideran en orden de corte: el primero de un grupo de
+        segmentos repetidos se conserva y los siguientes se eliminan. Las rectas
+        conservan los tramos no cubiertos más largos que la tolerancia; los arcos solo
+        se eliminan si repiten otro arco.
+
+        Args:
+            start: Array (n, 2) con el inicio de cada segmento
+            end: Array (n, 2) con el final de cada segmento
+            bulge: Bulge de cada segmento (0 = recta)
+            kind: Entero por segmento; solo se comparan segmentos del mismo tipo
+                  (p. ej. misma capa, velocidad y potencia)
+            lengths: Longitud de cada segmento en mm
+            passes: Pasadas de cada segmento, para la longitud de corte ahorrada
+
+        Returns:
+            Tupla (segmento, t0, t1) de los tramos conservados, ordenados por segmento
+            y t0 (un segmento sin cambios aparece una vez con t0 = 0, t1 = 1)
+        """
+        start = np.asarray(start, dtype=np.float64).reshape(-1, 2)
+        end = np.asarray(end, dtype=np.float64).reshape(-1, 2)
+        bulge = np.asarray(bulge, dtype=np.float64).reshape(-1)
+        kind = np.asarray(kind, dtype=np.int64).reshape(-1)
+        lengths = np.asarray(lengths, dtype=np.float64).reshape(-1)
+        passes = np.ones(len(start)) if passes is None else np.asarray(passes, dtype=np.float64)
+        n = len(start)
+        self.input_segments += n
+
+        duplicate, degenerate = self._duplicates(start, end, bulge, kind)
+        lines = np.flatnonzero((bulge == 0) & ~degenerate & ~duplicate)
+        segment, t0, t1 = self._overlaps(start, end, kind, lines)
+
+        # Huecos entre la unión de los intervalos cubiertos de cada segmento
+        first = np.concatenate(([True], segment[1:] != segment[:-1])) if len(segment) else np.zeros(0, bool)
+        group = np.cumsum(first) - 1
+        reach = np.maximum.accumulate(t1 + group) - group
+        previous = np.where(first, 0.0, np.concatenate(([0.0], reach[:-1])))
+        last = np.concatenate((first[1:], [True])) if len(segment) else np.zeros(0, bool)
+        gap_segment = np.concatenate([segment, segment[last]])
+        gap_t0 = np.concatenate([previous, reach[last]])
+        gap_t1 = np.concatenate([t0, np.ones(np.count_nonzero(last))])
+        kept = (gap_t1 - gap_t0) * lengths[gap_segment] > self.tolerance
+        gap_segment, gap_t0, gap_t1 = gap_segment[kept], gap_t0[kept], gap_t1[kept]
+
+        untouched = ~duplicate
+        untouched[segment] = False
+        whole = np.flatnonzero(untouched)
+        result_segment = np.concatenate([whole, gap_segment])
+        result_t0 = np.concatenate([np.zeros(len(whole)), gap_t0])
+        result_t1 = np.concatenate([np.ones(len(whole)), gap_t1])
+        order = np.lexsort((result_t0, result_segment))
+        result_segment, result_t0, result_t1 = result_segment[order], result_t0[order], result_t1[order]
+
+        kept_fraction = np.bincount(result_segment, weights=result_t1 - result_t0, minlength=n)
+        removed = lengths * np.clip(1.0 - kept_fraction, 0.0, 1.0)
+        trimmed = np.zeros(n, dtype=bool)
+        trimmed[segment] = True
+        has_pieces = np.bincount(result_segment, minlength=n) > 0
+        self.segments_removed += int(np.count_nonzero(~has_pieces))
+        self.segments_trimmed += int(np.count_nonzero(trimmed & has_pieces))
+        self.removed_length += float(removed.sum())
+        self.saved_length += float((removed * passes).sum())
+        return result_segment, result_t0, result_t1
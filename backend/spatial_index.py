@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice espacial de elementos SVG
+R-tree estático empaquetado sobre las cajas envolventes de los elementos: las cajas
+se ordenan por el valor de Hilbert de su centro y se agrupan en nodos de tamaño fijo,
+de modo que una consulta por región o por punto recorre solo las ramas que la cortan
+"""
+
+import numpy as np
+from typing import Sequence, Tuple
+
+# Resolución de la curva de Hilbert (coordenadas de 16 bits)
+_HILBERT_MAX = 0xFFFF
+
+
+def _hilbert(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Posición en la curva de Hilbert de puntos de una rejilla de 2^16 x 2^16
+
+    Args:
+        x: Coordenadas x enteras (uint32, 0..65535)
+        y: Coordenadas y enteras (uint32, 0..65535)
+
+    Returns:
+        Array uint32 con la distancia de cada punto a lo largo de la curva
+    """
+    a = x ^ y
+    b = _HILBERT_MAX ^ a
+    c = _HILBERT_MAX ^ (x | y)
+    d = x & (y ^ _HILBERT_MAX)
+
+    A = a | (b >> 1)
+    B = (a >> 1) ^ a
+    C = ((c >> 1) ^ (b & (d >> 1))) ^ c
+    D = ((a & (c >> 1)) ^ (d >> 1)) ^ d
+
+    for shift in (2, 4):
+        a, b, c, d = A, B, C, D
+        A = (a & (a >> shift)) ^ (b & (b >> shift))
+        B = (a & (b >> shift)) ^ (b & ((a ^ b) >> shift))
+        C = C ^ (a & (c >> shift)) ^ (b & (d >> shift))
+        D = D ^ (b & (c >> shift)) ^ ((a ^ b) & (d >> shift))
+
+    a, b, c, d = A, B, C, D
+    C = C ^ (a & (c >> 8)) ^ (b & (d >> 8))
+    D = D ^ (b & (c >> 8)) ^ ((a ^ b) & (d >> 8))
+
+    a = C ^ (C >> 1)
+    b = D ^ (D >> 1)
+    i0 = x ^ y
+    i1 = b | (_HILBERT_MAX ^ (i0 | a))
+
+    # Intercalar los bits de i0 e i1
+    result = []
+    for value in (i0, i1):
+        value = (value | (value << 8)) & 0x00FF00FF
+        value = (value | (value << 4)) & 0x0F0F0F0F
+        value = (value | (value << 2)) & 0x33333333
+        value = (value | (value << 1)) & 0x55555555
+        result.append(value)
+    return (result[1] << 1) | result[0]
+
+
+def polyline_distance(points: np.ndarray, x: float, y: float, filled: bool = False) -> float:
+    """
+    Distancia de un punto a una polilínea
+
+    Args:
+        points: Vértices (n, 2) de la polilínea
+        x, y: Punto de consulta
+        filled: Considerar la polilínea como contorno cerrado relleno (distancia 0
+                si el punto está dentro según la regla par-impar)
+
+    Returns:
+        Distancia mínima (inf si no hay vértices)
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if not len(points):
+        return float('inf')
+    if len(points) == 1:
+        return float(np.hypot(points[0, 0] - x, points[0, 1] - y))
+    start, end = points[:-1], points[1:]
+    if filled:
+        start, end = points, np.roll(points, -1, axis=0)
+        crosses = (start[:, 1] > y) != (end[:, 1] > y)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            at = start[:, 0] + (y - start[:, 1]) * (end[:, 0] - start[:, 0]) / (end[:, 1] - start[:, 1])
+        if np.count_nonzero(crosses & (x < at)) % 2:
+            return 0.0
+    direction = end - start
+    length2 = np.einsum('ij,ij->i', direction, direction)
+    offset = np.array([x, y]) - start
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.clip(np.einsum('ij,ij->i', offset, direction) / length2, 0.0, 1.0)
+    t = np.where(length2 > 0, t, 0.0)
+    nearest = start + t[:, None] * direction
+    return float(np.hypot(nearest[:, 0] - x, nearest[:, 1] - y).min())
+
+
+class SpatialIndex:
+    """
+    R-tree estático empaquetado (construcción en bloque, solo lectura)
+
+    Cada nivel es un array (m, 4) de cajas [xmin, ymin, xmax, ymax]; el nodo j de un
+    nivel agrupa los nodos j*node_size .. (j+1)*node_size - 1 del nivel inferior.
+    Las consultas descienden nivel a nivel filtrando todos los nodos candidatos a la
+    vez, con coste O(log n + k) para k resultados. Las cajas con NaN (elementos sin
+    geometría) se indexan pero nunca coinciden con una consulta.
+    """
+
+    def __init__(self, boxes: Sequence, node_size: int = 16):
+        """
+        Construir el índice
+
+        Args:
+            boxes: Cajas envolventes (n, 4) [xmin, ymin, xmax, ymax]
+            node_size: Hijos por nodo
+        """
+        boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        self.size = len(boxes)
+        self.node_size = max(2, int(node_size))
+        self._ids = self._hilbert_order(boxes)
+        level = boxes[self._ids]
+        self._levels = [level]
+        while len(level) > 1:
+            starts = np.arange(0, len(level), self.node_size)
+            # fmin/fmax ignoran las cajas NaN salvo que todo el nodo lo sea
+            level = np.column_stack([
+                np.fmin.reduceat(level[:, 0], starts),
+                np.fmin.reduceat(level[:, 1], starts),
+                np.fmax.reduceat(level[:, 2], starts),
+                np.fmax.reduceat(level[:, 3], starts)
+            ])
+            self._levels.append(level)
+
+    @staticmethod
+    def _hilbert_order(boxes: np.ndarray) -> np.ndarray:
+        """Orden de las cajas según el valor de Hilbert de su centro"""
+        if not len(boxes):
+            return np.zeros(0, dtype=np.int64)
+        centers = np.column_stack([boxes[:, 0] + boxes[:, 2], boxes[:, 1] + boxes[:, 3]]) / 2
+        valid = np.all(np.isfinite(centers), axis=1)
+        if not valid.any():
+            return np.arange(len(boxes))
+        low = centers[valid].min(axis=0)
+        span = np.maximum(centers[valid].max(axis=0) - low, 1e-12)
+        grid = np.where(valid[:, None], (centers - low) / span * _HILBERT_MAX, 0.0)
+        grid = np.clip(grid, 0, _HILBERT_MAX).astype(np.uint32)
+        return np.argsort(_hilbert(grid[:, 0], grid[:, 1]), kind='stable')
+
+    def search(self, xmin: float, ymin: float, xmax: float, ymax: float) -> np.ndarray:
+        """
+        Elementos cuya caja corta una región
+
+        Args:
+            xmin, ymin, xmax, ymax: Región de consulta
+
+        Returns:
+            Índices de los elementos (int64) en orden de documento
+        """
+        if not self.size:
+            return np.zeros(0, dtype=np.int64)
+        xmin, xmax = min(xmin, xmax), max(xmin, xmax)
+        ymin, ymax = min(ymin, ymax), max(ymin, ymax)
+        nodes = np.arange(len(self._levels[-1]))
+        for depth in range(len(self._levels) - 1, -1, -1):
+            boxes = self._levels[depth][nodes]
+            hit = (boxes[:, 0] <= xmax) & (boxes[:, 2] >= xmin) & (boxes[:, 1] <= ymax) & (boxes[:, 3] >= ymin)
+            nodes = nodes[hit]
+            if depth == 0 or not len(nodes):
+                break
+            children = (nodes[:, None] * self.node_size + np.arange(self.node_size)).ravel()
+            nodes = children[children < len(self._levels[depth - 1])]
+        return np.sort(self._ids[nodes])
+
+    def search_all(self, boxes: Sequence, chunk: int = 4096) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Consultar muchas regiones a la vez (p. ej. las propias cajas del índice)
+
+        Todas las consultas de un bloque descienden juntas: cada nivel filtra los
+        pares (consulta, nodo) que se cortan y expande los hijos de los que quedan.
+
+        Args:
+            boxes: Regiones de consulta (m, 4) [xmin, ymin, xmax, ymax]
+            chunk: Consultas por bloque (limita la memoria de los pares intermedios)
+
+        Returns:
+            Tupla (consultas, elementos) de arrays int64 con cada par que se corta,
+            ordenados por consulta y elemento
+        """
+        boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        found_queries, found_elements = [], []
+        if self.size:
+            for first in range(0, len(boxes), max(1, int(chunk))):
+                queries = np.arange(first, min(first + max(1, int(chunk)), len(boxes)))
+                nodes = np.zeros(len(queries), dtype=np.int64)
+                for depth in range(len(self._levels) - 1, -1, -1):
+                    node_boxes = self._levels[depth][nodes]
+                    query_boxes = boxes[queries]
+                    hit = ((node_boxes[:, 0] <= query_boxes[:, 2]) & (node_boxes[:, 2] >= query_boxes[:, 0]) &
+                           (node_boxes[:, 1] <= query_boxes[:, 3]) & (node_boxes[:, 3] >= query_boxes[:, 1]))
+                    queries, nodes = queries[hit], nodes[hit]
+                    if depth == 0 or not len(nodes):
+                        break
+                    children = (nodes[:, None] * self.node_size + np.arange(self.node_size)).ravel()
+                    queries = np.repeat(queries, self.node_size)
+                    valid = children < len(self._levels[depth - 1])
+                    queries, nodes = queries[valid], children[valid]
+                found_queries.append(queries)
+                found_elements.append(self._ids[nodes])
+        if not found_queries:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        queries = np.concatenate(found_queries).astype(np.int64)
+        elements = np.concatenate(found_elements).astype(np.int64)
+        order = np.lexsort((elements, queries))
+        return queries[order], elements[order]
+
+    def pick(self, x: float, y: float, radius: float = 0.0) -> np.ndarray:
+        """
+        Elementos cuya caja está a menos de radius de un punto
+
+        Args:
+            x, y: Punto de consulta
+            radius: Tolerancia de selección
+
+        Returns:
+            Índices de los elementos (int64) en orden de documento
+        """
+        radius = abs(radius)
+        return self.search(x - radius, y - radius, x + radius, y + radius)
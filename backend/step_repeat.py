@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Repetición en matriz (step-and-repeat) de un trabajo
+La pieza se procesa y emite una sola vez; cada copia se obtiene desplazando las
+coordenadas del bloque ya formateado en una única operación de formato por copia
+"""
+
+import re
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+# Palabras X/Y absolutas de la parte de código de una línea (no comentarios)
+_COORD_WORD = re.compile(r'(?:^|(?<=\s))([XY])(-?\d+(?:\.\d*)?)')
+# Número de un bucle O-word (LinuxCNC): cada copia necesita números propios
+_LOOP_WORD = re.compile(r'^o(\d+)(?= (?:end)?repeat\b)')
+
+
+class StepRepeat:
+    """Distribución de copias de una pieza en filas y columnas"""
+
+    def __init__(self, rows: int = 1, cols: int = 1, pitch_x: Optional[float] = None,
+                 pitch_y: Optional[float] = None, gap: float = 1.0, stagger: float = 0.0):
+        """
+        Inicializar repetición
+
+        Args:
+            rows: Número de filas
+            cols: Número de columnas
+            pitch_x: Paso entre columnas en mm (None = ancho de la pieza + gap)
+            pitch_y: Paso entre filas en mm (None = alto de la pieza + gap)
+            gap: Separación entre copias cuando no se indica el paso
+            stagger: Desplazamiento en X de las filas impares en mm (disposición al tresbolillo)
+        """
+        if int(rows) < 1 or int(cols) < 1:
+            raise ValueError("El número de filas y columnas debe ser al menos 1")
+        self.rows = int(rows)
+        self.cols = int(cols)
+        self.pitch_x = pitch_x
+        self.pitch_y = pitch_y
+        self.gap = gap
+        self.stagger = stagger
+        self.reset_stats()
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> Optional['StepRepeat']:
+        """
+        Crear repetición desde un diccionario (p. ej. el cuerpo JSON de una petición)
+
+        Args:
+            data: Diccionario con rows, cols, pitch_x, pitch_y, gap y stagger (opcional)
+
+        Returns:
+            Repetición o None si no hay más de una copia
+        """
+        if not data:
+            return None
+        rows = int(data.get('rows', 1))
+        cols = int(data.get('cols', 1))
+        if rows * cols <= 1:
+            return None
+        pitch_x = data.get('pitch_x')
+        pitch_y = data.get('pitch_y')
+        return cls(rows, cols,
+                   pitch_x=float(pitch_x) if pitch_x is not None else None,
+                   pitch_y=float(pitch_y) if pitch_y is not None else None,
+                   gap=float(data.get('gap', 1.0)),
+                   stagger=float(data.get('stagger', 0.0)))
+
+    def reset_stats(self) -> None:
+        """Reiniciar contadores"""
+        self.copies = 0
+        self.copies_skipped = 0
+        self.order = None
+        self.used_pitch = (0.0, 0.0)
+
+    def get_stats(self) -> Dict:
+        """
+        Obtener estadísticas de la última distribución
+
+        Returns:
+            Diccionario con la matriz, el paso usado, el orden y las copias emitidas/omitidas
+        """
+        return {
+            'rows': self.rows,
+            'cols': self.cols,
+            'pitch_x': round(self.used_pitch[0], 4),
+            'pitch_y': round(self.used_pitch[1], 4),
+            'stagger': self.stagger,
+            'order': self.order,
+            'copies': self.copies,
+            'copies_skipped': self.copies_skipped
+        }
+
+    def layout(self, bbox: Tuple[float, float, float, float],
+               table: Optional[Tuple[float, float, float, float]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calcular el desplazamiento de cada copia en orden de emisión
+
+        Las copias se recorren en serpentina (boustrophedon) por filas o por columnas,
+        la opción con menor desplazamiento total entre copias. La copia (0, 0) es la
+        pieza original.
+
+        Args:
+            bbox: Caja envolvente de la pieza (min_x, min_y, max_x, max_y)
+            table: Área de trabajo (x_min, y_min, x_max, y_max); las copias que no
+                   quedan completamente dentro se omiten (None = no verificar)
+
+        Returns:
+            Tupla (desplazamientos (k, 2), celdas (k, 2) con fila y columna)
+        """
+        min_x, min_y, max_x, max_y = bbox
+        pitch_x = self.pitch_x if self.pitch_x is not None else (max_x - min_x) + self.gap
+        pitch_y = self.pitch_y if self.pitch_y is not None else (max_y - min_y) + self.gap
+
+        row, col = np.divmod(np.arange(self.rows * self.cols), self.cols)
+        # Serpentina por filas o por columnas según el recorrido entre copias
+        by_rows = (self.rows * (self.cols - 1) * abs(pitch_x) + (self.rows - 1) * abs(pitch_y) <=
+                   self.cols * (self.rows - 1) * abs(pitch_y) + (self.cols - 1) * abs(pitch_x))
+        if by_rows:
+            col = np.where(row % 2 == 1, self.cols - 1 - col, col)
+        else:
+            col, row = np.divmod(np.arange(self.rows * self.cols), self.rows)
+            row = np.where(col % 2 == 1, self.rows - 1 - row, row)
+        cells = np.column_stack([row, col])
+        offsets = np.column_stack([col * pitch_x + (row % 2) * self.stagger, row * pitch_y]).astype(np.float64)
+
+        if table is not None:
+            eps = 1e-9
+            inside = ((min_x + offsets[:, 0] >= table[0] - eps) & (max_x + offsets[:, 0] <= table[2] + eps) &
+                      (min_y + offsets[:, 1] >= table[1] - eps) & (max_y + offsets[:, 1] <= table[3] + eps))
+            # La pieza original ya está recortada a la tabla
+            inside[0] = True
+            offsets, cells = offsets[inside], cells[inside]
+
+        self.order = 'rows' if by_rows else 'columns'
+        self.used_pitch = (float(pitch_x), float(pitch_y))
+        self.copies = len(offsets)
+        self.copies_skipped = self.rows * self.cols - len(offsets)
+        return offsets, cells
+
+    @staticmethod
+    def header(index: int, total: int, cell) -> str:
+        """Comentario que identifica una copia"""
+        return f"; Copia {index + 1} de {total} (fila {int(cell[0]) + 1}, columna {int(cell[1]) + 1})"
+
+    def tile(self, lines: List[str], offsets: np.ndarray, cells: np.ndarray,
+             decimals: int, loops: int = 0) -> List[str]:
+        """
+        Emitir una copia del bloque por cada desplazamiento
+
+        El bloque se compila una vez en una plantilla de formato con un campo por
+        palabra X/Y (y por número de bucle O-word); cada copia es una única operación
+        de formato con los valores desplazados.
+
+        Args:
+            lines: Líneas del bloque de la pieza original (coordenadas absolutas)
+            offsets: Desplazamiento de cada copia (ver layout)
+            cells: Fila y columna de cada copia
+            decimals: Decimales de las coordenadas
+            loops: Bucles O-word usados por el bloque (se renumeran en cada copia)
+
+        Returns:
+            Lista de líneas con todas las copias
+        """
+        parts = []
+        kinds = []
+        values = []
+        coord = f"%.{decimals}f"
+        for line in lines:
+            code, sep, comment = line.partition(';')
+            position = 0
+            loop = _LOOP_WORD.match(code)
+            if loop:
+                parts.append('o')
+                parts.append('%d')
+                kinds.append(2)
+                values.append(float(loop.group(1)))
+                position = loop.end(1)
+            for match in _COORD_WORD.finditer(code):
+                parts.append(code[position:match.start(2)].replace('%', '%%'))
+                parts.append(coord)
+                kinds.append(0 if match.group(1) == 'X' else 1)
+                values.append(float(match.group(2)))
+                position = match.end(2)
+            parts.append((code[position:] + sep + comment).replace('%', '%%'))
+            parts.append('\n')
+        template = ''.join(parts)
+        kinds = np.asarray(kinds, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+
+        gcode_lines = []
+        total = len(offsets)
+        for index, ((dx, dy), cell) in enumerate(zip(offsets, cells)):
+            shift = np.array([dx, dy, index * loops], dtype=np.float64)[kinds]
+            gcode_lines.append(self.header(index, total, cell))
+            gcode_lines.extend((template % tuple((values + shift).tolist())).split('\n')[:-1])
+        return gcode_lines
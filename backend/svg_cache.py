@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché de documentos SVG procesados
+Guarda, por hash del contenido del archivo, los elementos extraídos y su geometría
+aplanada en memoria (LRU) y en disco (.npz, con tamaño acotado), de modo que las
+peticiones repetidas y los reinicios del servidor no vuelven a parsear el XML ni a
+aplanar las curvas
+"""
+
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from svg_processor import SVGProcessor
+from svg_element import SVGElement
+from spatial_index import SpatialIndex
+from svg_lod import LODPyramid
+
+# Atributos de cada elemento que se guardan en disco (la matriz va aparte)
+_RECORD_KEYS = ('id', 'type', 'd', 'transform', 'fill', 'stroke', 'stroke_width', 'depth')
+
+
+class SVGCache:
+    """
+    Caché de dos niveles para documentos SVG
+
+    Cada entrada contiene la información general del documento (get_svg_info), los
+    elementos de extract_document (registros SVGElement) y la geometría calculada para
+    las últimas combinaciones de tolerancia y native_arcs usadas (LRU de max_geometry
+    tipos), además de la vista previa por niveles de detalle y de las cajas envolventes
+    con su índice espacial. Las entradas se identifican por el SHA-256 del archivo, así
+    que un mismo SVG subido dos veces comparte entrada y un archivo modificado nunca
+    usa datos antiguos.
+
+    Formato en disco (sin pickle), un archivo por parte para no reescribir las ya
+    guardadas al añadir otra:
+    - <hash>.npz: meta (JSON UTF-8 con versión, información y registros), matrices
+      (m, 3, 3) distintas y matrix_index con el índice de cada elemento (-1 = ninguna)
+    - <hash>.g<tipo>.npz: meta (versión y tipo) y points, bulges, offsets con la
+      geometría en formato CSR (en la vista previa 'lod' los bulges son las
+      importancias de los vértices); <tipo> es un resumen del nombre del tipo
+    - <hash>.bounds.npz: meta (versión) y bounds, cajas envolventes (n, 4)
+
+    Cada lectura actualiza la fecha del archivo y, tras cada escritura, se borran los
+    archivos usados hace más tiempo mientras el directorio supere max_disk_bytes.
+    """
+
+    VERSION = 3
+    EXTENSION = '.npz'
+
+    def __init__(self, processor: SVGProcessor, cache_dir: Optional[str] = None, max_entries: int = 16,
+                 pool=None, max_geometry: int = 4, max_disk_bytes: int = 512 * 1024 * 1024):
+        """
+        Inicializar caché
+
+        Args:
+            processor: Procesador SVG usado en los fallos de caché
+            cache_dir: Directorio del nivel persistente (None = solo memoria)
+            max_entries: Documentos que se mantienen en memoria
+            pool: FlattenPool para calcular la geometría en varios procesos (None = serie)
+            max_geometry: Tipos de geometría que se mantienen en memoria por documento
+            max_disk_bytes: Tamaño máximo del directorio persistente
+        """
+        self.processor = processor
+        self.pool = pool
+        self.cache_dir = cache_dir
+        self.max_entries = max(1, int(max_entries))
+        self.max_geometry = max(1, int(max_geometry))
+        self.max_disk_bytes = max(0, int(max_disk_bytes))
+        self._entries: 'OrderedDict[str, Dict]' = OrderedDict()
+        # (ruta, mtime, tamaño) -> hash, para no releer el archivo en cada petición
+        self._keys: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Reiniciar contadores"""
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.geometry_hits = 0
+        self.geometry_misses = 0
+
+    def get_stats(self) -> Dict:
+        """
+        Obtener estadísticas de la caché
+
+        Returns:
+            Diccionario con aciertos en memoria y en disco, fallos (documentos parseados),
+            aciertos y fallos de geometría y entradas en memoria
+        """
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'geometry_hits': self.geometry_hits,
+            'geometry_misses': self.geometry_misses,
+            'entries': len(self._entries)
+        }
+
+    def key_for(self, svg_path: str) -> str:
+        """
+        Hash del contenido de un archivo SVG
+
+        Args:
+            svg_path: Ruta al archivo SVG
+
+        Returns:
+            SHA-256 hexadecimal del archivo
+        """
+        stat = os.stat(svg_path)
+        stamp = (os.path.abspath(svg_path), stat.st_mtime_ns, stat.st_size)
+        key = self._keys.get(stamp)
+        if key is None:
+            digest = hashlib.sha256()
+            with open(svg_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+            key = digest.hexdigest()
+            self._keys[stamp] = key
+        return key
+
+    def info(self, svg_path: str) -> Dict:
+        """
+        Información general del SVG (ver SVGProcessor.get_svg_info)
+
+        Args:
+            svg_path: Ruta al archivo SVG
+
+        Returns:
+            Diccionario con dimensiones, número de elementos, tamaño y elementos
+        """
+        try:
+            entry = self._entry(svg_path)
+        except Exception:
+            # Documentos que no se pueden extraer: conservar la respuesta tolerante
+            return self.processor.get_svg_info(svg_path)
+        info = dict(entry['info'])
+        info['elements'] = [{'id': elem['id'], 'type': elem['type']} for elem in entry['elements']]
+        return info
+
+    def elements(self, svg_path: str) -> List[Dict]:
+        """
+        Elementos del SVG (ver SVGProcessor.extract_document)
+
+        La lista y sus diccionarios se comparten entre peticiones y no deben modificarse.
+
+        Args:
+            svg_path: Ruta al archivo SVG
+
+        Returns:
+            Lista de elementos con sus matrices de transformación
+        """
+        return self._entry(svg_path)['elements']
+
+    def geometry(self, svg_path: str, tolerance: float = 0.02,
+                 native_arcs: bool = True) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Geometría de todos los elementos (ver SVGProcessor.elements_to_geometry)
+
+        Args:
+            svg_path: Ruta al archivo SVG
+            tolerance: Tolerancia cordal en unidades del documento
+            native_arcs: Conservar los arcos circulares
+
+        Returns:
+            Lista de tuplas (puntos (n, 2), bulges (n,)) alineada con elements()
+        """
+        kind = f"{float(tolerance):.9g}:{int(bool(native_arcs))}"
+        return self._geometry(svg_path, kind, lambda elements: self.processor.elements_to_geometry(
+            elements, tolerance=tolerance, native_arcs=native_arcs, pool=self.pool))
+
+    def lod(self, svg_path: str) -> LODPyramid:
+        """
+        Vista previa por niveles de detalle (se calcula una vez por documento)
+
+        La tolerancia del nivel más detallado depende del tamaño del documento (ver
+        LODPyramid.base_tolerance_for), así que la pirámide se reconstruye igual desde disco.
+
+        Args:
+            svg_path: Ruta al archivo SVG
+
+        Returns:
+            LODPyramid alineada con elements()
+        """
+        info = self._entry(svg_path)['info']
+        base_tolerance = LODPyramid.base_tolerance_for(info['width'], info['height'])
+        geometry = self._geometry(svg_path, 'lod', lambda elements: self.processor.elements_to_lod(
+            elements, base_tolerance, pool=self.pool))
+        return LODPyramid(geometry, base_tolerance)
+
+    def bounds(self, svg_path: str) -> np.ndarray:
+        """
+        Cajas envolventes de los elementos (ver SVGProcessor.elements_to_bounds)
+
+        Args:
+            svg_path: Ruta al archivo SVG
+
+        Returns:
+            Array (n, 4) [xmin, ymin, xmax, ymax] alineado con elements()
+        """
+        entry = self._entry(svg_path)
+        if entry['bounds'] is None:
+            data = self._load_part(entry['key'], 'bounds')
+            if data is not None and data['bounds'].size == 4 * len(entry['elements']):
+                entry['bounds'] = data['bounds'].reshape(-1, 4)
+        if entry['bounds'] is not None:
+            self.geometry_hits += 1
+            return entry['bounds']
+        self.geometry_misses += 1
+        entry['bounds'] = self.processor.elements_to_bounds(entry['elements'], pool=self.pool)
+        self._save_part(entry['key'], 'bounds', {'bounds': entry['bounds']})
+        return entry['bounds']
+
+    def index(self, svg_path: str) -> SpatialIndex:
+        """
+        Índice espacial de los elementos del documento (se construye una vez por entrada)
+
+        Args:
+            svg_path: Ruta al archivo SVG
+
+        Returns:
+            SpatialIndex sobre bounds(); sus resultados son índices de elements()
+        """
+        entry = self._entry(svg_path)
+        index = entry.get('index')
+        if index is None:
+            index = SpatialIndex(self.bounds(svg_path))
+            entry['index'] = index
+        return index
+
+    def _geometry(self, svg_path: str, kind: str, build) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Geometría de un tipo: memoria, luego disco y por último cálculo y persistencia"""
+        entry = self._entry(svg_path)
+        cached = entry['geometry']
+        geometry = cached.get(kind)
+        if geometry is None:
+            geometry = self._load_geometry(entry, kind)
+        if geometry is not None:
+            self.geometry_hits += 1
+        else:
+            self.geometry_misses += 1
+            geometry = build(entry['elements'])
+            lengths = [len(points) for points, _ in geometry]
+            self._save_part(entry['key'], self._geometry_part(kind), {
+                'offsets': np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+                'points': np.concatenate([points for points, _ in geometry]) if geometry else np.empty((0, 2)),
+                'bulges': np.concatenate([bulges for _, bulges in geometry]) if geometry else np.empty(0)
+            }, kind=kind)
+        cached[kind] = geometry
+        cached.move_to_end(kind)
+        while len(cached) > self.max_geometry:
+            cached.popitem(last=False)
+        return geometry
+
+    def _load_geometry(self, entry: Dict, kind: str) -> Optional[List[Tuple[np.ndarray, np.ndarray]]]:
+        """Geometría de un tipo guardada en disco (None si no existe o no corresponde)"""
+        data = self._load_part(entry['key'], self._geometry_part(kind), kind=kind)
+        if data is None:
+            return None
+        offsets = data['offsets']
+        if len(offsets) != len(entry['elements']) + 1:
+            return None
+        if len(offsets) < 2:
+            return []
+        return list(zip(np.split(data['points'], offsets[1:-1]), np.split(data['bulges'], offsets[1:-1])))
+
+    @staticmethod
+    def _geometry_part(kind: str) -> str:
+        """Nombre de la parte en disco de un tipo de geometría"""
+        return 'g' + hashlib.sha1(kind.encode('utf-8')).hexdigest()[:16]
+
+    def _entry(self, svg_path: str) -> Dict:
+        """Entrada del documento: memoria, luego disco y por último parseo"""
+        key = self.key_for(svg_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+
+        entry = self._load(key)
+        if entry is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            # Extracción en streaming: registros compactos sin el árbol XML
+            svg_info = self.processor.extract_document(svg_path)
+            elements = svg_info['elements']
+            entry = {
+                'key': key,
+                'info': {
+                    'width': svg_info['width'],
+                    'height': svg_info['height'],
+                    'viewbox': svg_info['viewbox'],
+                    'num_elements': len(elements),
+                    'file_size': os.path.getsize(svg_path)
+                },
+                'elements': elements,
+                'geometry': OrderedDict(),
+                'bounds': None
+            }
+            self._save(entry)
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def _path(self, key: str, part: Optional[str] = None) -> Optional[str]:
+        """Ruta del archivo persistente de una entrada o de una de sus partes"""
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, key + (f'.{part}' if part else '') + self.EXTENSION)
+
+    def _save(self, entry: Dict) -> None:
+        """Escribir en disco los elementos de la entrada"""
+        # Matrices distintas; los elementos de un mismo grupo comparten índice
+        matrices = []
+        slots: Dict[int, int] = {}
+        matrix_index = np.full(len(entry['elements']), -1, dtype=np.int64)
+        for i, elem in enumerate(entry['elements']):
+            matrix = elem.get('matrix')
+            if matrix is not None:
+                if id(matrix) not in slots:
+                    slots[id(matrix)] = len(matrices)
+                    matrices.append(matrix)
+                matrix_index[i] = slots[id(matrix)]
+
+        self._write(self._path(entry['key']), {
+            'version': self.VERSION,
+            'info': entry['info'],
+            'records': [{name: elem.get(name) for name in _RECORD_KEYS} for elem in entry['elements']]
+        }, {
+            'matrices': np.array(matrices, dtype=np.float64).reshape(-1, 3, 3),
+            'matrix_index': matrix_index
+        })
+
+    def _save_part(self, key: str, part: str, arrays: Dict[str, np.ndarray], kind: Optional[str] = None) -> None:
+        """Escribir en disco una parte de la entrada (geometría o cajas)"""
+        self._write(self._path(key, part), {'version': self.VERSION, 'kind': kind}, arrays)
+
+    def _write(self, path: Optional[str], meta: Dict, arrays: Dict[str, np.ndarray]) -> None:
+        """Escribir un archivo de la caché (reemplazo atómico) y acotar el directorio"""
+        if path is None:
+            return
+        arrays = dict(arrays)
+        arrays['meta'] = np.frombuffer(json.dumps(meta, ensure_ascii=False).encode('utf-8'), dtype=np.uint8)
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(temp, path)
+        except OSError as e:
+            # La caché en disco es opcional: un fallo de escritura no afecta a la petición
+            print(f"Advertencia: no se pudo guardar la caché SVG: {str(e)}")
+            if os.path.exists(temp):
+                os.remove(temp)
+            return
+        self._prune(path)
+
+    def _prune(self, keep: str) -> None:
+        """Borrar los archivos usados hace más tiempo mientras el directorio supere max_disk_bytes"""
+        files = []
+        try:
+            with os.scandir(self.cache_dir) as items:
+                for item in items:
+                    if item.name.endswith(self.EXTENSION) and item.path != keep:
+                        stat = item.stat()
+                        files.append((stat.st_mtime_ns, stat.st_size, item.path))
+            total = sum(size for _, size, _ in files) + os.path.getsize(keep)
+        except OSError:
+            return
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def _read(self, path: Optional[str]) -> Optional[Tuple[Dict, Dict[str, np.ndarray]]]:
+        """Leer un archivo de la caché (None si no existe, es de otra versión o está dañado)"""
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(data['meta'].tobytes().decode('utf-8'))
+                if meta.get('version') != self.VERSION:
+                    return None
+                arrays = {name: data[name] for name in data.files if name != 'meta'}
+            # Marcar el archivo como usado para que la poda borre antes los demás
+            os.utime(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Advertencia: caché SVG inválida {path}: {str(e)}")
+            return None
+        return meta, arrays
+
+    def _load_part(self, key: str, part: str, kind: Optional[str] = None) -> Optional[Dict[str, np.ndarray]]:
+        """Leer de disco una parte de la entrada (None si no existe o no corresponde)"""
+        data = self._read(self._path(key, part))
+        if data is None or data[0].get('kind') != kind:
+            return None
+        return data[1]
+
+    def _load(self, key: str) -> Optional[Dict]:
+        """Leer de disco los elementos de una entrada (None si no existen o no son válidos)"""
+        data = self._read(self._path(key))
+        if data is None:
+            return None
+        meta, arrays = data
+        try:
+            matrices = list(arrays['matrices'])
+            records = meta['records']
+            for record, index in zip(records, arrays['matrix_index'].tolist()):
+                record['matrix'] = matrices[index] if index >= 0 else None
+            elements = SVGElement.pack(records)
+        except (ValueError, KeyError, IndexError) as e:
+            print(f"Advertencia: caché SVG inválida {self._path(key)}: {str(e)}")
+            return None
+        return {'key': key, 'info': meta['info'], 'elements': elements, 'geometry': OrderedDict(),
+                'bounds': None}
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Registro compacto de un elemento SVG extraído
+Sustituye a los diccionarios de extract_elements en documentos grandes: sin referencia
+al árbol XML y con el atributo d guardado en un buffer compartido por todo el documento
+"""
+
+import sys
+from typing import Dict, List, Optional
+
+
+class SVGElement:
+    """
+    Elemento SVG extraído (path, rect, circle, etc. convertido a path)
+
+    Admite el acceso de los diccionarios de extract_elements (elem['d'],
+    elem.get('matrix')) para que el resto del procesador lo use sin cambios. El texto
+    del path se guarda en un bytearray compartido por los elementos del documento y
+    se decodifica al leer 'd'; los estilos repetidos ('none', 'black', '1') se internan.
+    """
+
+    __slots__ = ('id', 'type', 'transform', 'matrix', 'fill', 'stroke', 'stroke_width', 'depth',
+                 '_buffer', '_start', '_end')
+
+    # Claves accesibles como en los diccionarios de extract_elements
+    KEYS = ('id', 'type', 'd', 'transform', 'matrix', 'fill', 'stroke', 'stroke_width', 'depth')
+
+    def __init__(self, elem_id: str, elem_type: str, buffer: bytearray, start: int, end: int,
+                 transform: Optional[str] = None, matrix=None, fill: str = 'black',
+                 stroke: str = 'none', stroke_width: str = '1', depth: int = 0):
+        """
+        Inicializar elemento
+
+        Args:
+            elem_id: Nombre único del elemento
+            elem_type: Etiqueta SVG original (path, rect, circle, ...)
+            buffer: Buffer compartido con el atributo d de los elementos (UTF-8)
+            start: Inicio del atributo d de este elemento en el buffer
+            end: Final del atributo d en el buffer
+            transform: Atributo transform acumulado (texto)
+            matrix: Matriz 3x3 acumulada (None = identidad)
+            fill: Relleno
+            stroke: Trazo
+            stroke_width: Grosor de trazo
+            depth: Profundidad en el árbol SVG
+        """
+        self.id = elem_id
+        self.type = elem_type
+        self.transform = transform
+        self.matrix = matrix
+        self.fill = sys.intern(fill) if isinstance(fill, str) else fill
+        self.stroke = sys.intern(stroke) if isinstance(stroke, str) else stroke
+        self.stroke_width = sys.intern(stroke_width) if isinstance(stroke_width, str) else stroke_width
+        self.depth = depth
+        self._buffer = buffer
+        self._start = start
+        self._end = end
+
+    @classmethod
+    def pack(cls, records: List[Dict]) -> List['SVGElement']:
+        """
+        Crear elementos desde diccionarios con un buffer compartido
+
+        Args:
+            records: Diccionarios con las claves de KEYS
+
+        Returns:
+            Lista de elementos
+        """
+        buffer = bytearray()
+        elements = []
+        for record in records:
+            start = len(buffer)
+            buffer += record['d'].encode('utf-8')
+            elements.append(cls(record['id'], record['type'], buffer, start, len(buffer),
+                                transform=record.get('transform'), matrix=record.get('matrix'),
+                                fill=record.get('fill', 'black'), stroke=record.get('stroke', 'none'),
+                                stroke_width=record.get('stroke_width', '1'), depth=record.get('depth', 0)))
+        return elements
+
+    @property
+    def d(self) -> str:
+        """Atributo d del path"""
+        return self._buffer[self._start:self._end].decode('utf-8')
+
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.KEYS
+
+    def get(self, key: str, default=None):
+        """Leer un atributo como en un diccionario"""
+        return getattr(self, key) if key in self.KEYS else default
+
+    def to_dict(self) -> Dict:
+        """Convertir a diccionario con las claves de KEYS"""
+        return {key: getattr(self, key) for key in self.KEYS}
+
+    def __repr__(self) -> str:
+        return f"SVGElement(id={self.id!r}, type={self.type!r}, d_length={self._end - self._start})"
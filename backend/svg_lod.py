@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Niveles de detalle para la vista previa de elementos SVG
+Cada vértice de la geometría aplanada guarda su importancia Douglas-Peucker, de modo
+que la simplificación a cualquier nivel de zoom es un filtro sobre un único array
+calculado una vez por documento
+"""
+
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+
+def vertex_importance(points: np.ndarray, tolerance: float = 0.0,
+                      offsets: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Importancia Douglas-Peucker de cada vértice de una o varias polilíneas
+
+    La importancia es la desviación con la que el vértice entra en la subdivisión,
+    limitada por la de los vértices que delimitan su tramo. Así, los vértices con
+    importancia mayor que e son exactamente los que conserva Douglas-Peucker con
+    tolerancia e, para cualquier e, y los niveles quedan anidados. Cada iteración
+    subdivide a la vez todos los tramos pendientes de todas las polilíneas.
+
+    Args:
+        points: Array (n, 2) de puntos
+        tolerance: Desviación por debajo de la cual ya no se subdivide
+        offsets: Inicio de cada polilínea en points más el final (formato CSR);
+                 None = una sola polilínea
+
+    Returns:
+        Array (n,) de importancias (inf en los extremos, 0 en los vértices nunca elegidos)
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    n = len(points)
+    offsets = np.asarray([0, n] if offsets is None else offsets, dtype=np.int64)
+    importance = np.zeros(n)
+    lengths = np.diff(offsets)
+    starts, ends = offsets[:-1][lengths > 0], offsets[1:][lengths > 0] - 1
+    importance[starts] = np.inf
+    importance[ends] = np.inf
+
+    # Puntos pendientes y extremos del tramo que contiene a cada uno
+    owner = np.repeat(np.arange(len(starts)), ends - starts + 1)
+    active = np.arange(n)[importance == 0]
+    owner = owner[importance == 0]
+    low = starts[owner]
+    high = ends[owner]
+    while len(active):
+        a, b = points[low], points[high]
+        ab = b - a
+        length2 = np.einsum('ij,ij->i', ab, ab)
+        t = np.einsum('ij,ij->i', points[active] - a, ab) / np.where(length2 > 0, length2, 1.0)
+        closest = a + np.clip(t, 0.0, 1.0)[:, None] * ab
+        dist = np.hypot(*(points[active] - closest).T)
+
+        # Los pendientes están ordenados, así que cada tramo es un bloque contiguo
+        starts = np.concatenate(([True], low[1:] != low[:-1]))
+        first = np.flatnonzero(starts)
+        group = np.cumsum(starts) - 1
+        worst = np.maximum.reduceat(dist, first)
+        # Primer vértice con la desviación máxima de cada tramo
+        candidates = np.flatnonzero(dist == worst[group])
+        span = group[candidates]
+        chosen = candidates[np.concatenate(([True], span[1:] != span[:-1]))]
+        split = worst > tolerance
+        chosen = chosen[split]
+        if not len(chosen):
+            break
+        importance[active[chosen]] = np.minimum(dist[chosen],
+                                                np.minimum(importance[low[chosen]], importance[high[chosen]]))
+
+        # Dividir cada tramo en su vértice elegido; los tramos sin división terminan
+        pivot = np.full(len(first), -1, dtype=np.int64)
+        pivot[split] = active[chosen]
+        pivot = pivot[group]
+        stay = split[group] & (active != pivot)
+        high = np.where(active < pivot, pivot, high)[stay]
+        low = np.where(active > pivot, pivot, low)[stay]
+        active = active[stay]
+    return importance
+
+
+class LODPyramid:
+    """
+    Pirámide de niveles de detalle de los elementos de un documento
+
+    La geometría de cada elemento es un array de puntos con la importancia de cada
+    vértice (ver vertex_importance). El nivel k usa la tolerancia base * 2^k; el
+    nivel 0 es el más detallado.
+    """
+
+    LEVELS = 8
+    # Divisor de la diagonal del documento para la tolerancia del nivel 0
+    BASE_DIVISOR = 8192.0
+    # Nivel usado si la petición no indica tolerancia ni zoom (~1000 px de ancho)
+    DEFAULT_LEVEL = 3
+
+    def __init__(self, geometry: List[Tuple[np.ndarray, np.ndarray]], base_tolerance: float,
+                 levels: int = LEVELS):
+        """
+        Inicializar pirámide
+
+        Args:
+            geometry: Tuplas (puntos (n, 2), importancias (n,)) por elemento
+            base_tolerance: Tolerancia del nivel 0 en unidades del documento
+            levels: Número de niveles
+        """
+        self.geometry = geometry
+        self.base_tolerance = float(base_tolerance)
+        self.tolerances = self.base_tolerance * 2.0 ** np.arange(max(1, int(levels)))
+
+    @classmethod
+    def base_tolerance_for(cls, width: float, height: float) -> float:
+        """
+        Tolerancia del nivel 0 para un documento
+
+        Args:
+            width: Ancho del documento en unidades de usuario
+            height: Alto del documento en unidades de usuario
+
+        Returns:
+            Diagonal del documento / BASE_DIVISOR
+        """
+        diagonal = float(np.hypot(width, height)) if np.isfinite([width, height]).all() else 0.0
+        return max(diagonal, 1e-9) / cls.BASE_DIVISOR
+
+    @property
+    def default_tolerance(self) -> float:
+        """Tolerancia del nivel por defecto"""
+        return float(self.tolerances[min(self.DEFAULT_LEVEL, len(self.tolerances) - 1)])
+
+    def level_for(self, tolerance: float) -> int:
+        """
+        Nivel más simplificado cuya tolerancia no supera la pedida
+
+        Args:
+            tolerance: Desviación máxima admitida en unidades del documento
+
+        Returns:
+            Índice del nivel (0 si la tolerancia es menor que la del nivel 0)
+        """
+        return max(0, int(np.searchsorted(self.tolerances, tolerance, side='right')) - 1)
+
+    def points(self, index: int, level: int) -> np.ndarray:
+        """
+        Puntos de un elemento en un nivel
+
+        Args:
+            index: Índice del elemento
+            level: Nivel de detalle
+
+        Returns:
+            Array (m, 2) de puntos en coordenadas del documento
+        """
+        points, importance = self.geometry[index]
+        return points[importance > self.tolerances[level]]
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lectura rápida de listas de números SVG
+Convierte atributos completos (d, points, transform) en arrays NumPy con una sola
+conversión en C: los separadores implícitos de la gramática SVG ("10-5", "1.5.5",
+"1e-3-2") se convierten en espacios con operaciones vectorizadas sobre los bytes
+del texto y np.fromstring lee todo el texto de una vez, sin una expresión regular
+ni un float() por número
+"""
+
+import re
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+# Número SVG: signo, parte entera y/o decimal y exponente opcionales
+NUMBER_RE = re.compile(r'[-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?')
+
+# Separadores SVG (coma y espacios) -> espacio
+_SPACES = bytes.maketrans(b',\t\n\r\f', b'     ')
+# Clases de carácter para normalizar el texto como array de bytes
+_OTHER, _SPACE, _DIGIT, _DOT, _SIGN, _EXPONENT, _SEPARATOR = range(7)
+_CLASSES = np.full(256, _OTHER, dtype=np.uint8)
+_CLASSES[ord(' ')] = _SPACE
+_CLASSES[ord('0'):ord('9') + 1] = _DIGIT
+_CLASSES[ord('.')] = _DOT
+_CLASSES[[ord('-'), ord('+')]] = _SIGN
+_CLASSES[[ord('e'), ord('E')]] = _EXPONENT
+# 'n' y 'a' solo aparecen en el separador de listas, que np.fromstring lee como NaN
+_CLASSES[[ord('n'), ord('a')]] = _SEPARATOR
+_LIST_SEPARATOR = ' nan '
+# Por debajo de esta longitud la expresión regular es más rápida que la conversión en bloque
+_BULK_LENGTH = 1024
+
+
+def _convert(text: str) -> np.ndarray:
+    """
+    Leer un texto SVG con una sola llamada a np.fromstring
+
+    El texto se trata como array de bytes: comas y espacios pasan a ser espacios y
+    se inserta un espacio antes de cada signo que no sigue a un exponente y de cada
+    punto decimal que continúa un número que ya tenía uno ("1.5.5" -> "1.5 .5").
+
+    Raises:
+        ValueError: Si el texto contiene algo que no es un número
+    """
+    data = np.frombuffer(text.encode('ascii').translate(_SPACES), dtype=np.uint8)
+    kind = _CLASSES.take(data)
+    if np.any(kind == _OTHER):
+        raise ValueError("Caracteres no numéricos")
+    if np.all(kind == _SPACE):
+        return np.zeros(0)
+
+    split = kind == _SIGN
+    split[1:] &= kind[:-1] != _EXPONENT
+    # Un punto cuyo carácter no numérico anterior también es un punto (solo dígitos
+    # entre ambos) empieza otro número
+    breaks = np.flatnonzero(kind != _DIGIT)
+    dots = kind[breaks] == _DOT
+    split[breaks[1:][dots[1:] & dots[:-1]]] = True
+    positions = np.flatnonzero(split)
+    if len(positions):
+        data = np.insert(data, positions, np.uint8(32))
+    return np.fromstring(data.tobytes(), dtype=np.float64, sep=' ')
+
+
+def _findall(text: str) -> List[float]:
+    """Números de un texto corto (o con caracteres no numéricos) con la expresión regular"""
+    return [float(v) for v in NUMBER_RE.findall(text)]
+
+
+def _bulk_lists(chunks: Sequence[str]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Números de varios textos en una sola conversión (formato CSR)
+
+    Los textos se unen con un separador que np.fromstring lee como NaN y el
+    resultado se divide por esos NaN.
+
+    Returns:
+        Tupla (números, offsets) o None si el texto es corto o contiene caracteres
+        no numéricos
+    """
+    text = _LIST_SEPARATOR.join(chunks)
+    if len(text) < _BULK_LENGTH:
+        return None
+    try:
+        numbers = _convert(text)
+    except ValueError:
+        return None
+    separators = np.flatnonzero(np.isnan(numbers))
+    # Cada NaN debe ser uno de los separadores insertados (un "nan" del texto no cuenta)
+    if len(separators) != len(chunks) - 1:
+        return None
+    offsets = np.empty(len(chunks) + 1, dtype=np.int64)
+    offsets[0] = 0
+    offsets[1:-1] = separators - np.arange(len(separators))
+    offsets[-1] = len(numbers) - len(separators)
+    return np.delete(numbers, separators), offsets
+
+
+def parse_numbers(text: str) -> np.ndarray:
+    """
+    Todos los números de un texto SVG
+
+    Admite signos, exponentes, separadores implícitos ("10-5" -> 10, -5) y formas
+    compactas ("1.5.5" -> 1.5, 0.5). Si el texto contiene otros caracteres se ignoran,
+    como con la búsqueda número a número.
+
+    Args:
+        text: Lista de números (points, argumentos de transform, d sin comandos)
+
+    Returns:
+        Array float64 con los números en orden
+    """
+    result = _bulk_lists([text or ''])
+    if result is not None:
+        return result[0]
+    return np.array(_findall(text or ''), dtype=np.float64)
+
+
+def parse_points(text: str) -> np.ndarray:
+    """
+    Puntos de un atributo points (polyline, polygon)
+
+    Args:
+        text: Atributo points ("x1,y1 x2,y2 ...", con cualquier separador)
+
+    Returns:
+        Array (n, 2); un número final sin pareja se descarta, como indica SVG
+    """
+    numbers = parse_numbers(text)
+    return numbers[:len(numbers) // 2 * 2].reshape(-1, 2)
+
+
+def parse_number_lists(chunks: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Números de varios textos en formato CSR
+
+    Args:
+        chunks: Textos con listas de números (argumentos de cada comando de un path
+                o de cada función de un transform)
+
+    Returns:
+        Tupla (números float64, offsets int64 (len(chunks) + 1,))
+    """
+    result = _bulk_lists(chunks)
+    if result is not None:
+        return result
+    lists = [_findall(chunk) for chunk in chunks]
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    np.cumsum([len(values) for values in lists], out=offsets[1:])
+    return np.array([v for values in lists for v in values], dtype=np.float64), offsets
+
+
+def split_number_lists(chunks: Sequence[str]) -> List[List[float]]:
+    """
+    Números de varios textos como listas de float de Python
+
+    Args:
+        chunks: Textos con listas de números
+
+    Returns:
+        Lista de listas de números, una por texto
+    """
+    result = _bulk_lists(chunks)
+    if result is None:
+        return [_findall(chunk) for chunk in chunks]
+    values = result[0].tolist()
+    bounds = result[1].tolist()
+    return [values[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
@@ -0,0 +1,624 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Evaluación vectorizada de paths SVG
+Parsea el atributo d una sola vez en arrays de segmentos (rectas, Béziers cuadráticas
+y cúbicas, arcos elípticos) y evalúa todos los parámetros de todos los segmentos con
+operaciones NumPy por lotes, sin objetos por segmento ni llamadas punto a punto
+"""
+
+import re
+import numpy as np
+from typing import List, Optional, Tuple
+from svg_numbers import NUMBER_RE, split_number_lists
+
+# Tipos de segmento
+LINE = 0
+QUADRATIC = 1
+CUBIC = 2
+ARC = 3
+
+# Números por repetición de cada comando
+_COMMAND_ARGS = {'M': 2, 'L': 2, 'H': 1, 'V': 1, 'C': 6, 'S': 4, 'Q': 4, 'T': 2, 'A': 7, 'Z': 0}
+_COMMAND_RE = re.compile(r'([MmZzLlHhVvCcSsQqTtAa])')
+# En los argumentos de un arco las banderas son un único carácter 0/1 que puede ir
+# pegado al número siguiente ("a1 1 0 0110 0" == "a1 1 0 0 1 10 0")
+_ARC_ARGS_RE = re.compile(
+    r'[\s,]*([-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?)[\s,]*([-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?)'
+    r'[\s,]*([-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?)[\s,]*([01])[\s,]*([01])'
+    r'[\s,]*([-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?)[\s,]*([-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?)')
+
+# Gauss-Legendre compuesto (4 tramos de 12 nodos en [0, 1]) para las longitudes de curvas
+_GAUSS_NODES, _GAUSS_WEIGHTS = np.polynomial.legendre.leggauss(12)
+_GAUSS_NODES = ((np.arange(4)[:, None] + 0.5 * (_GAUSS_NODES + 1.0)) / 4).ravel()
+_GAUSS_WEIGHTS = np.tile(_GAUSS_WEIGHTS / 8, 4)
+
+
+def _tokenize(path_d: str) -> List[Tuple[str, List[float]]]:
+    """
+    Dividir el atributo d en comandos con sus números
+
+    Los números de todos los comandos se leen en bloque (ver svg_numbers); los
+    argumentos de los arcos se releen aparte porque sus banderas pueden ir pegadas.
+
+    Args:
+        path_d: Atributo 'd' del path SVG
+
+    Returns:
+        Lista de tuplas (comando, números)
+    """
+    chunks = _COMMAND_RE.split(path_d)
+    if NUMBER_RE.search(chunks[0]):
+        raise ValueError("Path SVG con números antes del primer comando")
+    commands = chunks[1::2]
+    arguments = chunks[2::2]
+    lists = split_number_lists(arguments)
+    for i, command in enumerate(commands):
+        if command not in 'Aa':
+            continue
+        args = arguments[i]
+        numbers = []
+        position = 0
+        for match in _ARC_ARGS_RE.finditer(args):
+            if args[position:match.start()].strip(' \t\r\n,'):
+                break
+            numbers.extend(float(v) for v in match.groups())
+            position = match.end()
+        if args[position:].strip(' \t\r\n,'):
+            raise ValueError(f"Argumentos de arco inválidos: {args!r}")
+        lists[i] = numbers
+    return list(zip(commands, lists))
+
+
+class SVGPath:
+    """
+    Path SVG como arrays de segmentos
+
+    Cada segmento tiene un tipo (LINE, QUADRATIC, CUBIC, ARC) y cuatro puntos de
+    control complejos: inicio, control 1, control 2 y final (las cuadráticas usan
+    solo el control 1). Los arcos guardan además centro, radios (ya corregidos si
+    no alcanzan los extremos), rotación y ángulos inicial y de barrido en grados,
+    con la misma parametrización que svgpathtools.
+    """
+
+    def __init__(self, kind: np.ndarray, control: np.ndarray, radius: np.ndarray,
+                 rotation: np.ndarray, large_arc: np.ndarray, sweep: np.ndarray):
+        """
+        Inicializar path desde sus arrays de segmentos
+
+        Args:
+            kind: Tipo de cada segmento (n,)
+            control: Puntos de control complejos (n, 4)
+            radius: Radios rx + 1j*ry de los arcos (n,) (0 en los demás segmentos)
+            rotation: Rotación de los arcos en grados (n,)
+            large_arc: Bandera large-arc de los arcos (n,)
+            sweep: Bandera sweep de los arcos (n,)
+        """
+        self.kind = kind
+        self.control = control
+        self.radius = radius
+        self.rotation = rotation
+        self.large_arc = large_arc
+        self.sweep = sweep
+        self.center = np.zeros(len(kind), dtype=complex)
+        self.rot = np.ones(len(kind), dtype=complex)
+        self.theta = np.zeros(len(kind))
+        self.delta = np.zeros(len(kind))
+        self._parameterize_arcs()
+        self.coefficients = self._power_basis()
+
+    @classmethod
+    def parse(cls, path_d: str) -> 'SVGPath':
+        """
+        Parsear el atributo d (mismas reglas que svgpathtools.parse_path)
+
+        Los arcos con radio nulo se reemplazan por rectas y los arcos con inicio y
+        final iguales se omiten, como indica la especificación SVG.
+
+        Args:
+            path_d: Atributo 'd' del path SVG
+
+        Returns:
+            Path parseado
+
+        Raises:
+            ValueError: Si el path no es válido
+        """
+        kind = []
+        control = []
+        arcs = []
+        current = 0j
+        start = None
+        last_control = None
+        last_command = None
+        for command, numbers in _tokenize(path_d):
+            absolute = command.isupper()
+            command = command.upper()
+            count = _COMMAND_ARGS[command]
+            if command == 'Z':
+                if numbers:
+                    raise ValueError(f"Números después de Z en {path_d!r}")
+                if start is None:
+                    raise ValueError(f"Z sin M previo en {path_d!r}")
+                if current != start:
+                    kind.append(LINE)
+                    control.append((current, current, start, start))
+                current = start
+                last_command = 'Z'
+                continue
+            if not numbers or len(numbers) % count:
+                raise ValueError(f"El comando {command} espera grupos de {count} valores en {path_d!r}")
+
+            for k in range(0, len(numbers), count):
+                values = numbers[k:k + count]
+                if command == 'M':
+                    position = complex(values[0], values[1])
+                    current = position if absolute else current + position
+                    start = current
+                    # Las coordenadas implícitas tras un M son L
+                    command = 'L'
+                    last_command = 'M'
+                    continue
+                if command == 'L':
+                    end = complex(values[0], values[1])
+                    if not absolute:
+                        end += current
+                    kind.append(LINE)
+                    control.append((current, current, end, end))
+                elif command == 'H':
+                    end = complex(values[0] if absolute else current.real + values[0], current.imag)
+                    kind.append(LINE)
+                    control.append((current, current, end, end))
+                elif command == 'V':
+                    end = complex(current.real, values[0] if absolute else current.imag + values[0])
+                    kind.append(LINE)
+                    control.append((current, current, end, end))
+                elif command in ('C', 'S'):
+                    if command == 'C':
+                        control1 = complex(values[0], values[1])
+                        values = values[2:]
+                        if not absolute:
+                            control1 += current
+                    elif last_command in ('C', 'S'):
+                        control1 = current + current - last_control
+                    else:
+                        control1 = current
+                    control2 = complex(values[0], values[1])
+                    end = complex(values[2], values[3])
+                    if not absolute:
+                        control2 += current
+                        end += current
+                    kind.append(CUBIC)
+                    control.append((current, control1, control2, end))
+                    last_control = control2
+                elif command in ('Q', 'T'):
+                    if command == 'Q':
+                        control1 = complex(values[0], values[1])
+                        values = values[2:]
+                        if not absolute:
+                            control1 += current
+                    elif last_command in ('Q', 'T'):
+                        control1 = current + current - last_control
+                    else:
+                        control1 = current
+                    end = complex(values[0], values[1])
+                    if not absolute:
+                        end += current
+                    kind.append(QUADRATIC)
+                    control.append((current, control1, control1, end))
+                    last_control = control1
+                else:
+                    end = complex(values[5], values[6])
+                    if not absolute:
+                        end += current
+                    if values[0] == 0 or values[1] == 0:
+                        # Radio nulo: se dibuja como recta
+                        kind.append(LINE)
+                        control.append((current, current, end, end))
+                    elif end != current:
+                        kind.append(ARC)
+                        control.append((current, current, end, end))
+                        arcs.append((len(kind) - 1, abs(values[0]) + 1j * abs(values[1]), values[2],
+                                     bool(values[3]), bool(values[4])))
+                current = end
+                last_command = command
+
+        n = len(kind)
+        radius = np.zeros(n, dtype=complex)
+        rotation = np.zeros(n)
+        large_arc = np.zeros(n, dtype=bool)
+        sweep = np.zeros(n, dtype=bool)
+        for index, arc_radius, arc_rotation, arc_large, arc_sweep in arcs:
+            radius[index] = arc_radius
+            rotation[index] = arc_rotation
+            large_arc[index] = arc_large
+            sweep[index] = arc_sweep
+        return cls(np.asarray(kind, dtype=np.int8), np.asarray(control, dtype=complex).reshape(n, 4),
+                   radius, rotation, large_arc, sweep)
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+    def _parameterize_arcs(self) -> None:
+        """
+        Calcular centro y ángulos de todos los arcos a la vez
+
+        Conversión de extremos a centro de la especificación SVG (F.6.5), con la
+        corrección de radios (F.6.6) y los mismos casos límite que svgpathtools.
+        """
+        arcs = np.flatnonzero(self.kind == ARC)
+        if not len(arcs):
+            return
+        start, end = self.control[arcs, 0], self.control[arcs, 3]
+        rx, ry = self.radius[arcs].real.copy(), self.radius[arcs].imag.copy()
+        large_arc, sweep = self.large_arc[arcs], self.sweep[arcs]
+        rot = np.exp(1j * np.radians(self.rotation[arcs]))
+
+        zp1 = (1 / rot) * (start - end) / 2
+        x1p, y1p = zp1.real, zp1.imag
+        # Radios insuficientes para unir los extremos: escalar
+        radius_check = x1p * x1p / (rx * rx) + y1p * y1p / (ry * ry)
+        scale = np.where(radius_check > 1, np.sqrt(np.maximum(radius_check, 1.0)), 1.0)
+        rx, ry = rx * scale, ry * scale
+        rx_sqd, ry_sqd = rx * rx, ry * ry
+
+        tmp = rx_sqd * y1p * y1p + ry_sqd * x1p * x1p
+        radicand = (rx_sqd * ry_sqd - tmp) / tmp
+        radical = np.where(np.isclose(radicand, 0), 0.0, np.sqrt(np.abs(radicand)))
+        sign = np.where(large_arc == sweep, -1.0, 1.0)
+        cp = sign * radical * (rx * y1p / ry - 1j * ry * x1p / rx)
+        center = rot * cp + (start + end) / 2
+
+        u1 = (x1p - cp.real) / rx + 1j * (y1p - cp.imag) / ry
+        u2 = (-x1p - cp.real) / rx + 1j * (-y1p - cp.imag) / ry
+        u1 = np.clip(u1.real, -1, 1) + 1j * np.clip(u1.imag, -1, 1)
+        u2 = np.clip(u2.real, -1, 1) + 1j * np.clip(u2.imag, -1, 1)
+
+        theta = np.degrees(np.arccos(u1.real))
+        theta = np.where(u1.imag > 0, theta, np.where(u1.imag < 0, -theta, np.where(u1.real > 0, 0.0, 180.0)))
+        det_uv = u1.real * u2.imag - u1.imag * u2.real
+        dot = u1.real * u2.real + u1.imag * u2.imag
+        delta = np.degrees(np.arccos(np.clip(dot, -1, 1)))
+        delta = np.where(det_uv > 0, delta, np.where(det_uv < 0, -delta, np.where(dot > 0, 0.0, 180.0)))
+        delta = np.where(~sweep & (delta >= 0), delta - 360,
+                         np.where(large_arc & (delta <= 0), delta + 360, delta))
+
+        self.radius[arcs] = rx + 1j * ry
+        self.rot[arcs] = rot
+        self.center[arcs] = center
+        self.theta[arcs] = theta
+        self.delta[arcs] = delta
+
+    def _power_basis(self) -> Tuple[np.ndarray, ...]:
+        """
+        Coeficientes polinómicos de rectas y Béziers
+
+        Cada recta, cuadrática o cúbica es el polinomio c0 + c1*t + c2*t² + c3*t³,
+        de modo que todas se evalúan juntas por Horner sin distinguir su tipo.
+
+        Returns:
+            Tupla de arrays complejos (n,) c0..c3 (cero en los arcos)
+        """
+        p0, p1, p2, p3 = self.control.T
+        coefficients = np.zeros((len(self.kind), 4), dtype=complex)
+        coefficients[:, 0] = p0
+        coefficients[:, 1] = p3 - p0
+        mask = self.kind == QUADRATIC
+        coefficients[mask, 1] = 2 * (p1[mask] - p0[mask])
+        coefficients[mask, 2] = p0[mask] - 2 * p1[mask] + p3[mask]
+        mask = self.kind == CUBIC
+        coefficients[mask, 1] = 3 * (p1[mask] - p0[mask])
+        coefficients[mask, 2] = 3 * (p0[mask] - 2 * p1[mask] + p2[mask])
+        coefficients[mask, 3] = p3[mask] - p0[mask] + 3 * (p1[mask] - p2[mask])
+        coefficients[self.kind == ARC] = 0
+        return tuple(np.ascontiguousarray(column) for column in coefficients.T)
+
+    def evaluate(self, index: np.ndarray, t: np.ndarray) -> np.ndarray:
+        """
+        Evaluar segmentos en parámetros t
+
+        Args:
+            index: Segmento de cada evaluación
+            t: Parámetro en [0, 1] de cada evaluación
+
+        Returns:
+            Array complejo con los puntos
+        """
+        points = self._evaluate_polynomial(index, t)
+        arc = self.kind[index] == ARC
+        if np.any(arc):
+            points[arc] = self._evaluate_arcs(index[arc], t[arc])
+        return points
+
+    def _evaluate_polynomial(self, index: np.ndarray, t: np.ndarray) -> np.ndarray:
+        """Evaluar rectas y Béziers (Horner sobre los coeficientes de _power_basis)"""
+        c0, c1, c2, c3 = (np.take(c, index) for c in self.coefficients)
+        return c0 + t * (c1 + t * (c2 + t * c3))
+
+    def _evaluate_arcs(self, index: np.ndarray, t: np.ndarray) -> np.ndarray:
+        """Evaluar arcos: centro + rotación * (rx cos(ángulo) + j ry sin(ángulo))"""
+        angle = np.radians(np.take(self.theta, index) + t * np.take(self.delta, index))
+        radius = np.take(self.radius, index)
+        ellipse = radius.real * np.cos(angle) + 1j * radius.imag * np.sin(angle)
+        return np.take(self.center, index) + np.take(self.rot, index) * ellipse
+
+    def lengths(self) -> np.ndarray:
+        """
+        Longitud de cada segmento (exacta en rectas, Gauss-Legendre en curvas)
+
+        Returns:
+            Array (n,) de longitudes
+        """
+        lengths = np.abs(self.control[:, 3] - self.control[:, 0])
+        t = _GAUSS_NODES
+        curves = np.flatnonzero((self.kind == QUADRATIC) | (self.kind == CUBIC))
+        if len(curves):
+            # Derivada del polinomio: c1 + 2 c2 t + 3 c3 t²
+            c1, c2, c3 = (c[curves, None] for c in self.coefficients[1:])
+            lengths[curves] = np.abs(c1 + t * (2 * c2 + 3 * t * c3)) @ _GAUSS_WEIGHTS
+        arcs = np.flatnonzero(self.kind == ARC)
+        if len(arcs):
+            delta = np.radians(self.delta[arcs, None])
+            angle = np.radians(self.theta[arcs, None]) + t * delta
+            radius = self.radius[arcs, None]
+            speed = np.abs(delta) * np.hypot(radius.real * np.sin(angle), radius.imag * np.cos(angle))
+            lengths[arcs] = speed @ _GAUSS_WEIGHTS
+        return lengths
+
+    def sample(self, num_points: int) -> np.ndarray:
+        """
+        Muestrear el path en num_points + 1 posiciones uniformes de su longitud total
+
+        Equivale a path.point(i / num_points) de svgpathtools: la posición se reparte
+        entre segmentos según su longitud y dentro de cada segmento es lineal en t.
+
+        Args:
+            num_points: Número de intervalos
+
+        Returns:
+            Array complejo de puntos
+        """
+        if not len(self.kind):
+            return np.empty(0, dtype=complex)
+        num_points = max(1, int(num_points))
+        positions = np.arange(num_points + 1) / num_points
+        lengths = self.lengths()
+        total = lengths.sum()
+        if not total > 0:
+            return self.evaluate(np.array([0, len(self.kind) - 1]), np.array([0.0, 1.0]))
+        bounds = np.cumsum(lengths / total)
+        index = np.minimum(np.searchsorted(bounds, positions, side='left'), len(self.kind) - 1)
+        low = np.where(index > 0, bounds[np.maximum(index - 1, 0)], 0.0)
+        span = bounds[index] - low
+        t = np.clip(np.where(span > 0, (positions - low) / np.where(span > 0, span, 1.0), 0.0), 0.0, 1.0)
+        # Extremos exactos como en svgpathtools
+        index[0], t[0] = 0, 0.0
+        index[-1], t[-1] = len(self.kind) - 1, 1.0
+        return self.evaluate(index, t)
+
+    def bounds(self) -> Optional[Tuple[float, float, float, float]]:
+        """
+        Caja envolvente exacta del path
+
+        Los extremos de cada segmento están en sus puntos inicial y final o donde se
+        anula la derivada de x o de y: raíces de la derivada del polinomio en las
+        Béziers y ángulos de tangente horizontal o vertical en los arcos.
+
+        Returns:
+            Tupla (xmin, ymin, xmax, ymax) o None si el path no tiene segmentos
+        """
+        n = len(self.kind)
+        if not n:
+            return None
+        index = [np.arange(n), np.arange(n)]
+        t = [np.zeros(n), np.ones(n)]
+
+        curves = np.flatnonzero((self.kind == QUADRATIC) | (self.kind == CUBIC))
+        if len(curves):
+            c1, c2, c3 = (c[curves] for c in self.coefficients[1:])
+            for part in (np.real, np.imag):
+                # Derivada: 3 c3 t² + 2 c2 t + c1 = 0
+                a, b, c = 3 * part(c3), 2 * part(c2), part(c1)
+                disc = b * b - 4 * a * c
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    root = np.sqrt(np.maximum(disc, 0.0))
+                    quadratic = (a != 0) & (disc >= 0)
+                    candidates = [((-b + root) / (2 * a), quadratic), ((-b - root) / (2 * a), quadratic),
+                                  (-c / b, (a == 0) & (b != 0))]
+                for value, valid in candidates:
+                    valid = valid & (value > 0) & (value < 1)
+                    index.append(curves[valid])
+                    t.append(value[valid])
+
+        arcs = np.flatnonzero(self.kind == ARC)
+        if len(arcs):
+            rx, ry = self.radius[arcs].real, self.radius[arcs].imag
+            cos_phi, sin_phi = self.rot[arcs].real, self.rot[arcs].imag
+            start, sweep = np.radians(self.theta[arcs]), np.radians(self.delta[arcs])
+            # Ángulos de tangente vertical (extremos en x) y horizontal (extremos en y),
+            # cada uno más múltiplos de pi dentro del barrido del arco
+            for base in (np.arctan2(-ry * sin_phi, rx * cos_phi), np.arctan2(ry * cos_phi, rx * sin_phi)):
+                value = ((base - start)[:, None] + np.pi * np.arange(-4, 5)) / sweep[:, None]
+                valid = (value > 0) & (value < 1)
+                index.append(np.broadcast_to(arcs[:, None], value.shape)[valid])
+                t.append(value[valid])
+
+        points = self.evaluate(np.concatenate(index), np.concatenate(t))
+        return (float(points.real.min()), float(points.imag.min()),
+                float(points.real.max()), float(points.imag.max()))
+
+    def _subdivide(self, curves: np.ndarray, tolerance: float,
+                   max_depth: int = 16) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Subdividir segmentos curvos contra una tolerancia cordal
+
+        La subdivisión avanza por niveles para todos los segmentos a la vez: en cada
+        nivel se evalúan los puntos medios de todos los intervalos pendientes y se
+        dividen solo los que se desvían de su cuerda más que la tolerancia. Los
+        extremos de cada intervalo se arrastran del nivel anterior, así que cada
+        nivel evalúa solo los puntos medios. Las curvas empiezan con 4 tramos (para
+        no perder inflexiones) y los arcos con uno cada 45°.
+
+        Args:
+            curves: Índices de los segmentos a subdividir, todos Béziers o todos arcos
+            tolerance: Desviación máxima permitida entre curva y cuerda
+            max_depth: Profundidad máxima de subdivisión
+
+        Returns:
+            Tupla (segmento, t, punto) sin ordenar; cada par (segmento, t) aparece una vez
+        """
+        arcs = len(curves) > 0 and self.kind[curves[0]] == ARC
+        evaluate = self._evaluate_arcs if arcs else self._evaluate_polynomial
+        if arcs:
+            initial = np.maximum(4, np.ceil(np.abs(self.delta[curves]) / 45.0)).astype(np.int64)
+        else:
+            initial = np.full(len(curves), 4, dtype=np.int64)
+        index = np.repeat(curves, initial + 1)
+        first = np.repeat(np.cumsum(initial + 1) - (initial + 1), initial + 1)
+        step = np.arange(len(index)) - first
+        divisions = np.repeat(initial, initial + 1)
+        t = step * (1.0 / divisions)
+        t[step == divisions] = 1.0
+        points = evaluate(index, t)
+        done_index, done_t, done_points = [index], [t], [points]
+        lower = np.flatnonzero(step < divisions)
+        seg, lo, hi = index[lower], t[lower], t[lower + 1]
+        p_lo, p_hi = points[lower], points[lower + 1]
+
+        tolerance_sq = tolerance * tolerance
+        for _ in range(max_depth):
+            if seg.size == 0:
+                break
+            mid = 0.5 * (lo + hi)
+            p_mid = evaluate(seg, mid)
+            # Distancia del punto medio de la curva a la cuerda, comparada al cuadrado:
+            # |chord x offset| / |chord| > tolerance (|offset| si la cuerda es nula)
+            chord = p_hi - p_lo
+            offset = p_mid - p_lo
+            chord_sq = chord.real ** 2 + chord.imag ** 2
+            cross = (chord.conj() * offset).imag
+            split = cross * cross > tolerance_sq * chord_sq
+            degenerate = chord_sq == 0
+            if np.any(degenerate):
+                split[degenerate] = np.abs(offset[degenerate]) ** 2 > tolerance_sq
+            split = np.flatnonzero(split)
+            if not len(split):
+                break
+            seg, lo, hi, mid = seg.take(split), lo.take(split), hi.take(split), mid.take(split)
+            p_lo, p_hi, p_mid = p_lo.take(split), p_hi.take(split), p_mid.take(split)
+            done_index.append(seg)
+            done_t.append(mid)
+            done_points.append(p_mid)
+            seg = np.concatenate([seg, seg])
+            lo, hi = np.concatenate([lo, mid]), np.concatenate([mid, hi])
+            p_lo, p_hi = np.concatenate([p_lo, p_mid]), np.concatenate([p_mid, p_hi])
+
+        return np.concatenate(done_index), np.concatenate(done_t), np.concatenate(done_points)
+
+    def circular_arcs(self) -> np.ndarray:
+        """Índices de los arcos de circunferencia (rx == ry)"""
+        rx, ry = np.abs(self.radius.real), np.abs(self.radius.imag)
+        return np.flatnonzero((self.kind == ARC) & (rx > 0) & (np.abs(rx - ry) <= 1e-9 * np.maximum(rx, ry)))
+
+    def _split_circular_arcs(self, arcs: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Dividir arcos circulares en los extremos de cuadrante
+
+        Cada tramo barre como máximo 90°, de modo que la caja envolvente de los
+        vértices coincide con la del arco.
+
+        Args:
+            arcs: Índices de arcos circulares
+
+        Returns:
+            Tupla (segmento, clave de orden en (0, 1], punto final de cada tramo, bulge)
+        """
+        start_point = self.control[arcs, 0]
+        center = self.center[arcs]
+        radius = np.abs(start_point - center)
+        start = np.angle(start_point - center)
+        sweep = np.radians(self.delta[arcs])
+        quarter = np.pi / 2
+        low = np.minimum(start, start + sweep)
+        high = np.maximum(start, start + sweep)
+        # Hasta 4 múltiplos de 90° estrictamente dentro de un barrido de 360° o menos
+        cuts = (np.floor(low / quarter)[:, None] + np.arange(1, 6)) * quarter
+        inside = (cuts > low[:, None] + 1e-9) & (cuts < high[:, None] - 1e-9)
+        backwards = sweep < 0
+        cuts[backwards] = cuts[backwards, ::-1]
+        inside[backwards] = inside[backwards, ::-1]
+
+        angles = np.column_stack([start, cuts, start + sweep])
+        valid = np.column_stack([np.ones(len(arcs), dtype=bool), inside, np.ones(len(arcs), dtype=bool)])
+        rows, cols = np.nonzero(valid)
+        flat = angles[rows, cols]
+        # Cada tramo va del ángulo válido anterior de la misma fila al actual
+        piece = cols > 0
+        bulge = np.tan((flat[1:] - flat[:-1]) / 4.0)[piece[1:]]
+        rows = rows[piece]
+        points = center[rows] + radius[rows] * np.exp(1j * flat[piece])
+        # El último tramo termina exactamente en el final del arco
+        last = np.ones(len(rows), dtype=bool)
+        last[:-1] = rows[1:] != rows[:-1]
+        points[last] = self.control[arcs[rows[last]], 3]
+        # Clave de orden dentro del segmento: fracción de tramos, 1 en el último
+        count = np.bincount(rows, minlength=len(arcs))
+        rank = np.arange(len(rows)) - (np.cumsum(count) - count)[rows]
+        key = (rank + 1) / count[rows]
+        return arcs[rows], key, points, bulge
+
+    def flatten(self, tolerance: float, native_arcs: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Convertir el path en vértices
+
+        Las rectas aportan solo sus extremos; curvas y arcos se subdividen según la
+        tolerancia cordal. Con native_arcs los arcos de circunferencia se conservan
+        como arcos mediante su bulge (divididos en los extremos de cuadrante) y solo se
+        aplanan Béziers y arcos de elipse. Cada discontinuidad entre segmentos inicia
+        un nuevo tramo con el inicio del segmento.
+
+        Args:
+            tolerance: Tolerancia cordal en unidades SVG
+            native_arcs: Conservar los arcos de circunferencia
+
+        Returns:
+            Tupla (array (n, 2) de puntos, array (n,) de bulges; ver Toolpath)
+        """
+        n = len(self.kind)
+        if not n:
+            return np.empty((0, 2)), np.empty(0)
+        starts, ends = self.control[:, 0], self.control[:, 3]
+        jump = np.ones(n, dtype=bool)
+        jump[1:] = np.abs(starts[1:] - ends[:-1]) > 1e-12
+
+        kept = self.circular_arcs() if native_arcs else np.empty(0, dtype=np.int64)
+        curved = self.kind != LINE
+        curved[kept] = False
+        curves = np.flatnonzero(curved)
+        lines = np.flatnonzero(~curved & (self.kind == LINE))
+
+        parts_index = [np.flatnonzero(jump), lines]
+        parts_key = [np.zeros(np.count_nonzero(jump)), np.ones(len(lines))]
+        parts_point = [starts[jump], ends[lines]]
+        parts_bulge = [np.zeros(np.count_nonzero(jump)), np.zeros(len(lines))]
+        # Béziers y arcos se subdividen por separado para evaluar cada grupo sin máscaras
+        for group in (curves[self.kind[curves] != ARC], curves[self.kind[curves] == ARC]):
+            if not len(group):
+                continue
+            index, t, points = self._subdivide(group, tolerance)
+            beyond = t > 0
+            parts_index.append(index[beyond])
+            parts_key.append(t[beyond])
+            parts_point.append(points[beyond])
+            parts_bulge.append(np.zeros(np.count_nonzero(beyond)))
+        if len(kept):
+            index, key, points, bulge = self._split_circular_arcs(kept)
+            parts_index.append(index)
+            parts_key.append(key)
+            parts_point.append(points)
+            parts_bulge.append(bulge)
+
+        index = np.concatenate(parts_index)
+        order = np.argsort(2.0 * index + np.concatenate(parts_key))
+        points = np.concatenate(parts_point)[order]
+        return np.column_stack([points.real, points.imag]), np.concatenate(parts_bulge)[order]
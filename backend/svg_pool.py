@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Aplanado de elementos SVG en un pool de procesos
+Reparte los elementos en bloques entre varios procesos; el proceso principal crea un
+bloque de memoria compartida por tarea y cada proceso escribe en él la geometría de
+sus elementos (formato CSR), de modo que los puntos no se serializan como listas de
+tuplas. El bloque pertenece al proceso principal durante toda la tarea: en Windows la
+memoria compartida con nombre se libera al cerrarse su último descriptor
+"""
+
+import math
+import os
+import time
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+# Procesador de cada proceso del pool (se crea en la primera tarea)
+_worker_processor = None
+
+
+def _flatten_chunk(method: str, calls: List[tuple], name: str,
+                   capacity: int) -> Tuple[int, int, Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]]:
+    """
+    Ejecutar un método de SVGProcessor sobre un bloque de elementos (en el proceso hijo)
+
+    El resultado se escribe en el bloque de memoria compartida que ha creado el proceso
+    padre, con tres arrays consecutivos: offsets int64 (k + 1), puntos float64 (n, 2)
+    y bulges float64 (n,). Si no cabe, los arrays se devuelven con el resultado.
+
+    Args:
+        method: Nombre del método (flatten_element, bounds_element)
+        calls: Argumentos de cada llamada
+        name: Nombre del bloque de memoria compartida
+        capacity: Tamaño del bloque en bytes
+
+    Returns:
+        Tupla (número de elementos, número de puntos, arrays o None si se escribieron
+        en el bloque)
+    """
+    global _worker_processor
+    if _worker_processor is None:
+        from svg_processor import SVGProcessor
+        _worker_processor = SVGProcessor()
+    function = getattr(_worker_processor, method)
+    results = [function(*call) for call in calls]
+
+    offsets = np.zeros(len(results) + 1, dtype=np.int64)
+    np.cumsum([len(points) for points, _ in results], out=offsets[1:])
+    total = int(offsets[-1])
+    if _block_size(len(results), total) > capacity:
+        points = np.concatenate([points for points, _ in results]) if results else np.empty((0, 2))
+        bulges = np.concatenate([bulges for _, bulges in results]) if results else np.empty(0)
+        return len(results), total, (offsets, points.reshape(-1, 2), bulges)
+
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        shared_offsets, points, bulges = _views(block.buf, len(results), total)
+        shared_offsets[:] = offsets
+        for (chunk_points, chunk_bulges), start, end in zip(results, offsets[:-1], offsets[1:]):
+            points[start:end] = chunk_points
+            bulges[start:end] = chunk_bulges
+        # Las vistas deben liberarse antes de cerrar el bloque
+        del shared_offsets, points, bulges
+        return len(results), total, None
+    finally:
+        block.close()
+
+
+def _block_size(count: int, total: int) -> int:
+    """Bytes que ocupan los offsets, puntos y bulges de un bloque"""
+    return (count + 1) * 8 + total * 3 * 8
+
+
+def _views(buffer, count: int, total: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Arrays (offsets, puntos, bulges) sobre un bloque de memoria compartida"""
+    offsets = np.ndarray((count + 1,), dtype=np.int64, buffer=buffer)
+    points = np.ndarray((total, 2), dtype=np.float64, buffer=buffer, offset=offsets.nbytes)
+    bulges = np.ndarray((total,), dtype=np.float64, buffer=buffer, offset=offsets.nbytes + total * 16)
+    return offsets, points, bulges
+
+
+class FlattenPool:
+    """
+    Pool de procesos para aplanar elementos SVG
+
+    Los elementos se dividen en bloques contiguos (varios por proceso para repartir
+    la carga entre paths de distinto tamaño) y los resultados se reensamblan en el
+    orden original. Los documentos pequeños se procesan en el proceso actual, donde
+    arrancar y alimentar el pool costaría más que el propio aplanado. Si el pool
+    falla (procesos no disponibles o terminados) se vuelve al aplanado en serie.
+
+    El tamaño de cada bloque de memoria compartida se estima con los bytes por
+    elemento más altos observados (con margen); los bloques que no caben se
+    devuelven serializados y aumentan la estimación.
+    """
+
+    # Bytes por elemento reservados antes de la primera ejecución
+    INITIAL_BYTES_PER_ELEMENT = 4096
+
+    def __init__(self, workers: Optional[int] = None, min_elements: int = 2000, chunks_per_worker: int = 4):
+        """
+        Inicializar pool (los procesos se crean en el primer uso)
+
+        Args:
+            workers: Número de procesos (None = núcleos disponibles, 1 = desactivado)
+            min_elements: Elementos a partir de los cuales se usa el pool
+            chunks_per_worker: Bloques por proceso
+        """
+        if workers is None:
+            workers = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+        self.workers = max(1, int(workers))
+        self.min_elements = max(1, int(min_elements))
+        self.chunks_per_worker = max(1, int(chunks_per_worker))
+        self._executor = None
+        self._processor = None
+        self._bytes_per_element = self.INITIAL_BYTES_PER_ELEMENT
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Reiniciar contadores"""
+        self.parallel_runs = 0
+        self.serial_runs = 0
+        self.elements = 0
+        self.chunks = 0
+        self.failures = 0
+        self.overflows = 0
+        self.last_seconds = 0.0
+
+    def get_stats(self) -> Optional[Dict]:
+        """
+        Obtener estadísticas del pool
+
+        Returns:
+            Diccionario con procesos, ejecuciones en paralelo y en serie, elementos y
+            bloques procesados en paralelo, bloques que no cupieron en la memoria
+            compartida, fallos y duración de la última ejecución,
+            o None si el pool está desactivado (un solo proceso)
+        """
+        if self.workers <= 1:
+            return None
+        return {
+            'workers': self.workers,
+            'parallel_runs': self.parallel_runs,
+            'serial_runs': self.serial_runs,
+            'elements': self.elements,
+            'chunks': self.chunks,
+            'overflows': self.overflows,
+            'failures': self.failures,
+            'last_seconds': round(self.last_seconds, 4)
+        }
+
+    def map(self, method: str, calls: List[tuple]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Ejecutar SVGProcessor.<method>(*call) para cada llamada
+
+        Args:
+            method: Método que devuelve (puntos (n, 2), bulges (n,)): flatten_element
+                    o bounds_element
+            calls: Argumentos de cada llamada
+
+        Returns:
+            Lista de tuplas (puntos, bulges) en el orden de calls
+        """
+        start = time.perf_counter()
+        try:
+            if self.workers > 1 and len(calls) >= self.min_elements:
+                try:
+                    return self._map_parallel(method, calls)
+                except (BrokenProcessPool, OSError) as e:
+                    print(f"Advertencia: aplanado en paralelo no disponible, se usa un solo proceso: {str(e)}")
+                    self.failures += 1
+                    self.shutdown()
+            self.serial_runs += 1
+            if self._processor is None:
+                from svg_processor import SVGProcessor
+                self._processor = SVGProcessor()
+            function = getattr(self._processor, method)
+            return [function(*call) for call in calls]
+        finally:
+            self.last_seconds = time.perf_counter() - start
+
+    def _map_parallel(self, method: str, calls: List[tuple]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Repartir las llamadas en bloques entre los procesos y reensamblar en orden"""
+        size = math.ceil(len(calls) / (self.workers * self.chunks_per_worker))
+        executor = self._get_executor()
+        blocks, futures = [], []
+        try:
+            for i in range(0, len(calls), size):
+                chunk = calls[i:i + size]
+                capacity = _block_size(len(chunk), 0) + len(chunk) * self._bytes_per_element
+                block = shared_memory.SharedMemory(create=True, size=capacity)
+                blocks.append(block)
+                futures.append(executor.submit(_flatten_chunk, method, chunk, block.name, capacity))
+
+            results = []
+            error = None
+            # Se esperan todos los bloques aunque alguno falle antes de liberar la memoria
+            for future, block in zip(futures, blocks):
+                try:
+                    count, total, arrays = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                if error is not None:
+                    continue
+                if arrays is None:
+                    views = _views(block.buf, count, total)
+                    offsets, points, bulges = (array.copy() for array in views)
+                    del views
+                else:
+                    offsets, points, bulges = arrays
+                    self.overflows += 1
+                    # Margen del 50 % sobre el bloque que no cupo
+                    self._bytes_per_element = max(self._bytes_per_element,
+                                                  math.ceil(total * 24 * 1.5 / max(count, 1)))
+                bounds = offsets[1:-1]
+                results.extend(zip(np.split(points, bounds), np.split(bulges, bounds)))
+            if error is not None:
+                raise error
+        finally:
+            for future in futures:
+                future.cancel()
+            for future in futures:
+                if not future.cancelled():
+                    try:
+                        future.result()
+                    except Exception:
+                        pass
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+        self.parallel_runs += 1
+        self.elements += len(calls)
+        self.chunks += len(futures)
+        return results
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Pool de procesos (spawn: seguro con los hilos del servidor Flask)"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def shutdown(self) -> None:
+        """Terminar los procesos del pool (se vuelven a crear en el siguiente uso)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -6,11 +6,16 @@ Extrae paths y elementos de archivos SVG para generación de G-code
 """
 
 import xml.etree.ElementTree as ET
-from svgpathtools import parse_path, Path, Line, CubicBezier, QuadraticBezier, Arc
 import numpy as np
 from typing import List, Dict, Tuple, Optional
 import re
 import os
+from svg_transform import parse_transform, compose, max_scale, is_similarity, transform_batch
+from toolpath import flatten_arcs, split_arcs
+from svg_element import SVGElement
+from svg_path import SVGPath
+from svg_lod import vertex_importance
+from svg_numbers import parse_points, split_number_lists
 
 
 class SVGProcessor:
@@ -52,38 +57,7 @@ class SVGProcessor:
                 self.namespaces['svg'] = namespace
             
             # Obtener dimensiones del viewBox o width/height
-            viewbox = root.get('viewBox', '') or root.get('{http://www.w3.org/2000/svg}viewBox', '')
-            width = root.get('width', '') or root.get('{http://www.w3.org/2000/svg}width', '')
-            height = root.get('height', '') or root.get('{http://www.w3.org/2000/svg}height', '')
-            
-            # Función auxiliar para extraer número de string con unidades
-            def extract_number(value: str, default: float = 100.0) -> float:
-                if not value:
-                    return default
-                # Remover unidades comunes
-                value = value.strip().replace('px', '').replace('mm', '').replace('cm', '').replace('in', '').replace('pt', '')
-                try:
-                    return float(value)
-                except:
-                    return default
-            
-            # Parsear viewBox
-            if viewbox:
-                parts = viewbox.strip().split()
-                if len(parts) >= 4:
-                    try:
-                        x, y, w, h = map(float, parts[:4])
-                        svg_width = w
-                        svg_height = h
-                    except:
-                        svg_width = extract_number(width)
-                        svg_height = extract_number(height)
-                else:
-                    svg_width = extract_number(width)
-                    svg_height = extract_number(height)
-            else:
-                svg_width = extract_number(width)
-                svg_height = extract_number(height)
+            svg_width, svg_height, viewbox = self._document_size(root)
             
             return {
                 'root': root,
@@ -95,387 +69,115 @@ class SVGProcessor:
         except Exception as e:
             raise ValueError(f"Error al parsear SVG: {str(e)}")
     
-    def extract_elements(self, svg_path: str) -> List[Dict]:
+    def _document_size(self, root) -> Tuple[float, float, str]:
+        """
+        Obtener dimensiones del documento desde el viewBox o width/height de la raíz
+        
+        Args:
+            root: Elemento raíz <svg> (solo se leen sus atributos)
+            
+        Returns:
+            Tupla (ancho, alto, viewBox)
+        """
+        viewbox = root.get('viewBox', '') or root.get('{http://www.w3.org/2000/svg}viewBox', '')
+        width = root.get('width', '') or root.get('{http://www.w3.org/2000/svg}width', '')
+        height = root.get('height', '') or root.get('{http://www.w3.org/2000/svg}height', '')
+        
+        # Función auxiliar para extraer número de string con unidades
+        def extract_number(value: str, default: float = 100.0) -> float:
+            if not value:
+                return default
+            # Remover unidades comunes
+            value = value.strip().replace('px', '').replace('mm', '').replace('cm', '').replace('in', '').replace('pt', '')
+            try:
+                return float(value)
+            except:
+                return default
+        
+        # Parsear viewBox
+        if viewbox:
+            parts = viewbox.strip().split()
+            if len(parts) >= 4:
+                try:
+                    x, y, w, h = map(float, parts[:4])
+                    svg_width = w
+                    svg_height = h
+                except:
+                    svg_width = extract_number(width)
+                    svg_height = extract_number(height)
+            else:
+                svg_width = extract_number(width)
+                svg_height = extract_number(height)
+        else:
+            svg_width = extract_number(width)
+            svg_height = extract_number(height)
+        
+        return svg_width, svg_height, viewbox
+    
+    def extract_elements(self, svg_path: str, svg_info: Optional[Dict] = None) -> List[Dict]:
         """
         Extraer todos los elementos (paths, rect, circle, etc.) del SVG
         
         Args:
             svg_path: Ruta al archivo SVG
+            svg_info: Resultado de parse_svg si el documento ya se parseó (opcional)
             
         Returns:
             Lista de diccionarios con información de cada elemento
         """
         try:
-            svg_info = self.parse_svg(svg_path)
+            if svg_info is None:
+                svg_info = self.parse_svg(svg_path)
             root = svg_info['root']
             elements = []
             element_id = 0
             used_names = set()  # Rastrear nombres usados para evitar duplicados
+            next_suffix = {}  # Siguiente sufijo numérico a probar por nombre base
             
-            # Función auxiliar para detectar si un nombre es técnico
-            def is_technical_name(name):
-                if not name:
-                    return True
-                technical_patterns = ['__', '_w', 'Part__', 'Sprocket_', 'Python']
-                return any(pattern in name for pattern in technical_patterns)
-            
-            # Función auxiliar para extraer nombre/ID del elemento - buscar en múltiples lugares
-            def get_element_name(elem, default_prefix='element', parent_name=None):
-                # 0. PRIMERO: Buscar elemento <title> dentro del elemento (FreeCAD usa esto para nombres naturales)
-                for title_elem in elem.findall('.//{http://www.w3.org/2000/svg}title'):
-                    title_text = title_elem.text
-                    if title_text:
-                        # Limpiar formato b'nombre' que FreeCAD a veces usa
-                        title_text = title_text.strip()
-                        # Remover prefijo b' y sufijo ' si existe
-                        if title_text.startswith("b'") and title_text.endswith("'"):
-                            title_text = title_text[2:-1]
-                        elif title_text.startswith('b"') and title_text.endswith('"'):
-                            title_text = title_text[2:-1]
-                        # Solo usar el título si no es técnico
-                        if title_text and not is_technical_name(title_text):
-                            return title_text
-                
-                # También buscar en el elemento mismo (no solo hijos)
-                title_elem = elem.find('{http://www.w3.org/2000/svg}title')
-                if title_elem is not None and title_elem.text:
-                    title_text = title_elem.text.strip()
-                    if title_text.startswith("b'") and title_text.endswith("'"):
-                        title_text = title_text[2:-1]
-                    elif title_text.startswith('b"') and title_text.endswith('"'):
-                        title_text = title_text[2:-1]
-                    # Solo usar el título si no es técnico
-                    if title_text and not is_technical_name(title_text):
-                        return title_text
-                
-                # 1. Intentar obtener 'id' estándar
-                elem_id = elem.get('id', '')
-                if elem_id:
-                    # Si el ID es técnico y hay un nombre de grupo padre natural, preferir el padre
-                    if is_technical_name(elem_id) and parent_name and not is_technical_name(parent_name):
-                        return parent_name
-                    # Si el ID no es técnico, usarlo
-                    if not is_technical_name(elem_id):
-                        return elem_id
-                    # Si el ID es técnico pero no hay padre natural, devolver None para generar nombre descriptivo
-                    return None
-                
-                # 2. Intentar obtener 'inkscape:label' (común en FreeCAD/Inkscape)
-                # Buscar con namespace completo
-                inkscape_label = elem.get('{http://www.inkscape.org/namespaces/inkscape}label', '')
-                if inkscape_label:
-                    return inkscape_label
-                
-                # 3. Intentar obtener 'sodipodi:label'
-                sodipodi_label = elem.get('{http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd}label', '')
-                if sodipodi_label:
-                    return sodipodi_label
-                
-                # 4. Intentar obtener atributo 'name'
-                name = elem.get('name', '')
-                if name:
-                    return name
-                
-                # 5. Si está en un grupo con nombre natural (no técnico), usar el nombre del grupo
-                if parent_name and not is_technical_name(parent_name):
-                    return parent_name
-                
-                # 6. NO devolver nombre técnico del padre
-                return None
+            # Primer <title> natural del subárbol de cada elemento (FreeCAD usa títulos
+            # para los nombres), calculado una sola vez para todo el documento
+            subtree_titles = self._subtree_titles(root)
             
             # Función recursiva para extraer elementos
-            def extract_recursive(element, parent_transform=None, depth=0, parent_name=None):
-                nonlocal element_id
-                
-                # Obtener transformación del elemento
-                transform = element.get('transform', '')
-                if transform:
-                    # Parsear transformación básica (translate, scale, rotate)
-                    # Por simplicidad, almacenamos la cadena completa
-                    current_transform = transform
-                else:
-                    current_transform = parent_transform
-                
-                # Manejar namespaces correctamente
-                if '}' in element.tag:
-                    tag = element.tag.split('}')[-1]
-                else:
-                    tag = element.tag
+            def extract_recursive(element, parent_transform=None, depth=0, parent_name=None,
+                                  parent_matrix=None):
+                # Transformación del elemento compuesta con la del contenedor
+                current_transform, current_matrix = self._compose_transform(
+                    element.get('transform', ''), parent_transform, parent_matrix)
+                tag = element.tag.split('}')[-1]
                 
-                # Ignorar el elemento raíz <svg> - solo procesar sus hijos
                 if tag == 'svg':
-                    for child in element:
-                        extract_recursive(child, current_transform, depth + 1, parent_name)
-                    return
-                
-                # Si es un grupo (<g>), extraer su nombre y procesar hijos
-                if tag == 'g':
-                    # Para grupos, obtener el nombre del grupo (puede venir del título o del ID)
-                    group_name = get_element_name(element, 'group', parent_name)
-                    # Si el grupo tiene un título natural, ese es el nombre preferido para los hijos
-                    group_title = None
-                    title_elem = element.find('{http://www.w3.org/2000/svg}title')
-                    if title_elem is not None and title_elem.text:
-                        title_text = title_elem.text.strip()
-                        if title_text.startswith("b'") and title_text.endswith("'"):
-                            title_text = title_text[2:-1]
-                        elif title_text.startswith('b"') and title_text.endswith('"'):
-                            title_text = title_text[2:-1]
-                        # Solo usar título si no es técnico
-                        if title_text and not is_technical_name(title_text):
-                            group_title = title_text
-                    
-                    # Usar el título natural del grupo como nombre preferido para hijos
-                    # Si no hay título natural, NO usar el nombre del grupo si es técnico
-                    # Esto asegura que los hijos generen sus propios nombres descriptivos
-                    if group_title:
-                        final_group_name = group_title
-                    elif group_name and not is_technical_name(group_name):
-                        final_group_name = group_name
-                    else:
-                        # Si el grupo es técnico, NO pasar su nombre a los hijos
-                        # Los hijos generarán sus propios nombres descriptivos
-                        final_group_name = None
-                    
-                    # Procesar hijos con el nombre del grupo como contexto
-                    # IMPORTANTE: Si final_group_name es None (grupo técnico), los hijos generarán sus propios nombres
-                    # NO pasar parent_name para evitar que hereden nombres de grupos anteriores
-                    for child in element:
-                        extract_recursive(child, current_transform, depth + 1, final_group_name)
-                    return
-                
-                # Obtener el nombre/ID del elemento (con fallback)
-                elem_name = get_element_name(element, tag, parent_name)
-                
-                # Si el elemento tiene un ID técnico y hay un nombre de grupo padre natural,
-                # preferir el nombre del grupo padre (que viene del título natural)
-                # PERO solo si el padre no es técnico
-                if elem_name and parent_name:
-                    if is_technical_name(elem_name) and not is_technical_name(parent_name):
-                        # Usar el nombre del padre natural
-                        elem_name = parent_name
-                    elif is_technical_name(elem_name) and is_technical_name(parent_name):
-                        # Si ambos son técnicos, descartar y generar nombre descriptivo
-                        elem_name = None
-                elif not elem_name and parent_name and is_technical_name(parent_name):
-                    # Si no hay nombre y el padre es técnico, NO usar el padre
-                    elem_name = None
-                
-                # Si todavía no tenemos un nombre o es técnico, generar uno descriptivo basado en el tipo
-                if not elem_name or is_technical_name(elem_name):
-                    # Generar nombre descriptivo basado en el tipo de elemento
-                    type_names = {
-                        'circle': 'circunferencia',
-                        'ellipse': 'elipse',
-                        'rect': 'rectangulo',
-                        'path': 'trayectoria',
-                        'line': 'linea',
-                        'polyline': 'polilinea',
-                        'polygon': 'poligono'
-                    }
-                    descriptive_name = type_names.get(tag, tag)
-                    
-                    # IMPORTANTE: Solo usar el padre como prefijo si es natural (no técnico)
-                    # Si el padre es técnico o None, usar solo el nombre descriptivo
-                    if parent_name and not is_technical_name(parent_name):
-                        # Hay un padre natural, usarlo como prefijo
-                        base_name = f"{parent_name}_{descriptive_name}"
-                    else:
-                        # No hay padre natural o es técnico, usar solo el nombre descriptivo
-                        base_name = descriptive_name
-                    
-                    # Asegurar nombres únicos: si ya existe un elemento con este nombre, agregar sufijo
-                    elem_name = base_name
-                    counter = 1
-                    original_base = base_name
-                    while elem_name in used_names:
-                        elem_name = f"{original_base}_{counter}"
-                        counter += 1
-                    used_names.add(elem_name)
-                
-                # Ignorar otros elementos que no son formas (como <defs>, etc.)
-                # pero procesar sus hijos
-                if tag not in ['path', 'rect', 'circle', 'ellipse', 'line', 'polyline', 'polygon']:
-                    # Procesar hijos pero no agregar este elemento
-                    for child in element:
-                        extract_recursive(child, current_transform, depth + 1, elem_name or parent_name)
-                    return
-                
-                # Extraer diferentes tipos de elementos
-                # IMPORTANTE: Después de agregar un elemento, NO procesar sus hijos
-                # porque los elementos SVG (path, circle, etc.) no tienen hijos que sean formas
-                if tag == 'path':
-                    d = element.get('d', '')
-                    if d:
+                    # Ignorar el elemento raíz <svg> - solo procesar sus hijos
+                    child_name = parent_name
+                elif tag == 'g':
+                    # Nombre del grupo como contexto para los hijos
+                    title_elem = element.find(self.TITLE_TAG)
+                    group_title = self._clean_title(title_elem.text) if title_elem is not None else None
+                    child_name = self._group_child_name(element.attrib, subtree_titles.get(element),
+                                                        parent_name, group_title)
+                else:
+                    # Obtener el nombre/ID del elemento (con fallback a un nombre descriptivo único)
+                    elem_name = self._unique_name(element.attrib, subtree_titles.get(element), parent_name,
+                                                  tag, used_names, next_suffix)
+                    if tag in self.SHAPE_TAGS and self._shape_emits(tag, element.attrib):
                         elements.append({
                             'id': elem_name,
-                            'type': 'path',
-                            'd': d,
+                            'type': tag,
+                            'd': self._shape_path(tag, element.attrib),
                             'transform': current_transform,
-                            'fill': element.get('fill', 'black'),
-                            'stroke': element.get('stroke', 'none'),
-                            'stroke_width': element.get('stroke-width', '1'),
+                            'matrix': current_matrix,
+                            **self._shape_style(tag, element.attrib),
                             'element': element,
-                            'depth': depth
+                            'depth': depth,
+                            **{key: float(element.get(key, 0)) for key in self.SHAPE_KEYS.get(tag, ())}
                         })
-                        return  # NO procesar hijos de path
-                
-                elif tag == 'rect':
-                    x = float(element.get('x', 0))
-                    y = float(element.get('y', 0))
-                    width = float(element.get('width', 0))
-                    height = float(element.get('height', 0))
-                    rx = float(element.get('rx', 0))
-                    ry = float(element.get('ry', 0))
-                    
-                    # Convertir rect a path
-                    if rx == 0 and ry == 0:
-                        d = f"M {x} {y} L {x+width} {y} L {x+width} {y+height} L {x} {y+height} Z"
-                    else:
-                        d = f"M {x+rx} {y} L {x+width-rx} {y} A {rx} {ry} 0 0 1 {x+width} {y+ry} L {x+width} {y+height-ry} A {rx} {ry} 0 0 1 {x+width-rx} {y+height} L {x+rx} {y+height} A {rx} {ry} 0 0 1 {x} {y+height-ry} L {x} {y+ry} A {rx} {ry} 0 0 1 {x+rx} {y} Z"
-                    
-                    elements.append({
-                        'id': elem_name,
-                        'type': 'rect',
-                        'd': d,
-                        'transform': current_transform,
-                        'fill': element.get('fill', 'black'),
-                        'stroke': element.get('stroke', 'none'),
-                        'stroke_width': element.get('stroke-width', '1'),
-                        'element': element,
-                        'depth': depth,
-                        'x': x,
-                        'y': y,
-                        'width': width,
-                        'height': height
-                    })
-                    return  # NO procesar hijos de rect
-                
-                elif tag == 'circle':
-                    cx = float(element.get('cx', 0))
-                    cy = float(element.get('cy', 0))
-                    r = float(element.get('r', 0))
-                    
-                    # Convertir circle a path
-                    d = f"M {cx-r} {cy} A {r} {r} 0 0 1 {cx+r} {cy} A {r} {r} 0 0 1 {cx-r} {cy} Z"
-                    
-                    elements.append({
-                        'id': elem_name,
-                        'type': 'circle',
-                        'd': d,
-                        'transform': current_transform,
-                        'fill': element.get('fill', 'black'),
-                        'stroke': element.get('stroke', 'none'),
-                        'stroke_width': element.get('stroke-width', '1'),
-                        'element': element,
-                        'depth': depth,
-                        'cx': cx,
-                        'cy': cy,
-                        'r': r
-                    })
-                    return  # NO procesar hijos de circle
-                
-                elif tag == 'ellipse':
-                    cx = float(element.get('cx', 0))
-                    cy = float(element.get('cy', 0))
-                    rx = float(element.get('rx', 0))
-                    ry = float(element.get('ry', 0))
-                    
-                    # Convertir ellipse a path
-                    d = f"M {cx-rx} {cy} A {rx} {ry} 0 0 1 {cx+rx} {cy} A {rx} {ry} 0 0 1 {cx-rx} {cy} Z"
-                    
-                    elements.append({
-                        'id': elem_name,
-                        'type': 'ellipse',
-                        'd': d,
-                        'transform': current_transform,
-                        'fill': element.get('fill', 'black'),
-                        'stroke': element.get('stroke', 'none'),
-                        'stroke_width': element.get('stroke-width', '1'),
-                        'element': element,
-                        'depth': depth,
-                        'cx': cx,
-                        'cy': cy,
-                        'rx': rx,
-                        'ry': ry
-                    })
-                    return  # NO procesar hijos de ellipse
-                
-                elif tag == 'line':
-                    x1 = float(element.get('x1', 0))
-                    y1 = float(element.get('y1', 0))
-                    x2 = float(element.get('x2', 0))
-                    y2 = float(element.get('y2', 0))
-                    
-                    # Convertir line a path
-                    d = f"M {x1} {y1} L {x2} {y2}"
-                    
-                    elements.append({
-                        'id': elem_name,
-                        'type': 'line',
-                        'd': d,
-                        'transform': current_transform,
-                        'fill': 'none',
-                        'stroke': element.get('stroke', 'black'),
-                        'stroke_width': element.get('stroke-width', '1'),
-                        'element': element,
-                        'depth': depth,
-                        'x1': x1,
-                        'y1': y1,
-                        'x2': x2,
-                        'y2': y2
-                    })
-                    return  # NO procesar hijos de line
+                        # Las formas no tienen hijos que sean formas
+                        return
+                    # Otros elementos (<defs>, formas vacías, etc.): procesar sus hijos
+                    child_name = parent_name if tag in self.SHAPE_TAGS else (elem_name or parent_name)
                 
-                elif tag == 'polyline':
-                    points = element.get('points', '')
-                    if points:
-                        # Parsear puntos
-                        point_list = re.findall(r'([\d.]+),([\d.]+)', points)
-                        if point_list:
-                            path_points = ' '.join([f"{x},{y}" for x, y in point_list])
-                            d = f"M {path_points.replace(',', ' ').replace(' ', ' L ')}"
-                            
-                            elements.append({
-                                'id': elem_name,
-                                'type': 'polyline',
-                                'd': d,
-                                'transform': current_transform,
-                                'fill': 'none',
-                                'stroke': element.get('stroke', 'black'),
-                                'stroke_width': element.get('stroke-width', '1'),
-                                'element': element,
-                                'depth': depth
-                            })
-                            return  # NO procesar hijos de polyline
-                
-                elif tag == 'polygon':
-                    points = element.get('points', '')
-                    if points:
-                        # Parsear puntos
-                        point_list = re.findall(r'([\d.]+),([\d.]+)', points)
-                        if point_list:
-                            path_points = ' '.join([f"{x},{y}" for x, y in point_list])
-                            d = f"M {path_points.replace(',', ' ').replace(' ', ' L ')} Z"
-                            
-                            elements.append({
-                                'id': elem_name,
-                                'type': 'polygon',
-                                'd': d,
-                                'transform': current_transform,
-                                'fill': element.get('fill', 'black'),
-                                'stroke': element.get('stroke', 'none'),
-                                'stroke_width': element.get('stroke-width', '1'),
-                                'element': element,
-                                'depth': depth
-                            })
-                            return  # NO procesar hijos de polygon
-                
-                # Si llegamos aquí, el elemento no es una forma reconocida
-                # Procesar hijos solo si no es una forma (ya que las formas no tienen hijos que sean formas)
-                # Esto solo debería ejecutarse para elementos como <defs>, <title>, etc.
                 for child in element:
-                    extract_recursive(child, current_transform, depth + 1, parent_name)
+                    extract_recursive(child, current_transform, depth + 1, child_name, current_matrix)
             
             # Extraer elementos desde la raíz
             extract_recursive(root)
@@ -485,39 +187,623 @@ class SVGProcessor:
         except Exception as e:
             raise ValueError(f"Error al extraer elementos SVG: {str(e)}")
     
-    def path_to_points(self, path_d: str, num_points: int = 100) -> List[Tuple[float, float]]:
+    # Etiquetas de forma que se convierten a path y etiqueta <title> con namespace SVG
+    SHAPE_TAGS = ('path', 'rect', 'circle', 'ellipse', 'line', 'polyline', 'polygon')
+    TITLE_TAG = '{http://www.w3.org/2000/svg}title'
+    # Atributos numéricos de cada forma que extract_elements copia al elemento
+    SHAPE_KEYS = {
+        'rect': ('x', 'y', 'width', 'height'),
+        'circle': ('cx', 'cy', 'r'),
+        'ellipse': ('cx', 'cy', 'rx', 'ry'),
+        'line': ('x1', 'y1', 'x2', 'y2')
+    }
+    
+    @staticmethod
+    def _compose_transform(transform: str, parent_transform: Optional[str],
+                           parent_matrix: Optional[np.ndarray]) -> Tuple[Optional[str], Optional[np.ndarray]]:
         """
-        Convertir path SVG a lista de puntos
+        Transformación acumulada de un elemento
         
         Args:
-            path_d: Atributo 'd' del path SVG
-            num_points: Número de puntos a generar por segmento
+            transform: Atributo transform del elemento ('' si no tiene)
+            parent_transform: Transformación acumulada del contenedor
+            parent_matrix: Matriz acumulada del contenedor
             
         Returns:
-            Lista de tuplas (x, y)
+            Tupla (texto, matriz); sin transform propio se reutilizan los del contenedor,
+            de modo que los hermanos comparten la misma matriz
         """
-        try:
-            # Parsear path usando svgpathtools
-            path = parse_path(path_d)
+        if not transform:
+            return parent_transform, parent_matrix
+        current_transform = f"{parent_transform} {transform}" if parent_transform else transform
+        return current_transform, compose(parent_matrix, parse_transform(transform))
+    
+    @staticmethod
+    def _is_technical_name(name: Optional[str]) -> bool:
+        """Detectar nombres técnicos generados por FreeCAD/Inkscape"""
+        if not name:
+            return True
+        technical_patterns = ['__', '_w', 'Part__', 'Sprocket_', 'Python']
+        return any(pattern in name for pattern in technical_patterns)
+    
+    def _clean_title(self, text: Optional[str]) -> Optional[str]:
+        """Texto de un <title> sin el formato b'nombre' de FreeCAD (None si es técnico)"""
+        if not text:
+            return None
+        text = text.strip()
+        if text.startswith("b'") and text.endswith("'"):
+            text = text[2:-1]
+        elif text.startswith('b"') and text.endswith('"'):
+            text = text[2:-1]
+        if text and not self._is_technical_name(text):
+            return text
+        return None
+    
+    def _element_name(self, attrib: Dict, title: Optional[str], parent_name: Optional[str]) -> Optional[str]:
+        """
+        Nombre de un elemento (mismo orden de búsqueda que extract_elements)
+        
+        Args:
+            attrib: Atributos del elemento
+            title: Primer <title> descendiente no técnico (ya limpio)
+            parent_name: Nombre del contenedor
             
-            points = []
+        Returns:
+            Nombre o None para generar uno descriptivo
+        """
+        if title:
+            return title
+        elem_id = attrib.get('id', '')
+        if elem_id:
+            if self._is_technical_name(elem_id) and parent_name and not self._is_technical_name(parent_name):
+                return parent_name
+            if not self._is_technical_name(elem_id):
+                return elem_id
+            return None
+        for key in ('{http://www.inkscape.org/namespaces/inkscape}label',
+                    '{http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd}label', 'name'):
+            label = attrib.get(key, '')
+            if label:
+                return label
+        if parent_name and not self._is_technical_name(parent_name):
+            return parent_name
+        return None
+    
+    def _group_child_name(self, attrib: Dict, title: Optional[str], parent_name: Optional[str],
+                          group_title: Optional[str]) -> Optional[str]:
+        """
+        Nombre que un grupo <g> pasa a sus hijos
+        
+        Args:
+            attrib: Atributos del grupo
+            title: Primer <title> natural del subárbol del grupo
+            parent_name: Nombre del contenedor
+            group_title: <title> hijo directo del grupo (ya limpio)
             
-            # Generar puntos a lo largo del path
-            for i in range(num_points + 1):
-                t = i / num_points
-                try:
-                    point = path.point(t)
-                    points.append((point.real, point.imag))
-                except:
-                    # Si hay error, intentar con el siguiente punto
+        Returns:
+            Título natural del grupo, su nombre si no es técnico o None (los hijos
+            generan sus propios nombres descriptivos y no heredan los de grupos anteriores)
+        """
+        if group_title:
+            return group_title
+        group_name = self._element_name(attrib, title, parent_name)
+        if group_name and not self._is_technical_name(group_name):
+            return group_name
+        return None
+    
+    @staticmethod
+    def _shape_style(tag: str, attrib: Dict) -> Dict[str, str]:
+        """Relleno, trazo y grosor de una forma (las líneas abiertas no tienen relleno)"""
+        if tag in ('line', 'polyline'):
+            fill, stroke = 'none', attrib.get('stroke', 'black')
+        else:
+            fill, stroke = attrib.get('fill', 'black'), attrib.get('stroke', 'none')
+        return {'fill': fill, 'stroke': stroke, 'stroke_width': attrib.get('stroke-width', '1')}
+    
+    def _unique_name(self, attrib: Dict, title: Optional[str], parent_name: Optional[str],
+                     tag: str, used_names: set, next_suffix: Dict[str, int]) -> str:
+        """
+        Nombre final de un elemento que no es grupo
+        
+        Args:
+            attrib: Atributos del elemento
+            title: Primer <title> descendiente no técnico (ya limpio)
+            parent_name: Nombre del contenedor
+            tag: Etiqueta sin namespace
+            used_names: Nombres descriptivos ya generados (se actualiza)
+            next_suffix: Siguiente sufijo a probar por nombre base (se actualiza)
+            
+        Returns:
+            Nombre del elemento
+        """
+        elem_name = self._element_name(attrib, title, parent_name)
+        
+        # Si el elemento tiene un ID técnico y hay un nombre de grupo padre natural,
+        # preferir el nombre del grupo padre; si ambos son técnicos, generar uno descriptivo
+        if elem_name and parent_name:
+            if self._is_technical_name(elem_name) and not self._is_technical_name(parent_name):
+                elem_name = parent_name
+            elif self._is_technical_name(elem_name) and self._is_technical_name(parent_name):
+                elem_name = None
+        elif not elem_name and parent_name and self._is_technical_name(parent_name):
+            # Si no hay nombre y el padre es técnico, NO usar el padre
+            elem_name = None
+        
+        # Si todavía no tenemos un nombre o es técnico, generar uno descriptivo basado en el tipo
+        if not elem_name or self._is_technical_name(elem_name):
+            type_names = {
+                'circle': 'circunferencia',
+                'ellipse': 'elipse',
+                'rect': 'rectangulo',
+                'path': 'trayectoria',
+                'line': 'linea',
+                'polyline': 'polilinea',
+                'polygon': 'poligono'
+            }
+            descriptive_name = type_names.get(tag, tag)
+            # Solo usar el padre como prefijo si es natural (no técnico)
+            if parent_name and not self._is_technical_name(parent_name):
+                base_name = f"{parent_name}_{descriptive_name}"
+            else:
+                base_name = descriptive_name
+            
+            # Asegurar nombres únicos con el primer sufijo libre (_1, _2, ...). Los nombres
+            # nunca se liberan, así que la búsqueda continúa donde terminó la anterior
+            # del mismo nombre base en lugar de empezar de nuevo en _1
+            counter = next_suffix.get(base_name, 0)
+            elem_name = f"{base_name}_{counter}" if counter else base_name
+            while elem_name in used_names:
+                counter += 1
+                elem_name = f"{base_name}_{counter}"
+            next_suffix[base_name] = counter + 1
+            used_names.add(elem_name)
+        return elem_name
+    
+    def _subtree_titles(self, root) -> Dict:
+        """
+        Índice del primer <title> natural del subárbol de cada elemento
+        
+        Equivale a buscar con findall('.//title') en cada elemento, pero recorre el
+        árbol una sola vez de las hojas a la raíz: el título de un elemento es el del
+        primer hijo que sea un <title> natural o que tenga uno en su subárbol.
+        
+        Args:
+            root: Elemento raíz
+            
+        Returns:
+            Diccionario elemento -> título (solo elementos con título)
+        """
+        titles = {}
+        for elem in reversed(list(root.iter())):
+            for child in elem:
+                title = self._clean_title(child.text) if child.tag == self.TITLE_TAG else None
+                title = title or titles.get(child)
+                if title:
+                    titles[elem] = title
+                    break
+        return titles
+    
+    @staticmethod
+    def _shape_emits(tag: str, attrib: Dict) -> bool:
+        """Verificar si una forma genera un elemento (y por tanto no se procesan sus hijos)"""
+        if tag == 'path':
+            return bool(attrib.get('d', ''))
+        if tag in ('polyline', 'polygon'):
+            points = attrib.get('points', '')
+            return bool(points) and len(parse_points(points)) > 0
+        return tag in SVGProcessor.SHAPE_TAGS
+    
+    @staticmethod
+    def _shape_path(tag: str, attrib: Dict) -> str:
+        """Atributo d equivalente a una forma"""
+        if tag == 'path':
+            return attrib['d']
+        if tag == 'rect':
+            x = float(attrib.get('x', 0))
+            y = float(attrib.get('y', 0))
+            width = float(attrib.get('width', 0))
+            height = float(attrib.get('height', 0))
+            rx = float(attrib.get('rx', 0))
+            ry = float(attrib.get('ry', 0))
+            if rx == 0 and ry == 0:
+                return f"M {x} {y} L {x+width} {y} L {x+width} {y+height} L {x} {y+height} Z"
+            return f"M {x+rx} {y} L {x+width-rx} {y} A {rx} {ry} 0 0 1 {x+width} {y+ry} L {x+width} {y+height-ry} A {rx} {ry} 0 0 1 {x+width-rx} {y+height} L {x+rx} {y+height} A {rx} {ry} 0 0 1 {x} {y+height-ry} L {x} {y+ry} A {rx} {ry} 0 0 1 {x+rx} {y} Z"
+        if tag == 'circle':
+            cx = float(attrib.get('cx', 0))
+            cy = float(attrib.get('cy', 0))
+            r = float(attrib.get('r', 0))
+            return f"M {cx-r} {cy} A {r} {r} 0 0 1 {cx+r} {cy} A {r} {r} 0 0 1 {cx-r} {cy} Z"
+        if tag == 'ellipse':
+            cx = float(attrib.get('cx', 0))
+            cy = float(attrib.get('cy', 0))
+            rx = float(attrib.get('rx', 0))
+            ry = float(attrib.get('ry', 0))
+            return f"M {cx-rx} {cy} A {rx} {ry} 0 0 1 {cx+rx} {cy} A {rx} {ry} 0 0 1 {cx-rx} {cy} Z"
+        if tag == 'line':
+            x1 = float(attrib.get('x1', 0))
+            y1 = float(attrib.get('y1', 0))
+            x2 = float(attrib.get('x2', 0))
+            y2 = float(attrib.get('y2', 0))
+            return f"M {x1} {y1} L {x2} {y2}"
+        return SVGProcessor._points_path(parse_points(attrib['points']), closed=tag == 'polygon')
+    
+    @staticmethod
+    def _points_path(points: np.ndarray, closed: bool) -> str:
+        """
+        Atributo d de una polyline o un polygon
+        
+        Args:
+            points: Array (n, 2) de parse_points
+            closed: Cerrar el contorno (polygon)
+            
+        Returns:
+            Path "M x0 y0 L x1 y1 ..." (con Z si está cerrado)
+        """
+        d = 'M ' + ' L '.join(f"{x} {y}" for x, y in points.tolist())
+        return d + " Z" if closed else d
+    
+    def _scan_titles(self, svg_path: str) -> Tuple[Dict, Dict[int, List]]:
+        """
+        Primera pasada de extract_document: títulos de los contenedores
+        
+        El nombre de un grupo depende del primer <title> de todo su subárbol, que puede
+        aparecer después de sus primeros hijos. Esta pasada lo registra por número de
+        orden del elemento, solo para los elementos con títulos, liberando cada nodo
+        al cerrarse.
+        
+        Args:
+            svg_path: Ruta al archivo SVG
+            
+        Returns:
+            Tupla (información del documento, {orden: [título del subárbol, hay <title>
+            hijo directo, título hijo directo]})
+        """
+        titles: Dict[int, List] = {}
+        stack = []  # (orden, elemento, forma que genera elemento)
+        info = None
+        ordinal = 0
+        for event, elem in ET.iterparse(svg_path, events=('start', 'end')):
+            if event == 'start':
+                tag = elem.tag.split('}')[-1]
+                if info is None:
+                    if elem.tag.startswith('{'):
+                        namespace = elem.tag.split('}')[0][1:]
+                        ET.register_namespace('', namespace)
+                        self.namespaces['svg'] = namespace
+                    svg_width, svg_height, viewbox = self._document_size(elem)
+                    info = {'width': svg_width, 'height': svg_height, 'viewbox': viewbox}
+                stack.append((ordinal, elem, self._shape_emits(tag, elem.attrib)))
+                ordinal += 1
+                continue
+            
+            stack.pop()
+            if elem.tag == self.TITLE_TAG and stack:
+                title = self._clean_title(elem.text)
+                parent_ordinal, parent, _ = stack[-1]
+                if parent.tag.split('}')[-1] == 'g':
+                    entry = titles.setdefault(parent_ordinal, [None, False, None])
+                    if not entry[1]:
+                        entry[1] = True
+                        entry[2] = title
+                if title:
+                    # Si un ancestro ya tiene título, los exteriores también
+                    for ancestor, _, emits in reversed(stack):
+                        if emits:
+                            continue
+                        entry = titles.setdefault(ancestor, [None, False, None])
+                        if entry[0] is not None:
+                            break
+                        entry[0] = title
+            elem.clear()
+            if stack:
+                stack[-1][1].remove(elem)
+        return info, titles
+    
+    def extract_document(self, svg_path: str) -> Dict:
+        """
+        Extraer información y elementos del SVG sin cargar el árbol completo
+        
+        Produce los mismos elementos que extract_elements (nombres, transformaciones,
+        estilos y d) como registros SVGElement, recorriendo el archivo con iterparse y
+        liberando cada nodo al procesarlo, de modo que la memoria no depende del tamaño
+        del DOM. El archivo se lee dos veces (ver _scan_titles).
+        
+        Args:
+            svg_path: Ruta al archivo SVG
+            
+        Returns:
+            Diccionario con width, height, viewbox y elements (lista de SVGElement)
+        """
+        try:
+            try:
+                info, titles = self._scan_titles(svg_path)
+            except ET.ParseError as e:
+                raise ValueError(f"Error al parsear XML del SVG: {str(e)}")
+            
+            no_titles = (None, False, None)
+            buffer = bytearray()
+            elements = []
+            used_names = set()
+            next_suffix = {}
+            # Marco de cada elemento abierto: (modo, transform, matriz, profundidad,
+            # nombre para los hijos, elemento). Modos: 0 = procesar hijos,
+            # 1 = forma (se completa al cerrarse), 2 = ignorado (dentro de una forma)
+            frames = []
+            ordinal = 0
+            for event, elem in ET.iterparse(svg_path, events=('start', 'end')):
+                if event == 'start':
+                    current = ordinal
+                    ordinal += 1
+                    if frames and frames[-1][0] != 0:
+                        frames.append((2, None, None, 0, None, elem))
+                        continue
+                    if frames:
+                        _, parent_transform, parent_matrix, parent_depth, parent_name, _ = frames[-1]
+                        depth = parent_depth + 1
+                    else:
+                        parent_transform = parent_matrix = parent_name = None
+                        depth = 0
+                    
+                    current_transform, current_matrix = self._compose_transform(
+                        elem.get('transform', ''), parent_transform, parent_matrix)
+                    tag = elem.tag.split('}')[-1]
+                    if tag == 'svg':
+                        frames.append((0, current_transform, current_matrix, depth, parent_name, elem))
+                    elif tag == 'g':
+                        subtree_title, _, group_title = titles.get(current, no_titles)
+                        child_name = self._group_child_name(elem.attrib, subtree_title, parent_name, group_title)
+                        frames.append((0, current_transform, current_matrix, depth, child_name, elem))
+                    elif tag in self.SHAPE_TAGS and self._shape_emits(tag, elem.attrib):
+                        # El nombre depende de los <title> hijos: se asigna al cerrar la forma
+                        frames.append((1, current_transform, current_matrix, depth, parent_name, elem))
+                    else:
+                        elem_name = self._unique_name(elem.attrib, titles.get(current, no_titles)[0],
+                                                      parent_name, tag, used_names, next_suffix)
+                        child_name = parent_name if tag in self.SHAPE_TAGS else (elem_name or parent_name)
+                        frames.append((0, current_transform, current_matrix, depth, child_name, elem))
                     continue
+                
+                mode, current_transform, current_matrix, depth, parent_name, _ = frames.pop()
+                if mode == 2:
+                    continue
+                if mode == 1:
+                    tag = elem.tag.split('}')[-1]
+                    title = None
+                    for title_elem in elem.iter(self.TITLE_TAG):
+                        title = self._clean_title(title_elem.text)
+                        if title:
+                            break
+                    elem_name = self._unique_name(elem.attrib, title, parent_name, tag, used_names, next_suffix)
+                    start = len(buffer)
+                    buffer += self._shape_path(tag, elem.attrib).encode('utf-8')
+                    elements.append(SVGElement(elem_name, tag, buffer, start, len(buffer),
+                                               transform=current_transform, matrix=current_matrix,
+                                               depth=depth, **self._shape_style(tag, elem.attrib)))
+                elem.clear()
+                if frames:
+                    frames[-1][5].remove(elem)
             
-            return points
+            info['elements'] = elements
+            return info
             
         except Exception as e:
+            raise ValueError(f"Error al extraer elementos SVG: {str(e)}")
+    
+    def path_to_points(self, path_d: str, num_points: int = 100,
+                       tolerance: Optional[float] = None) -> List[Tuple[float, float]]:
+        """
+        Convertir path SVG a lista de puntos
+        
+        Args:
+            path_d: Atributo 'd' del path SVG
+            num_points: Número de intervalos uniformes (según la longitud) del path
+            tolerance: Tolerancia cordal en unidades SVG. Si se especifica se usa
+                       aplanado adaptativo por segmento en lugar de num_points
+            
+        Returns:
+            Lista de tuplas (x, y)
+        """
+        try:
+            # Parsear el path una sola vez en arrays de segmentos
+            path = SVGPath.parse(path_d)
+        except Exception:
             # Si falla el parsing, intentar método simple
             # Extraer comandos M, L, C, etc. y convertirlos a puntos
             return self._simple_path_to_points(path_d)
+        
+        if tolerance is not None and tolerance > 0:
+            points, _ = path.flatten(tolerance)
+            return [(float(x), float(y)) for x, y in points]
+        
+        points = path.sample(num_points)
+        return list(zip(points.real.tolist(), points.imag.tolist()))
+    
+    def path_to_primitives(self, path_d: str, tolerance: float = 0.02) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Convertir path SVG a vértices con arcos exactos
+        
+        Las rectas aportan sus extremos y los arcos circulares (círculos, esquinas
+        redondeadas, comandos A con rx == ry) se conservan como arcos mediante su
+        bulge para emitirse como G2/G3. Solo las curvas Bézier y los arcos de elipse
+        no circulares se aplanan según la tolerancia.
+        
+        Args:
+            path_d: Atributo 'd' del path SVG
+            tolerance: Tolerancia cordal en unidades SVG para las curvas aplanadas
+            
+        Returns:
+            Tupla (array (n, 2) de puntos, array (n,) de bulges; ver Toolpath)
+        """
+        try:
+            path = SVGPath.parse(path_d)
+        except Exception:
+            points = np.asarray(self._simple_path_to_points(path_d), dtype=np.float64).reshape(-1, 2)
+            return points, np.zeros(len(points))
+        
+        return path.flatten(tolerance, native_arcs=True)
+    
+    def apply_transforms(self, elements: List[Dict], arrays: List[np.ndarray]) -> List[np.ndarray]:
+        """
+        Aplicar a los puntos de cada elemento su transformación acumulada
+        
+        Args:
+            elements: Elementos de extract_elements (clave 'matrix')
+            arrays: Array (n, 2) de puntos de cada elemento en coordenadas locales
+            
+        Returns:
+            Lista de arrays en coordenadas del documento
+        """
+        return transform_batch([elem.get('matrix') for elem in elements], arrays)
+    
+    def flatten_element(self, path_d: str, tolerance: float, native_arcs: bool = True,
+                        keep_arcs: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Aplanar un path en sus coordenadas locales
+        
+        Args:
+            path_d: Atributo 'd' del path SVG
+            tolerance: Tolerancia cordal en unidades locales
+            native_arcs: Conservar los arcos circulares (ver path_to_primitives)
+            keep_arcs: False si la transformación del elemento deforma las
+                       circunferencias; los arcos se aplanan entonces aquí
+            
+        Returns:
+            Tupla (puntos (n, 2), bulges (n,))
+        """
+        if native_arcs:
+            points, bulge = self.path_to_primitives(path_d, tolerance=tolerance)
+            if not keep_arcs and np.any(bulge != 0):
+                points = flatten_arcs(points, bulge, tolerance)
+                bulge = np.zeros(len(points))
+            return points, bulge
+        try:
+            return SVGPath.parse(path_d).flatten(tolerance)
+        except Exception:
+            points = np.asarray(self._simple_path_to_points(path_d), dtype=np.float64).reshape(-1, 2)
+            return points, np.zeros(len(points))
+    
+    def bounds_element(self, path_d: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Esquinas de la caja envolvente de un path en sus coordenadas locales
+
+        Args:
+            path_d: Atributo 'd' del path SVG
+
+        Returns:
+            Tupla (esquinas (4, 2), bulges nulos (4,)) con el formato de flatten_element;
+            arrays vacíos si el path no tiene geometría
+        """
+        try:
+            box = SVGPath.parse(path_d).bounds()
+        except Exception:
+            points = np.asarray(self._simple_path_to_points(path_d), dtype=np.float64).reshape(-1, 2)
+            box = (*points.min(axis=0), *points.max(axis=0)) if len(points) else None
+        if box is None:
+            return np.empty((0, 2)), np.empty(0)
+        xmin, ymin, xmax, ymax = box
+        corners = np.array([[xmin, ymin], [xmax, ymin], [xmax, ymax], [xmin, ymax]], dtype=np.float64)
+        return corners, np.zeros(4)
+
+    def elements_to_bounds(self, elements: List[Dict], pool=None) -> np.ndarray:
+        """
+        Cajas envolventes de los elementos en coordenadas del documento
+
+        Se transforman las cuatro esquinas de la caja local de cada elemento, así que
+        con rotaciones la caja resultante contiene al elemento pero no es mínima.
+
+        Args:
+            elements: Elementos de extract_elements
+            pool: FlattenPool para calcularlas en varios procesos (None = en este proceso)
+
+        Returns:
+            Array (n, 4) [xmin, ymin, xmax, ymax] (NaN en elementos sin geometría)
+        """
+        calls = [(elem['d'],) for elem in elements]
+        if pool is not None:
+            local = pool.map('bounds_element', calls)
+        else:
+            local = [self.bounds_element(*call) for call in calls]
+        corners = self.apply_transforms(elements, [points for points, _ in local])
+        bounds = np.full((len(elements), 4), np.nan)
+        for i, points in enumerate(corners):
+            if len(points):
+                bounds[i, :2] = points.min(axis=0)
+                bounds[i, 2:] = points.max(axis=0)
+        return bounds
+
+    def elements_to_geometry(self, elements: List[Dict], tolerance: float = 0.02,
+                             native_arcs: bool = True, pool=None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Aplanar elementos y llevarlos a coordenadas del documento
+        
+        Cada elemento se aplana en sus coordenadas locales con la tolerancia dividida
+        por la escala de su transformación y luego se transforma junto con los demás
+        elementos de su grupo (ver transform_batch). Los arcos se conservan si la
+        transformación mantiene las circunferencias; con escala no uniforme o sesgo
+        se aplanan antes de transformar.
+        
+        Args:
+            elements: Elementos de extract_elements
+            tolerance: Tolerancia cordal en unidades del documento
+            native_arcs: Conservar los arcos circulares (ver path_to_primitives)
+            pool: FlattenPool para aplanar en varios procesos (None = en este proceso)
+            
+        Returns:
+            Lista de tuplas (puntos (n, 2), bulges (n,)) por elemento
+        """
+        calls = []
+        for elem in elements:
+            matrix = elem.get('matrix')
+            calls.append((elem['d'], tolerance / max(max_scale(matrix), 1e-12), native_arcs, is_similarity(matrix)))
+        if pool is not None:
+            local = pool.map('flatten_element', calls)
+        else:
+            local = [self.flatten_element(*call) for call in calls]
+        arrays = [points for points, _ in local]
+        bulges = [bulge for _, bulge in local]
+        
+        arrays = self.apply_transforms(elements, arrays)
+        for i, elem in enumerate(elements):
+            matrix = elem.get('matrix')
+            if matrix is None or not np.any(bulges[i] != 0):
+                continue
+            # Una reflexión invierte el sentido de giro de los arcos
+            if np.linalg.det(matrix[:2, :2]) < 0:
+                bulges[i] = -bulges[i]
+            # Tras una rotación los vértices ya no están en los extremos de cuadrante
+            if matrix[0, 1] != 0 or matrix[1, 0] != 0:
+                arrays[i], bulges[i] = split_arcs(arrays[i], bulges[i])
+        return list(zip(arrays, bulges))
+    
+    def elements_to_lod(self, elements: List[Dict], tolerance: float,
+                        pool=None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Geometría de vista previa con niveles de detalle (ver LODPyramid)
+        
+        Los elementos se aplanan con la tolerancia más fina y cada vértice recibe su
+        importancia Douglas-Peucker en coordenadas del documento; los vértices que no
+        superan la tolerancia no aparecen en ningún nivel y se descartan.
+        
+        Args:
+            elements: Elementos de extract_elements
+            tolerance: Tolerancia del nivel más detallado en unidades del documento
+            pool: FlattenPool para aplanar en varios procesos (None = en este proceso)
+            
+        Returns:
+            Lista de tuplas (puntos (n, 2), importancias (n,)) por elemento
+        """
+        geometry = self.elements_to_geometry(elements, tolerance=tolerance, native_arcs=False, pool=pool)
+        if not geometry:
+            return []
+        lengths = [len(points) for points, _ in geometry]
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        points = np.concatenate([points for points, _ in geometry]).reshape(-1, 2)
+        importance = vertex_importance(points, tolerance, offsets)
+        
+        keep = importance > tolerance
+        offsets = np.concatenate([[0], np.cumsum(keep)])[offsets]
+        bounds = offsets[1:-1]
+        return list(zip(np.split(points[keep], bounds), np.split(importance[keep], bounds)))
     
     def _simple_path_to_points(self, path_d: str) -> List[Tuple[float, float]]:
         """
@@ -526,18 +812,14 @@ class SVGProcessor:
         points = []
         current_x, current_y = 0, 0
         
-        # Parsear comandos básicos
-        commands = re.findall(r'([MmLlHhVvCcSsQqTtAaZz])([^MmLlHhVvCcSsQqTtAaZz]*)', path_d)
+        # Parsear comandos básicos y los números de todos ellos en bloque
+        chunks = re.split(r'([MmLlHhVvCcSsQqTtAaZz])', path_d)
+        arguments = chunks[2::2]
         
-        for cmd, args in commands:
-            args = args.strip()
-            if not args:
+        for cmd, args, numbers in zip(chunks[1::2], arguments, split_number_lists(arguments)):
+            if not args.strip():
                 continue
             
-            # Parsear números
-            numbers = re.findall(r'[-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?', args)
-            numbers = [float(n) for n in numbers]
-            
             if cmd.upper() == 'M':  # Move to
                 if len(numbers) >= 2:
                     current_x, current_y = numbers[0], numbers[1]
@@ -571,10 +853,38 @@ class SVGProcessor:
         
         return points
     
+    def _document_info(self, svg_path: str) -> Dict:
+        """
+        Dimensiones del documento leyendo el archivo con iterparse
+        
+        Args:
+            svg_path: Ruta al archivo SVG
+            
+        Returns:
+            Diccionario con width, height y viewbox
+            
+        Raises:
+            ValueError: Si el XML no es válido
+        """
+        info = None
+        try:
+            for event, elem in ET.iterparse(svg_path, events=('start', 'end')):
+                if event == 'start':
+                    if info is None:
+                        svg_width, svg_height, viewbox = self._document_size(elem)
+                        info = {'width': svg_width, 'height': svg_height, 'viewbox': viewbox}
+                    continue
+                elem.clear()
+        except ET.ParseError as e:
+            raise ValueError(f"Error al parsear XML del SVG: {str(e)}")
+        return info
+    
     def get_svg_info(self, svg_path: str) -> Dict:
         """
         Obtener información general del SVG
         
+        Recorre el archivo con extract_document, sin cargar el árbol completo.
+        
         Args:
             svg_path: Ruta al archivo SVG
             
@@ -582,16 +892,16 @@ class SVGProcessor:
             Diccionario con información del SVG
         """
         try:
-            svg_info = self.parse_svg(svg_path)
             file_size = os.path.getsize(svg_path)
             
             # Intentar extraer elementos, pero no fallar si hay problemas
-            elements = []
             try:
-                elements = self.extract_elements(svg_path)
+                svg_info = self.extract_document(svg_path)
+                elements = svg_info['elements']
             except Exception as extract_error:
                 # Si falla la extracción, continuar con información básica
                 print(f"Advertencia: Error al extraer elementos: {str(extract_error)}")
+                svg_info = self._document_info(svg_path)
                 elements = []
             
             return {
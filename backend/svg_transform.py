@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Transformaciones afines de SVG
+Convierte el atributo transform en matrices 3x3 y las aplica de forma vectorizada a
+los puntos ya aplanados de los elementos
+"""
+
+import re
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from svg_numbers import split_number_lists
+
+_TRANSFORM = re.compile(r'(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)')
+
+
+def parse_transform(text: Optional[str]) -> Optional[np.ndarray]:
+    """
+    Convertir un atributo transform de SVG en una matriz afín
+
+    Las operaciones se componen de izquierda a derecha, como en SVG (la última se
+    aplica primero a los puntos).
+
+    Args:
+        text: Valor del atributo (p. ej. "translate(10,20) scale(1,-1)")
+
+    Returns:
+        Matriz 3x3 o None si el atributo está vacío o no contiene operaciones
+    """
+    if not text:
+        return None
+    matrix = None
+    operations = _TRANSFORM.findall(text)
+    for (name, _), values in zip(operations, split_number_lists([args for _, args in operations])):
+        step = np.eye(3)
+        if name == 'matrix' and len(values) == 6:
+            a, b, c, d, e, f = values
+            step[:2] = [[a, c, e], [b, d, f]]
+        elif name == 'translate' and values:
+            step[0, 2] = values[0]
+            step[1, 2] = values[1] if len(values) > 1 else 0.0
+        elif name == 'scale' and values:
+            step[0, 0] = values[0]
+            step[1, 1] = values[1] if len(values) > 1 else values[0]
+        elif name == 'rotate' and values:
+            angle = np.radians(values[0])
+            cos, sin = np.cos(angle), np.sin(angle)
+            step[:2, :2] = [[cos, -sin], [sin, cos]]
+            if len(values) >= 3:
+                # Rotación alrededor de (cx, cy): translate(c) rotate translate(-c)
+                cx, cy = values[1], values[2]
+                step[:2, 2] = [cx - cos * cx + sin * cy, cy - sin * cx - cos * cy]
+        elif name == 'skewX' and values:
+            step[0, 1] = np.tan(np.radians(values[0]))
+        elif name == 'skewY' and values:
+            step[1, 0] = np.tan(np.radians(values[0]))
+        else:
+            continue
+        matrix = step if matrix is None else matrix @ step
+    return matrix
+
+
+def compose(parent: Optional[np.ndarray], child: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    """Componer la matriz de un elemento con la de su contenedor (None = identidad)"""
+    if child is None:
+        return parent
+    if parent is None:
+        return child
+    return parent @ child
+
+
+def max_scale(matrix: Optional[np.ndarray]) -> float:
+    """Mayor factor de escala de la parte lineal (valor singular máximo)"""
+    if matrix is None:
+        return 1.0
+    return float(np.linalg.norm(matrix[:2, :2], 2))
+
+
+def is_similarity(matrix: Optional[np.ndarray], tolerance: float = 1e-9) -> bool:
+    """
+    Verificar si la matriz conserva las circunferencias (rotación, escala uniforme,
+    reflexión y traslación)
+    """
+    if matrix is None:
+        return True
+    (a, c), (b, d) = matrix[:2, :2]
+    norm = max(abs(a * d - b * c), 1e-300)
+    return abs(a * a + b * b - c * c - d * d) <= tolerance * norm and abs(a * c + b * d) <= tolerance * norm
+
+
+def transform_batch(matrices: List[Optional[np.ndarray]], arrays: List[np.ndarray]) -> List[np.ndarray]:
+    """
+    Aplicar a cada array de puntos la matriz de su elemento
+
+    Los elementos que comparten la misma matriz (p. ej. hijos de un mismo grupo) se
+    transforman juntos con una única multiplicación.
+
+    Args:
+        matrices: Matriz de cada elemento (None = identidad)
+        arrays: Array (n, 2) de puntos de cada elemento
+
+    Returns:
+        Lista de arrays transformados (los elementos sin matriz se devuelven sin cambios)
+    """
+    result = list(arrays)
+    batches: Dict[int, Tuple[np.ndarray, List[int]]] = {}
+    for i, matrix in enumerate(matrices):
+        if matrix is not None and len(arrays[i]):
+            batches.setdefault(id(matrix), (matrix, []))[1].append(i)
+    for matrix, members in batches.values():
+        stacked = np.concatenate([arrays[i] for i in members])
+        moved = stacked @ matrix[:2, :2].T + matrix[:2, 2]
+        bounds = np.cumsum([len(arrays[i]) for i in members])[:-1]
+        for i, piece in zip(members, np.split(moved, bounds)):
+            result[i] = piece
+    return result
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Expansión de bucles O-word en GCodeParser
+"""
+
+import numpy as np
+import pytest
+
+from gcode_parser import GCodeParser
+
+BODY = ''.join(f'G1 X{i + 1} Y{i % 3} F600 S{i * 10}\n' for i in range(5))
+
+
+def parse(text: str, chunk_size: int = 8 * 1024 * 1024):
+    """Movimientos (x, y, línea) y líneas contadas de un texto"""
+    chunks = list(GCodeParser(chunk_size=chunk_size).iter_text(text))
+    moves = {key: np.concatenate([chunk['moves'][key] for chunk in chunks]) for key in ('x', 'y', 'line')}
+    return moves, sum(chunk['lines'] for chunk in chunks)
+
+
+@pytest.mark.parametrize('chunk_size', [7, 32, 1 << 20])
+def test_repeat_matches_unrolled(chunk_size):
+    looped, looped_lines = parse('G21\nM4\no100 repeat [3]\n' + BODY + 'o100 endrepeat\nG0 X0 Y0\nM5\n', chunk_size)
+    unrolled, _ = parse('G21\nM4\n' + BODY * 3 + 'G0 X0 Y0\nM5\n')
+    np.testing.assert_array_equal(looped['x'], unrolled['x'])
+    np.testing.assert_array_equal(looped['y'], unrolled['y'])
+    # Las repeticiones conservan los números de línea del archivo y no suman líneas
+    assert looped['line'][:5].tolist() == looped['line'][5:10].tolist() == [4, 5, 6, 7, 8]
+    assert looped_lines == 11
+
+
+@pytest.mark.parametrize('chunk_size', [7, 1 << 20])
+def test_nested_loops(chunk_size):
+    text = 'o1 repeat [2]\nG1 X100\no2 repeat [3]\n' + BODY + 'o2 endrepeat\no1 endrepeat\n'
+    moves, _ = parse(text, chunk_size)
+    expected, _ = parse(('G1 X100\n' + BODY * 3) * 2)
+    np.testing.assert_array_equal(moves['x'], expected['x'])
+
+
+def test_zero_and_missing_count():
+    moves, _ = parse('o1 repeat [0]\nG1 X5\no1 endrepeat\no2 repeat\nG1 X6\no2 endrepeat\n')
+    assert moves['x'].tolist() == [6.0]
+
+
+def test_unclosed_loop_runs_once():
+    moves, _ = parse('G1 X1\no7 repeat [4]\n' + BODY, chunk_size=16)
+    expected, _ = parse('G1 X1\n' + BODY)
+    np.testing.assert_array_equal(moves['x'], expected['x'])
+
+
+def test_loop_lines_are_case_insensitive_with_comments():
+    moves, _ = parse('O10 REPEAT [2] (dos pasadas)\nG1 X5 ; corte\no10 ENDREPEAT\n')
+    assert moves['x'].tolist() == [5.0, 5.0]
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pausas de cada trabajo de origen al combinar trabajos con JobMerger
+"""
+
+from collections import Counter
+
+import pytest
+
+from gcode_generator import LaserGCodeGenerator
+from job_merger import JobMerger
+
+SQUARE = [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]]
+
+
+def pauses(lines):
+    """Líneas G4 de un programa"""
+    return Counter(line for line in lines if line.startswith('G4'))
+
+
+def dwell(lines):
+    """Tiempo total de las pausas G4 en segundos"""
+    return sum(float(line.split()[1][1:]) for line in lines if line.startswith('G4'))
+
+
+@pytest.fixture(scope='module')
+def jobs():
+    """Trabajos SVG (dos capas), texto (tres capas) y de cortes con sus programas"""
+    svg = LaserGCodeGenerator(table_width=50, table_height=50)
+    svg_lines = svg.generate_gcode_from_svg_layers(layers=[
+        {'layer_name': 'A', 'speed': 300, 'power': 80, 'num_passes': 3,
+         'elements': [{'id': 'a', 'points': SQUARE, 'bulges': [0] * 5}]},
+        {'layer_name': 'B', 'speed': 300, 'power': 40, 'num_passes': 1,
+         'elements': [{'id': 'b', 'points': [[x + 15, y] for x, y in SQUARE], 'bulges': [0] * 5}]}
+    ], table_width=50, table_height=50).split('\n')
+
+    text = LaserGCodeGenerator(table_width=50, table_height=50, font_size=8, num_layers=3)
+    text_lines = text.generate_gcode('Hi')
+
+    cuts = LaserGCodeGenerator(table_width=50, table_height=50)
+    cut_lines = cuts.generate_multiple_cuts_gcode([
+        {'distance': 10, 'depth': 2, 'angle': 0, 'start_x': 20, 'start_y': 20},
+        {'distance': 10, 'depth': 2, 'angle': 90, 'start_x': 30, 'start_y': 5}
+    ])
+    return [(svg.last_toolpath, svg_lines), (text.last_toolpath, text_lines), (cuts.last_toolpath, cut_lines)]
+
+
+def test_sources_have_distinct_pauses(jobs):
+    # Sin pausas distintas la prueba siguiente no comprobaría nada
+    separators = [set(pauses(lines)) for _, lines in jobs]
+    assert 'G4 P1' in separators[1]
+    assert 'G4 P1 ; Pausa entre cortes' in separators[2]
+    assert 'G4 P0.5 ; Pausa entre capas' in separators[0]
+
+
+def test_merge_keeps_source_pauses(jobs):
+    names = ['svg', 'texto', 'cortes']
+    merged = JobMerger().merge([toolpath.copy() for toolpath, _ in jobs], names)
+    generator = LaserGCodeGenerator(table_width=50, table_height=50)
+    lines = generator.generate_merged_gcode(merged, names)
+
+    assert pauses(lines) == sum((pauses(source) for _, source in jobs), Counter())
+    assert generator.last_toolpath.meta['dwell_s'] == pytest.approx(dwell(lines))
+
+    # Volver a emitir el combinado conserva las mismas pausas
+    reemitted = LaserGCodeGenerator(table_width=50, table_height=50).generate_gcode_from_toolpath(
+        generator.last_toolpath)
+    assert pauses(reemitted) == pauses(lines)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SVGPath frente a svgpathtools (referencia)
+"""
+
+import warnings
+import numpy as np
+import pytest
+
+svgpathtools = pytest.importorskip('svgpathtools')
+
+from svg_path import SVGPath, LINE, ARC
+
+PATHS = {
+    'rectas': 'M 0 0 L 10 5 H 3 V 8 l -2 -1 h 4 v -3 Z',
+    'cúbica': 'M 0 0 C 10 20 30 -10 40 10',
+    'cuadrática': 'M 0 0 Q 10 20 20 0 q 5 -8 10 0',
+    'cúbica suave': 'M 0 0 C 5 10 15 10 20 0 S 35 -10 40 0 s 10 10 20 0',
+    'cuadrática suave': 'M 0 0 Q 5 10 10 0 T 20 0 t 10 0',
+    'arco elíptico': 'M 0 0 A 10 5 30 1 1 20 5',
+    'arcos relativos': 'm 1 1 a 5 5 0 0 0 10 0 a 5 5 0 1 1 -10 0 z',
+    'arco con radios cortos': 'M 0 0 A 1 1 0 0 1 10 0',
+    'banderas pegadas': 'M0,0a1 1 0 0110 0',
+    'mixto': 'M 2 3 L 8 3 C 12 3 12 9 8 9 Q 5 12 2 9 A 3 3 0 0 1 2 3 Z M 20 20 h 5 a 2 4 45 0 0 3 3',
+}
+
+
+def reference(path_d: str):
+    """Path de svgpathtools (sin el aviso por los arcos de radio nulo)"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return svgpathtools.parse_path(path_d)
+
+
+def polyline_distances(points: np.ndarray, polyline: np.ndarray) -> np.ndarray:
+    """Distancia de cada punto complejo a una polilínea compleja"""
+    start, end = polyline[:-1], polyline[1:]
+    direction = end - start
+    length2 = np.maximum(np.abs(direction) ** 2, 1e-300)
+    t = np.clip(((points[:, None] - start) * direction.conj()).real / length2, 0.0, 1.0)
+    return np.abs(points[:, None] - (start + t * direction)).min(axis=1)
+
+
+@pytest.mark.parametrize('name', PATHS)
+def test_lengths(name):
+    path = SVGPath.parse(PATHS[name])
+    expected = [segment.length() for segment in reference(PATHS[name])]
+    np.testing.assert_allclose(path.lengths(), expected, rtol=1e-7, atol=1e-9)
+
+
+@pytest.mark.parametrize('name', PATHS)
+def test_bounds(name):
+    xmin, xmax, ymin, ymax = reference(PATHS[name]).bbox()
+    np.testing.assert_allclose(SVGPath.parse(PATHS[name]).bounds(), (xmin, ymin, xmax, ymax), atol=1e-9)
+
+
+@pytest.mark.parametrize('name', PATHS)
+@pytest.mark.parametrize('tolerance', [0.1, 0.01])
+def test_flatten_within_tolerance(name, tolerance):
+    points, bulges = SVGPath.parse(PATHS[name]).flatten(tolerance)
+    assert not np.any(bulges)
+    flat = points[:, 0] + 1j * points[:, 1]
+    path = reference(PATHS[name])
+
+    # Los vértices están sobre el path
+    samples = np.array([segment.point(t) for segment in path for t in np.linspace(0, 1, 400)])
+    on_path = polyline_distances(flat, samples)
+    assert on_path.max() < 1e-3
+
+    # La polilínea no se separa del path más que la tolerancia (más el error del
+    # muestreo de la referencia)
+    deviation = polyline_distances(samples, flat)
+    assert deviation.max() <= tolerance * 1.05 + 1e-6
+
+
+def test_flatten_keeps_subpaths_apart():
+    points, _ = SVGPath.parse('M 0 0 L 10 0 M 20 0 L 30 0').flatten(0.01)
+    np.testing.assert_allclose(points, [[0, 0], [10, 0], [20, 0], [30, 0]])
+
+
+def test_native_arcs_keep_circles():
+    path = SVGPath.parse('M 0 5 A 5 5 0 0 1 10 5 A 5 5 0 0 1 0 5')
+    points, bulges = path.flatten(0.01, native_arcs=True)
+    # Dos semicírculos divididos en los extremos de cuadrante: 4 arcos de 90°
+    assert len(points) == 5
+    np.testing.assert_allclose(np.abs(bulges[1:]), np.tan(np.pi / 8))
+    np.testing.assert_allclose(np.hypot(points[:, 0] - 5, points[:, 1] - 5), 5)
+
+
+def test_zero_radius_arc_is_a_line():
+    path = SVGPath.parse('M 0 0 A 0 5 0 0 1 10 10')
+    expected = reference('M 0 0 A 0 5 0 0 1 10 10')
+    assert path.kind.tolist() == [LINE]
+    assert isinstance(expected[0], svgpathtools.Line)
+    np.testing.assert_allclose(path.lengths(), [expected[0].length()])
+
+
+def test_coincident_endpoint_arc_is_dropped():
+    # svgpathtools no admite arcos con inicio y final iguales; la especificación SVG
+    # indica omitirlos, así que la referencia es el path sin el arco
+    path = SVGPath.parse('M 5 5 A 3 3 0 0 1 5 5 L 10 10')
+    expected = reference('M 5 5 L 10 10')
+    assert ARC not in path.kind.tolist()
+    np.testing.assert_allclose(path.lengths(), [segment.length() for segment in expected])
+    xmin, xmax, ymin, ymax = expected.bbox()
+    np.testing.assert_allclose(path.bounds(), (xmin, ymin, xmax, ymax))
+
+
+def test_sample_matches_point():
+    path_d = PATHS['mixto']
+    expected = reference(path_d)
+    samples = SVGPath.parse(path_d).sample(50)
+    np.testing.assert_allclose(samples, [expected.point(i / 50) for i in range(51)], atol=1e-6)
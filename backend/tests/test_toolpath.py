@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Orden de pasadas 'hybrid' de Toolpath.schedule
+"""
+
+import numpy as np
+
+from toolpath import Toolpath
+
+
+def toolpath(passes):
+    """Una capa con un path de 10 s (100 mm a 600 mm/min) por grupo"""
+    result = Toolpath()
+    layer = result.add_layer('capa')
+    for i, count in enumerate(passes):
+        group = result.add_group(layer, passes=count)
+        result.add_path(group, [[0, i], [100, i]], feed=600, power=50)
+    return result.pack()
+
+
+def blocks(layers):
+    return [(item[1].tolist(), item[2]) for items in layers for item in items if item[0] == 'block']
+
+
+def test_blocks_reach_cooling_interval():
+    tp = toolpath([3] * 6)
+    layers = tp.schedule('hybrid', cooling_interval=20)
+    assert blocks(layers) == [([0, 1], 3), ([2, 3], 3), ([4, 5], 3)]
+    assert tp.min_reheat_interval(layers) == 20
+
+
+def test_short_trailing_block_joins_previous():
+    # 4 paths de 10 s con 25 s de enfriamiento: el bloque [3] se queda en 10 s
+    tp = toolpath([3] * 4)
+    layers = tp.schedule('hybrid', cooling_interval=25)
+    assert blocks(layers) == [([0, 1, 2, 3], 3)]
+    assert tp.min_reheat_interval(layers) == 40
+    np.testing.assert_array_equal(tp.pass_sequence(layers), np.tile([0, 1, 2, 3], 3))
+
+
+def test_short_block_keeps_its_pass_count():
+    # El resto [2] tiene otras pasadas y no puede unirse al bloque anterior
+    tp = toolpath([2, 2, 4])
+    layers = tp.schedule('hybrid', cooling_interval=15)
+    assert blocks(layers) == [([0, 1], 2), ([2], 4)]
+
+
+def test_short_block_before_pass_change_joins_previous():
+    tp = toolpath([2, 2, 2, 4, 4])
+    layers = tp.schedule('hybrid', cooling_interval=15)
+    assert blocks(layers) == [([0, 1, 2], 2), ([3, 4], 4)]
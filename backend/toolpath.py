@@ -0,0 +1,805 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Representación intermedia (IR) de trayectorias láser
+Todos los generadores producen un Toolpath; recorte, simplificación, cuantización,
+estimación y emisión de G-code trabajan sobre sus arrays en lugar de sobre texto
+"""
+
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+from gcode_parser import MOTION_RAPID, MOTION_LINE, MOTION_CW, MOTION_CCW
+
+
+def arc_centers(start: np.ndarray, end: np.ndarray, bulge: np.ndarray) -> np.ndarray:
+    """
+    Calcular el centro de arcos definidos por sus extremos y su bulge
+
+    El bulge es tan(barrido / 4): positivo en sentido antihorario (G3), negativo en
+    sentido horario (G2). El centro queda sobre la mediatriz de la cuerda, de modo que
+    los radios al inicio y al final coinciden aunque los extremos se cuantizen.
+
+    Args:
+        start: Array (n, 2) con el inicio de cada arco
+        end: Array (n, 2) con el final de cada arco
+        bulge: Array (n,) de bulges distintos de cero
+
+    Returns:
+        Array (n, 2) de centros
+    """
+    chord = end - start
+    normal = np.column_stack([-chord[:, 1], chord[:, 0]])
+    factor = (1.0 - bulge ** 2) / (4.0 * bulge)
+    return 0.5 * (start + end) + factor[:, None] * normal
+
+
+def segment_lengths(start: np.ndarray, end: np.ndarray, bulge: np.ndarray) -> np.ndarray:
+    """
+    Longitud de segmentos rectos (bulge 0) o arcos
+
+    Args:
+        start: Array (n, 2) con el inicio de cada segmento
+        end: Array (n, 2) con el final de cada segmento
+        bulge: Array (n,) de bulges
+
+    Returns:
+        Array (n,) de longitudes
+    """
+    chord = np.hypot(*(end - start).T) if len(start) else np.zeros(0)
+    # Arco = cuerda * (θ/2) / sin(θ/2) con θ = 4·atan(bulge)
+    half = 2.0 * np.arctan(np.abs(bulge))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(half > 1e-12, half / np.sin(np.where(half > 1e-12, half, 1.0)), 1.0)
+    return chord * ratio
+
+
+def flatten_arcs(points: np.ndarray, bulge: np.ndarray, tolerance: float = 0.01) -> np.ndarray:
+    """
+    Convertir los arcos de una polilínea en cuerdas dentro de una tolerancia
+
+    Args:
+        points: Array (n, 2) de vértices
+        bulge: Array (n,) con el bulge del segmento que termina en cada vértice
+        tolerance: Desviación cordal máxima en mm
+
+    Returns:
+        Array (m, 2) de vértices solo con segmentos rectos
+    """
+    chunks = [points[:1]]
+    for i in range(1, len(points)):
+        if bulge[i] == 0:
+            chunks.append(points[i:i + 1])
+            continue
+        center = arc_centers(points[i - 1:i], points[i:i + 1], bulge[i:i + 1])[0]
+        radius = float(np.hypot(*(points[i - 1] - center)))
+        sweep = 4.0 * np.arctan(bulge[i])
+        # Paso angular cuya flecha (r·(1 - cos(paso/2))) no supera la tolerancia
+        step = 2.0 * np.arccos(max(-1.0, 1.0 - tolerance / radius)) if radius > tolerance else np.pi / 2
+        count = max(1, int(np.ceil(abs(sweep) / max(step, 1e-6))))
+        start = np.arctan2(*(points[i - 1] - center)[::-1])
+        angles = start + sweep * np.arange(1, count) / count
+        chunks.append(center + radius * np.column_stack([np.cos(angles), np.sin(angles)]))
+        chunks.append(points[i:i + 1])
+    return np.concatenate(chunks)
+
+
+def split_arcs(points: np.ndarray, bulge: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Dividir los arcos de una polilínea en los extremos de cuadrante
+
+    Tras una rotación los vértices de un arco dejan de coincidir con sus extremos en
+    X e Y; al dividirlos de nuevo la caja envolvente de los vértices vuelve a ser la
+    del path.
+
+    Args:
+        points: Array (n, 2) de vértices
+        bulge: Array (n,) con el bulge del segmento que termina en cada vértice
+
+    Returns:
+        Tupla (vértices, bulges) con cada arco de como máximo 90° entre extremos de cuadrante
+    """
+    arcs = np.flatnonzero(bulge[1:] != 0) + 1
+    if not len(arcs):
+        return points, bulge
+    centers = arc_centers(points[arcs - 1], points[arcs], bulge[arcs])
+    point_chunks = [points[:arcs[0]]]
+    bulge_chunks = [bulge[:arcs[0]]]
+    quarter = np.pi / 2
+    for n, (i, center) in enumerate(zip(arcs, centers)):
+        radius = float(np.hypot(*(points[i - 1] - center)))
+        start = float(np.arctan2(*(points[i - 1] - center)[::-1]))
+        sweep = 4.0 * float(np.arctan(bulge[i]))
+        low, high = sorted((start, start + sweep))
+        cuts = np.arange(np.floor(low / quarter), np.ceil(high / quarter) + 1) * quarter
+        cuts = cuts[(cuts > low + 1e-9) & (cuts < high - 1e-9)]
+        if sweep < 0:
+            cuts = cuts[::-1]
+        angles = np.concatenate(([start], cuts, [start + sweep]))
+        point_chunks.append(center + radius * np.column_stack([np.cos(cuts), np.sin(cuts)]))
+        point_chunks.append(points[i:i + 1])
+        bulge_chunks.append(np.tan(np.diff(angles) / 4.0))
+        # Segmentos rectos hasta el siguiente arco
+        end = arcs[n + 1] if n + 1 < len(arcs) else len(points)
+        point_chunks.append(points[i + 1:end])
+        bulge_chunks.append(bulge[i + 1:end])
+    return np.concatenate(point_chunks), np.concatenate(bulge_chunks)
+
+
+class Toolpath:
+    """
+    Trayectorias en formato CSR organizadas en capas, grupos y paths
+
+    - Capa: parámetros y comentarios comunes (p. ej. una capa SVG)
+    - Grupo: conjunto de paths que se repite como una unidad (pasadas), p. ej. un
+      elemento SVG que el recorte dividió en varios tramos
+    - Path: polilínea de corte continua con velocidad y potencia propias
+
+    Los vértices de todos los paths se guardan en un único array (n, 2); el path k
+    ocupa points[offsets[k]:offsets[k + 1]]. bulge[i] describe el segmento que termina
+    en el vértice i: 0 para una recta (G1), tan(barrido / 4) para un arco (G2/G3). Los
+    generadores dividen los arcos en los extremos de cuadrante para que la caja
+    envolvente de los vértices sea la del path.
+    """
+
+    # Órdenes de pasadas soportados (ver schedule)
+    PASS_ORDERS = ('group', 'layer', 'path', 'hybrid')
+
+    def __init__(self):
+        """Crear un toolpath vacío"""
+        self.layers: List[Dict] = []
+        self.groups: List[Dict] = []
+        self.group_layer = np.empty(0, dtype=np.int32)
+        self.group_passes = np.empty(0, dtype=np.int32)
+        self.points = np.empty((0, 2), dtype=np.float64)
+        self.bulge = np.empty(0, dtype=np.float64)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.path_group = np.empty(0, dtype=np.int32)
+        self.feed = np.empty(0, dtype=np.float64)
+        self.power = np.empty(0, dtype=np.float64)
+        self.closed = np.empty(0, dtype=bool)
+        # Datos del trabajo fuera de las trayectorias (tipo de generador, preámbulo, etc.)
+        self.meta: Dict = {}
+        self._pending: List[Tuple[np.ndarray, int, float, float, bool, np.ndarray]] = []
+
+    # ------------------------------------------------------------------
+    # Construcción
+    # ------------------------------------------------------------------
+
+    def add_layer(self, name: str, header: Optional[List[str]] = None,
+                  footer: Optional[List[str]] = None) -> int:
+        """
+        Agregar una capa
+
+        Args:
+            name: Nombre de la capa
+            header: Líneas emitidas al comenzar la capa (comentarios)
+            footer: Líneas emitidas al terminar la capa (p. ej. pausa entre capas)
+
+        Returns:
+            Índice de la capa
+        """
+        self.layers.append({'name': name, 'header': header or [], 'footer': footer or []})
+        return len(self.layers) - 1
+
+    def add_group(self, layer: int, passes: int = 1, header: Optional[List[str]] = None,
+                  label: Optional[str] = None) -> int:
+        """
+        Agregar un grupo de paths que se repite como una unidad
+
+        Args:
+            layer: Índice de la capa
+            passes: Número de pasadas del grupo
+            header: Líneas emitidas antes del grupo (p. ej. "; Elemento: id")
+            label: Identificador del grupo (id del elemento, texto, etc.)
+
+        Returns:
+            Índice del grupo
+        """
+        self.groups.append({'header': header or [], 'label': label})
+        self.group_layer = np.append(self.group_layer, np.int32(layer))
+        self.group_passes = np.append(self.group_passes, np.int32(passes))
+        return len(self.groups) - 1
+
+    def add_path(self, group: int, points: np.ndarray, feed: float, power: float,
+                 closed: bool = False, bulge: Optional[np.ndarray] = None) -> None:
+        """
+        Agregar un path de corte
+
+        Args:
+            group: Índice del grupo
+            points: Array (n, 2) de vértices en mm
+            feed: Velocidad de corte en mm/min
+            power: Potencia en porcentaje (0-100)
+            closed: Emitir un movimiento de cierre hasta el primer vértice
+            bulge: Bulge de cada vértice (None = todos los segmentos rectos)
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if len(points) == 0:
+            return
+        if bulge is None:
+            bulge = np.zeros(len(points))
+        else:
+            bulge = np.array(bulge, dtype=np.float64).reshape(-1)
+            bulge[:1] = 0.0
+        self._pending.append((points, group, float(feed), float(power), bool(closed), bulge))
+
+    def pack(self) -> 'Toolpath':
+        """Consolidar los paths agregados en los arrays CSR"""
+        if not self._pending:
+            return self
+        pending = self._pending
+        self._pending = []
+        counts = np.array([len(p[0]) for p in pending], dtype=np.int64)
+        self.points = np.concatenate([self.points] + [p[0] for p in pending])
+        self.bulge = np.concatenate([self.bulge] + [p[5] for p in pending])
+        self.offsets = np.concatenate([self.offsets, self.offsets[-1] + np.cumsum(counts)])
+        self.path_group = np.concatenate([self.path_group, np.array([p[1] for p in pending], dtype=np.int32)])
+        self.feed = np.concatenate([self.feed, np.array([p[2] for p in pending])])
+        self.power = np.concatenate([self.power, np.array([p[3] for p in pending])])
+        self.closed = np.concatenate([self.closed, np.array([p[4] for p in pending], dtype=bool)])
+        return self
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    @property
+    def num_paths(self) -> int:
+        """Número de paths"""
+        self.pack()
+        return len(self.offsets) - 1
+
+    @property
+    def path_layer(self) -> np.ndarray:
+        """Capa de cada path"""
+        self.pack()
+        return self.group_layer[self.path_group]
+
+    def path(self, k: int) -> np.ndarray:
+        """Vértices del path k"""
+        self.pack()
+        return self.points[self.offsets[k]:self.offsets[k + 1]]
+
+    def path_bulge(self, k: int) -> np.ndarray:
+        """Bulges de los vértices del path k"""
+        self.pack()
+        return self.bulge[self.offsets[k]:self.offsets[k + 1]]
+
+    def has_arcs(self) -> bool:
+        """Verificar si algún segmento es un arco"""
+        self.pack()
+        return bool(np.any(self.bulge != 0))
+
+    def group_paths(self) -> List[np.ndarray]:
+        """Índices de los paths de cada grupo, en orden de emisión"""
+        self.pack()
+        order = np.argsort(self.path_group, kind='stable')
+        bounds = np.searchsorted(self.path_group[order], np.arange(len(self.groups) + 1))
+        return [order[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def cut_length(self) -> float:
+        """Longitud total de corte de una pasada de cada path (sin repetir pasadas)"""
+        self.pack()
+        steps = segment_lengths(self.points[:-1], self.points[1:], self.bulge[1:])
+        # Excluir los saltos entre el final de un path y el inicio del siguiente
+        steps[self.offsets[1:-1] - 1] = 0.0
+        return float(steps.sum())
+
+    @staticmethod
+    def concat(toolpaths: List['Toolpath']) -> 'Toolpath':
+        """
+        Unir varios toolpaths en uno (capas y grupos se renumeran en orden)
+
+        Args:
+            toolpaths: Toolpaths a unir; los metadatos se toman del primero
+
+        Returns:
+            Nuevo toolpath
+        """
+        result = Toolpath()
+        if not toolpaths:
+            return result
+        for tp in toolpaths:
+            tp.pack()
+        layer_base = np.cumsum([0] + [len(tp.layers) for tp in toolpaths])
+        group_base = np.cumsum([0] + [len(tp.groups) for tp in toolpaths])
+        point_base = np.cumsum([0] + [len(tp.points) for tp in toolpaths])
+        result.layers = [layer for tp in toolpaths for layer in tp.layers]
+        result.groups = [group for tp in toolpaths for group in tp.groups]
+        result.group_layer = np.concatenate([tp.group_layer + base for tp, base in zip(toolpaths, layer_base)]).astype(np.int32)
+        result.group_passes = np.concatenate([tp.group_passes for tp in toolpaths]).astype(np.int32)
+        result.points = np.concatenate([tp.points for tp in toolpaths])
+        result.bulge = np.concatenate([tp.bulge for tp in toolpaths])
+        result.offsets = np.concatenate([[0]] + [tp.offsets[1:] + base for tp, base in zip(toolpaths, point_base)]).astype(np.int64)
+        result.path_group = np.concatenate([tp.path_group + base for tp, base in zip(toolpaths, group_base)]).astype(np.int32)
+        result.feed = np.concatenate([tp.feed for tp in toolpaths])
+        result.power = np.concatenate([tp.power for tp in toolpaths])
+        result.closed = np.concatenate([tp.closed for tp in toolpaths])
+        result.meta = dict(toolpaths[0].meta)
+        return result
+
+    def select(self, paths: np.ndarray) -> 'Toolpath':
+        """
+        Tomar un subconjunto de paths en un orden dado (capas y grupos sin cambios)
+
+        Args:
+            paths: Índices de los paths en el orden deseado
+
+        Returns:
+            Nuevo toolpath con esos paths
+        """
+        self.pack()
+        paths = np.asarray(paths, dtype=np.int64)
+        starts = self.offsets[paths]
+        counts = self.offsets[paths + 1] - starts
+        first = np.concatenate(([0], np.cumsum(counts)))
+        vertex = np.repeat(starts - first[:-1], counts) + np.arange(first[-1])
+        result = self._copy_structure()
+        result.points = self.points[vertex]
+        result.bulge = self.bulge[vertex]
+        result.offsets = first.astype(np.int64)
+        result.path_group = self.path_group[paths]
+        result.feed = self.feed[paths]
+        result.power = self.power[paths]
+        result.closed = self.closed[paths]
+        return result
+
+    def tile(self, offsets: np.ndarray, headers: Optional[List[List[str]]] = None) -> 'Toolpath':
+        """
+        Repetir el toolpath desplazado (step-and-repeat)
+
+        Cada copia agrega sus propias capas y grupos, en el orden de los desplazamientos.
+
+        Args:
+            offsets: Array (k, 2) con el desplazamiento de cada copia en mm
+            headers: Líneas antepuestas al encabezado de la primera capa de cada copia
+
+        Returns:
+            Nuevo toolpath con las k copias
+        """
+        self.pack()
+        offsets = np.asarray(offsets, dtype=np.float64).reshape(-1, 2)
+        copies = np.arange(len(offsets))[:, None]
+        result = Toolpath()
+        result.layers = [dict(layer, header=(headers[c] if headers and i == 0 else []) + layer['header'])
+                         for c in range(len(offsets)) for i, layer in enumerate(self.layers)]
+        result.groups = self.groups * len(offsets)
+        result.group_layer = (self.group_layer[None, :] + copies * len(self.layers)).ravel().astype(np.int32)
+        result.group_passes = np.tile(self.group_passes, len(offsets))
+        result.points = (self.points[None, :, :] + offsets[:, None, :]).reshape(-1, 2)
+        result.bulge = np.tile(self.bulge, len(offsets))
+        result.offsets = np.concatenate(([0], (self.offsets[None, 1:] + copies * len(self.points)).ravel())).astype(np.int64)
+        result.path_group = (self.path_group[None, :] + copies * len(self.groups)).ravel().astype(np.int32)
+        result.feed = np.tile(self.feed, len(offsets))
+        result.power = np.tile(self.power, len(offsets))
+        result.closed = np.tile(self.closed, len(offsets))
+        result.meta = dict(self.meta)
+        return result
+
+    # ------------------------------------------------------------------
+    # Transformaciones
+    # ------------------------------------------------------------------
+
+    def _copy_structure(self) -> 'Toolpath':
+        """Crear un toolpath vacío con las mismas capas y grupos"""
+        result = Toolpath()
+        result.layers = self.layers
+        result.groups = self.groups
+        result.group_layer = self.group_layer
+        result.group_passes = self.group_passes
+        result.meta = self.meta
+        return result
+
+    def copy(self) -> 'Toolpath':
+        """Copiar el toolpath (los arrays dejan de compartir memoria, p. ej. con un memmap)"""
+        self.pack()
+        result = self._copy_structure()
+        result.meta = dict(self.meta)
+        result.points = np.array(self.points)
+        result.bulge = np.array(self.bulge)
+        result.offsets = np.array(self.offsets)
+        result.path_group = np.array(self.path_group)
+        result.feed = np.array(self.feed)
+        result.power = np.array(self.power)
+        result.closed = np.array(self.closed)
+        return result
+
+    def map_paths(self, func: Callable[[np.ndarray, bool, np.ndarray],
+                                       List[Tuple[np.ndarray, bool, Optional[np.ndarray]]]]) -> 'Toolpath':
+        """
+        Aplicar una transformación path a path (un path puede producir varios tramos)
+
+        Args:
+            func: Función (puntos, cerrado, bulge) -> lista de (puntos, cerrado, bulge)
+
+        Returns:
+            Nuevo toolpath con los paths transformados
+        """
+        self.pack()
+        result = self._copy_structure()
+        for k in range(self.num_paths):
+            for points, closed, bulge in func(self.path(k), bool(self.closed[k]), self.path_bulge(k)):
+                result.add_path(self.path_group[k], points, self.feed[k], self.power[k], closed, bulge)
+        return result.pack()
+
+    def clip(self, clipper, arc_tolerance: float = 0.01) -> 'Toolpath':
+        """
+        Recortar los paths al área de trabajo
+
+        Los paths cerrados que salen de la tabla incluyen su segmento de cierre
+        antes de recortarse y los tramos resultantes quedan abiertos. Los arcos de
+        un path que sale de la tabla se aplanan antes de recortarse.
+
+        Args:
+            clipper: ToolpathClipper con el área de trabajo
+            arc_tolerance: Tolerancia cordal en mm para aplanar arcos recortados
+
+        Returns:
+            Nuevo toolpath recortado
+        """
+        def clip_path(points, closed, bulge):
+            if clipper.contains(points):
+                return [(points, closed, bulge)]
+            if np.any(bulge != 0):
+                points = flatten_arcs(points, bulge, arc_tolerance)
+            if closed:
+                points = np.vstack([points, points[:1]])
+            return [(piece, False, None) for piece in clipper.clip(points)]
+        return self.map_paths(clip_path)
+
+    def simplify(self, simplifier) -> 'Toolpath':
+        """
+        Simplificar los paths (ver PathSimplifier)
+
+        Los paths con arcos ya tienen sus vértices exactos y se conservan sin cambios.
+
+        Args:
+            simplifier: PathSimplifier configurado
+
+        Returns:
+            Nuevo toolpath simplificado
+        """
+        self.pack()
+        result = self._copy_structure()
+        for k in range(self.num_paths):
+            bulge = self.path_bulge(k)
+            if np.any(bulge != 0):
+                result.add_path(self.path_group[k], self.path(k), self.feed[k], self.power[k], self.closed[k], bulge)
+                continue
+            points = simplifier.simplify(self.path(k), self.feed[k])
+            result.add_path(self.path_group[k], points, self.feed[k], self.power[k], self.closed[k])
+        return result.pack()
+
+    def deduplicate(self, deduplicator) -> 'Toolpath':
+        """
+        Eliminar los segmentos que repiten o solapan otros ya cortados
+
+        Solo se comparan paths con la misma capa, pasadas, velocidad y potencia; el
+        segmento de cierre de los paths cerrados también cuenta. Los paths sin
+        cambios se conservan tal cual; los demás se dividen en tramos abiertos (un
+        path cerrado que pierde un tramo intermedio empieza justo después de él).
+
+        Args:
+            deduplicator: SegmentDeduplicator con la tolerancia
+
+        Returns:
+            Nuevo toolpath (el mismo si ningún segmento está repetido)
+        """
+        self.pack()
+        num_paths = self.num_paths
+        if not num_paths:
+            return self
+        # Segmento que termina en cada vértice salvo el primero de su path, más los cierres
+        vertex_path = np.repeat(np.arange(num_paths), np.diff(self.offsets))
+        inner = np.ones(len(self.points), dtype=bool)
+        inner[self.offsets[:-1]] = False
+        ends = np.flatnonzero(inner)
+        closing = np.flatnonzero(self.closed)
+        start = np.concatenate([self.points[ends - 1], self.points[self.offsets[closing + 1] - 1]])
+        end = np.concatenate([self.points[ends], self.points[self.offsets[closing]]])
+        bulge = np.concatenate([self.bulge[ends], np.zeros(len(closing))])
+        segment_path = np.concatenate([vertex_path[ends], closing])
+        order = np.argsort(np.concatenate([ends * 2, (self.offsets[closing + 1] - 1) * 2 + 1]), kind='stable')
+        start, end, bulge, segment_path = start[order], end[order], bulge[order], segment_path[order]
+
+        passes = self.group_passes[self.path_group]
+        settings = np.column_stack([self.path_layer, passes, self.feed, self.power])
+        _, kind = np.unique(settings, axis=0, return_inverse=True)
+        kind = kind.reshape(-1)
+        segment, t0, t1 = deduplicator.pieces(start, end, bulge, kind[segment_path],
+                                              segment_lengths(start, end, bulge), passes[segment_path])
+
+        whole = (t0 == 0.0) & (t1 == 1.0)
+        intact = np.zeros(len(start), dtype=bool)
+        intact[segment[whole]] = True
+        changed = np.zeros(num_paths, dtype=bool)
+        changed[segment_path[~intact]] = True
+        if not changed.any():
+            return self
+
+        # Tramos conservados; un tramo continúa el anterior si ambos cubren enteros
+        # dos segmentos consecutivos del mismo path
+        direction = end[segment] - start[segment]
+        piece_start = start[segment] + t0[:, None] * direction
+        piece_end = start[segment] + t1[:, None] * direction
+        piece_bulge = np.where(whole, bulge[segment], 0.0)
+        piece_path = segment_path[segment]
+        continues = np.concatenate(([False], (piece_path[1:] == piece_path[:-1]) &
+                                    (segment[1:] == segment[:-1] + 1) &
+                                    (t1[:-1] == 1.0) & (t0[1:] == 0.0)))
+        path_pieces = np.searchsorted(piece_path, np.arange(num_paths + 1))
+        path_segments = np.searchsorted(segment_path, np.arange(num_paths + 1))
+
+        result = self._copy_structure()
+        for k in range(num_paths):
+            group, feed, power = self.path_group[k], self.feed[k], self.power[k]
+            if not changed[k]:
+                result.add_path(group, self.path(k), feed, power, self.closed[k], self.path_bulge(k))
+                continue
+            lo, hi = path_pieces[k], path_pieces[k + 1]
+            chains = np.split(np.arange(lo, hi), np.flatnonzero(~continues[lo:hi])[1:])
+            chains = [chain for chain in chains if len(chain)]
+            if (self.closed[k] and len(chains) > 1 and segment[chains[0][0]] == path_segments[k] and
+                    t0[chains[0][0]] == 0.0 and segment[chains[-1][-1]] == path_segments[k + 1] - 1 and
+                    t1[chains[-1][-1]] == 1.0):
+                # El último tramo llega al inicio del path: unirlo con el primero
+                chains = [np.concatenate([chains[-1], chains[0]])] + chains[1:-1]
+            for chain in chains:
+                points = np.vstack([piece_start[chain[:1]], piece_end[chain]])
+                result.add_path(group, points, feed, power, False,
+                                np.concatenate(([0.0], piece_bulge[chain])))
+        return result.pack()
+
+    def quantize(self, profile) -> Tuple['Toolpath', int]:
+        """
+        Cuantizar todos los vértices a la rejilla de pasos y eliminar movimientos nulos
+
+        Un cierre cuyo vértice final cae en el mismo paso que el inicial también es
+        un movimiento nulo: el path deja de marcarse como cerrado.
+
+        Args:
+            profile: MachineProfile con steps_per_mm
+
+        Returns:
+            Tupla (nuevo toolpath, movimientos nulos eliminados)
+        """
+        self.pack()
+        points = profile.quantize(self.points)
+        # Un vértice igual al anterior del mismo path es un movimiento nulo
+        same = np.zeros(len(points), dtype=bool)
+        same[1:] = np.all(points[1:] == points[:-1], axis=1)
+        same[self.offsets[:-1]] = False
+        keep = ~same
+        counts = np.add.reduceat(keep.astype(np.int64), self.offsets[:-1]) if len(points) else np.zeros(0, np.int64)
+        closed = self.closed.copy()
+        if np.any(closed):
+            same_close = np.all(points[self.offsets[1:] - 1] == points[self.offsets[:-1]], axis=1) & closed
+            closed &= ~same_close
+            removed_closes = int(np.count_nonzero(same_close))
+        else:
+            removed_closes = 0
+
+        result = self._copy_structure()
+        result.points = points[keep]
+        result.bulge = self.bulge[keep]
+        result.offsets = np.concatenate(([0], np.cumsum(counts)))
+        result.path_group = self.path_group
+        result.feed = self.feed
+        result.power = self.power
+        result.closed = closed
+        return result, int(np.count_nonzero(same)) + removed_closes
+
+    # ------------------------------------------------------------------
+    # Orden de pasadas
+    # ------------------------------------------------------------------
+
+    def path_lengths(self) -> np.ndarray:
+        """Longitud de corte de cada path en mm (incluye el cierre)"""
+        self.pack()
+        steps = segment_lengths(self.points[:-1], self.points[1:], self.bulge[1:])
+        cumulative = np.concatenate(([0.0], np.cumsum(steps)))
+        lengths = cumulative[self.offsets[1:] - 1] - cumulative[self.offsets[:-1]]
+        if np.any(self.closed):
+            close = self.points[self.offsets[1:] - 1] - self.points[self.offsets[:-1]]
+            lengths = lengths + np.where(self.closed, np.hypot(close[:, 0], close[:, 1]), 0.0)
+        return lengths
+
+    def path_times(self) -> np.ndarray:
+        """Tiempo de corte de una pasada de cada path en segundos (longitud / avance)"""
+        return self.path_lengths() / np.maximum(self.feed, 1e-9) * 60.0
+
+    def schedule(self, order: str = 'group', cooling_interval: float = 0.0) -> List[List[Tuple]]:
+        """
+        Agrupar los paths de cada capa en bloques que se repiten por pasadas
+
+        - 'group': cada grupo completo se repite (orden propio de cada generador)
+        - 'layer': todos los paths de la capa una vez y luego otra (layer-major)
+        - 'path': todas las pasadas de un path antes de pasar al siguiente (path-major)
+        - 'hybrid': bloques de paths consecutivos cuya pasada dura al menos
+          cooling_interval, para que cada path se enfríe entre pasadas sin recorrer
+          toda la tabla en cada una; los paths restantes de una capa que no llegan
+          a cooling_interval se unen al bloque anterior con las mismas pasadas
+
+        Un bloque solo contiene paths con el mismo número de pasadas.
+
+        Args:
+            order: Estrategia (ver PASS_ORDERS)
+            cooling_interval: Tiempo mínimo en segundos entre pasadas sobre un mismo path ('hybrid')
+
+        Returns:
+            Lista por capa de elementos ('empty', grupo) para grupos sin paths y
+            ('block', índices de paths, pasadas, grupo o None si el bloque no es un grupo completo)
+        """
+        if order not in self.PASS_ORDERS:
+            raise ValueError(f"Orden de pasadas no soportado: {order}")
+        self.pack()
+        group_paths = self.group_paths()
+        times = self.path_times() if order == 'hybrid' else None
+        layers = []
+        for layer_idx in range(len(self.layers)):
+            groups = np.flatnonzero(self.group_layer == layer_idx)
+            items = []
+            if order == 'group':
+                for g in groups:
+                    if len(group_paths[g]):
+                        items.append(('block', group_paths[g], int(self.group_passes[g]), int(g)))
+                    else:
+                        items.append(('empty', int(g)))
+                layers.append(items)
+                continue
+
+            items.extend(('empty', int(g)) for g in groups if len(group_paths[g]) == 0)
+            paths = [k for g in groups for k in group_paths[g]]
+            current = []
+            elapsed = 0.0
+            for k in paths:
+                passes = int(self.group_passes[self.path_group[k]])
+                if current and passes != int(self.group_passes[self.path_group[current[0]]]):
+                    self._append_block(items, current, int(self.group_passes[self.path_group[current[0]]]),
+                                       order == 'hybrid' and elapsed < cooling_interval)
+                    current, elapsed = [], 0.0
+                current.append(k)
+                if order == 'path':
+                    close = True
+                elif order == 'hybrid':
+                    elapsed += times[k]
+                    close = elapsed >= cooling_interval
+                else:
+                    close = False
+                if close:
+                    items.append(('block', np.array(current), passes, None))
+                    current, elapsed = [], 0.0
+            if current:
+                self._append_block(items, current, int(self.group_passes[self.path_group[current[0]]]),
+                                   order == 'hybrid' and elapsed < cooling_interval)
+
+            # Un bloque que coincide con un grupo completo conserva su encabezado fuera de la repetición
+            for i, item in enumerate(items):
+                if item[0] == 'block':
+                    g = int(self.path_group[item[1][0]])
+                    if np.array_equal(item[1], group_paths[g]):
+                        items[i] = ('block', item[1], item[2], g)
+            layers.append(items)
+        return layers
+
+    @staticmethod
+    def _append_block(items: List[Tuple], paths: List[int], passes: int, short: bool) -> None:
+        """
+        Cerrar un bloque de paths consecutivos
+
+        Un bloque corto (paths restantes que no llegan a cooling_interval) se une al
+        bloque anterior si tiene las mismas pasadas, para no repetirlo sin enfriamiento.
+        """
+        if short and items and items[-1][0] == 'block' and items[-1][2] == passes:
+            items[-1] = ('block', np.concatenate([items[-1][1], paths]), passes, None)
+        else:
+            items.append(('block', np.array(paths), passes, None))
+
+    def pass_sequence(self, layers: List[List[Tuple]]) -> np.ndarray:
+        """
+        Secuencia de paths ejecutados (con pasadas expandidas) de un orden de pasadas
+
+        Args:
+            layers: Resultado de schedule()
+
+        Returns:
+            Array de índices de paths en orden de ejecución
+        """
+        sequence = [np.tile(item[1], item[2]) for items in layers for item in items
+                    if item[0] == 'block' and item[2] > 0]
+        return np.concatenate(sequence).astype(np.int64) if sequence else np.empty(0, dtype=np.int64)
+
+    def min_reheat_interval(self, layers: List[List[Tuple]]) -> Optional[float]:
+        """
+        Menor tiempo de corte entre dos pasadas sobre un mismo path
+
+        Args:
+            layers: Resultado de schedule()
+
+        Returns:
+            Segundos (sin contar desplazamientos) o None si ningún path tiene varias pasadas
+        """
+        times = self.path_times()
+        intervals = [float(times[item[1]].sum()) for items in layers for item in items
+                     if item[0] == 'block' and item[2] > 1]
+        return min(intervals) if intervals else None
+
+    # ------------------------------------------------------------------
+    # Estimación
+    # ------------------------------------------------------------------
+
+    def to_moves(self, max_power_value: float = 1000, emission_mode: str = 'm3',
+                 start: Tuple[float, float] = (0.0, 0.0), order: str = 'group',
+                 cooling_interval: float = 0.0) -> Dict:
+        """
+        Convertir el toolpath en arrays de movimientos para MotionSimulator.estimate_moves
+
+        Se expanden las pasadas según el orden indicado; cada path comienza con un G0 desde la
+        posición anterior y, en modo M3, con una sincronización del planificador.
+        Las pausas entre pasadas y capas no forman parte del toolpath.
+
+        Args:
+            max_power_value: Valor S correspondiente al 100% de potencia
+            emission_mode: 'm3' (sincronización por path) o 'm4'
+            start: Posición inicial de la máquina
+            order: Orden de pasadas (ver schedule)
+            cooling_interval: Tiempo mínimo entre pasadas para el orden 'hybrid'
+
+        Returns:
+            Dict de arrays con el formato de GCodeParser (type, x0, y0, x, y, cx, cy,
+            feed, power, spindle, sync); los arcos llevan su centro en cx, cy
+        """
+        self.pack()
+        paths = self.pass_sequence(self.schedule(order, cooling_interval))
+        if not len(paths):
+            empty_f = np.empty(0, dtype=np.float64)
+            return {'type': np.empty(0, dtype=np.int8), 'x0': empty_f, 'y0': empty_f, 'x': empty_f,
+                    'y': empty_f, 'cx': empty_f, 'cy': empty_f, 'feed': empty_f, 'power': empty_f,
+                    'spindle': np.empty(0, dtype=np.int8), 'sync': np.empty(0, dtype=bool)}
+        starts = self.offsets[paths]
+        counts = self.offsets[paths + 1] - starts
+        # Índices de vértices: para cada path todos sus vértices
+        vertex = np.repeat(starts - np.cumsum(np.concatenate(([0], counts[:-1]))), counts) + np.arange(counts.sum())
+        target = self.points[vertex]
+        first = np.zeros(len(vertex), dtype=bool)
+        first[np.cumsum(np.concatenate(([0], counts[:-1])))] = True
+        origin = np.vstack([np.asarray(start, dtype=np.float64)[None, :], target[:-1]])
+        path_of = np.repeat(paths, counts)
+        bulge = np.where(first, 0.0, self.bulge[vertex])
+        value = np.floor(np.clip(self.power, 0.0, 100.0) / 100.0 * max_power_value)[path_of]
+
+        # Cierre de paths cerrados: un movimiento extra al primer vértice
+        closing = self.closed[paths]
+        if np.any(closing):
+            ends = np.cumsum(counts) - 1
+            insert_at = ends[closing] + 1
+            target = np.insert(target, insert_at, self.points[starts[closing]], axis=0)
+            first = np.insert(first, insert_at, False)
+            path_of = np.insert(path_of, insert_at, paths[closing])
+            bulge = np.insert(bulge, insert_at, 0.0)
+            value = np.insert(value, insert_at, value[ends[closing]])
+            origin = np.vstack([np.asarray(start, dtype=np.float64)[None, :], target[:-1]])
+
+        use_m3 = emission_mode == 'm3'
+        spindle = np.where(first, 5, 3) if use_m3 else np.full(len(first), 4)
+        # M5 antes de cada G0 y M3 antes del primer corte vacían el planificador
+        sync = (first | np.concatenate(([False], first[:-1]))) if use_m3 else np.zeros(len(first), dtype=bool)
+        motion = np.where(first, MOTION_RAPID, MOTION_LINE)
+        center = origin.copy()
+        arcs = bulge != 0
+        if np.any(arcs):
+            motion[arcs] = np.where(bulge[arcs] > 0, MOTION_CCW, MOTION_CW)
+            center[arcs] = arc_centers(origin[arcs], target[arcs], bulge[arcs])
+        return {
+            'type': motion.astype(np.int8),
+            'x0': origin[:, 0],
+            'y0': origin[:, 1],
+            'x': target[:, 0],
+            'y': target[:, 1],
+            'cx': center[:, 0],
+            'cy': center[:, 1],
+            'feed': self.feed[path_of],
+            'power': np.where(first, 0.0, value),
+            'spindle': spindle.astype(np.int8),
+            'sync': sync,
+        }
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Recorte de trayectorias al área de trabajo
+Aplica Liang-Barsky vectorizado sobre todos los segmentos de una polilínea y la
+divide en tramos donde sale y vuelve a entrar a la tabla
+"""
+
+import numpy as np
+from typing import Dict, List
+
+
+class ToolpathClipper:
+    """Recortador de polilíneas al rectángulo de la tabla"""
+
+    def __init__(self, width: float, height: float, x_min: float = 0.0, y_min: float = 0.0):
+        """
+        Inicializar recortador
+
+        Args:
+            width: Ancho del área de trabajo en mm
+            height: Alto del área de trabajo en mm
+            x_min: Borde izquierdo del área en mm
+            y_min: Borde inferior del área en mm
+        """
+        self.x_min = x_min
+        self.y_min = y_min
+        self.x_max = x_min + width
+        self.y_max = y_min + height
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Reiniciar contadores"""
+        self.clipped_length = 0.0
+        self.paths_clipped = 0
+        self.paths_removed = 0
+
+    def get_stats(self) -> Dict:
+        """
+        Obtener estadísticas acumuladas del recorte
+
+        Returns:
+            Diccionario con la longitud recortada y los paths afectados
+        """
+        return {
+            'clipped_length_mm': round(self.clipped_length, 3),
+            'paths_clipped': self.paths_clipped,
+            'paths_removed': self.paths_removed
+        }
+
+    def contains(self, points: np.ndarray) -> bool:
+        """Verificar si todos los puntos están dentro del área de trabajo"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return bool(np.all((points[:, 0] >= self.x_min) & (points[:, 0] <= self.x_max) &
+                           (points[:, 1] >= self.y_min) & (points[:, 1] <= self.y_max)))
+
+    def clip_segments(self, start: np.ndarray, end: np.ndarray):
+        """
+        Recortar segmentos con Liang-Barsky de forma vectorizada
+
+        Args:
+            start: Array (n, 2) con el inicio de cada segmento
+            end: Array (n, 2) con el final de cada segmento
+
+        Returns:
+            Tupla (visible, t0, t1): máscara de segmentos visibles y parámetros
+            del tramo visible de cada segmento
+        """
+        d = end - start
+        p = np.column_stack([-d[:, 0], d[:, 0], -d[:, 1], d[:, 1]])
+        q = np.column_stack([start[:, 0] - self.x_min, self.x_max - start[:, 0],
+                             start[:, 1] - self.y_min, self.y_max - start[:, 1]])
+        parallel = p == 0
+        # Paralelo al borde y fuera de él: segmento rechazado
+        rejected = np.any(parallel & (q < 0), axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = np.where(parallel, 0.0, q / np.where(parallel, 1.0, p))
+        t0 = np.max(np.where(p < 0, r, 0.0), axis=1)
+        t1 = np.min(np.where(p > 0, r, 1.0), axis=1)
+        visible = ~rejected & (t0 <= t1)
+        return visible, t0, t1
+
+    def clip(self, points: np.ndarray) -> List[np.ndarray]:
+        """
+        Recortar una polilínea al área de trabajo
+
+        Args:
+            points: Array (n, 2) de puntos
+
+        Returns:
+            Lista de polilíneas dentro del área (vacía si queda completamente fuera)
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if self.contains(points):
+            return [points]
+        self.paths_clipped += 1
+        original_length = float(np.hypot(*np.diff(points, axis=0).T).sum())
+        if len(points) < 2:
+            self.paths_removed += 1
+            return []
+
+        start = points[:-1]
+        end = points[1:]
+        visible, t0, t1 = self.clip_segments(start, end)
+        idx = np.flatnonzero(visible)
+        if idx.size == 0:
+            self.paths_removed += 1
+            self.clipped_length += original_length
+            return []
+
+        d = end[idx] - start[idx]
+        a = start[idx] + t0[idx, None] * d
+        b = start[idx] + t1[idx, None] * d
+
+        # Un tramo continúa el anterior si ambos segmentos son consecutivos y
+        # el anterior termina sin recorte y el actual empieza sin recorte
+        eps = 1e-12
+        continues = np.concatenate(([False], (idx[1:] == idx[:-1] + 1) &
+                                    (t1[idx[:-1]] >= 1.0 - eps) & (t0[idx[1:]] <= eps)))
+        # Intercalar inicio/final y conservar el inicio solo al comenzar un tramo
+        pairs = np.stack([a, b], axis=1).reshape(-1, 2)
+        keep = np.column_stack([~continues, np.ones(len(idx), dtype=bool)]).ravel()
+        merged = pairs[keep]
+        starts = np.flatnonzero(~continues)
+        # Posición de cada inicio de tramo en el array fusionado
+        offsets = starts + np.arange(len(starts))
+        pieces = [piece for piece in np.split(merged, offsets[1:]) if len(piece) > 1]
+
+        kept_length = sum(float(np.hypot(*np.diff(piece, axis=0).T).sum()) for piece in pieces)
+        self.clipped_length += max(0.0, original_length - kept_length)
+        if not pieces:
+            self.paths_removed += 1
+        return pieces
@@ -124,6 +124,8 @@ interface CutPreset {
 }
 
 const API_BASE_URL = 'http://localhost:5001/api';
+const SVG_ELEMENTS_PAGE_SIZE = 500; // Elementos por petición a /svg-elements
+const SVG_PREVIEW_WIDTH_PX = 1000; // Ancho en píxeles de la vista previa de los elementos
 
 const App: React.FC = () => {
   // Estados
@@ -778,7 +780,7 @@ const App: React.FC = () => {
         setAlert({ type: 'success', message: 'SVG subido correctamente' });
         
         // Cargar elementos automáticamente
-        await loadSvgElements(response.data.filepath);
+        await loadSvgElements(response.data.filepath, response.data.svg_info);
       }
     } catch (error: any) {
       setAlert({ 
@@ -790,14 +792,31 @@ const App: React.FC = () => {
     }
   };
 
-  const loadSvgElements = async (filepath: string) => {
+  const loadSvgElements = async (filepath: string, info: any) => {
     setIsLoadingElements(true);
     try {
-      const response = await axios.post(`${API_BASE_URL}/svg-elements`, { filepath });
-      if (response.data.success) {
-        setSvgElements(response.data.elements);
-        setAlert({ type: 'success', message: `${response.data.total_elements} elementos cargados` });
+      // Puntos al detalle de la vista previa; se piden páginas hasta que no haya next_offset
+      const zoom = info?.width > 0 ? SVG_PREVIEW_WIDTH_PX / info.width : undefined;
+      const elements: any[] = [];
+      let offset: number | null = 0;
+      let total = 0;
+      while (offset !== null) {
+        const response: any = await axios.post(`${API_BASE_URL}/svg-elements`, {
+          filepath,
+          zoom,
+          offset,
+          limit: SVG_ELEMENTS_PAGE_SIZE,
+          include_d: false
+        });
+        if (!response.data.success) {
+          return;
+        }
+        elements.push(...response.data.elements);
+        total = response.data.total_elements;
+        offset = response.data.next_offset;
       }
+      setSvgElements(elements);
+      setAlert({ type: 'success', message: `${total} elementos cargados` });
     } catch (error: any) {
       setAlert({ 
         type: 'error', 
@@ -1742,7 +1761,7 @@ const App: React.FC = () => {
                     {svgFilePath && (
                       <Button
                         variant="outlined"
-                        onClick={() => loadSvgElements(svgFilePath)}
+                        onClick={() => loadSvgElements(svgFilePath, svgInfo)}
                         disabled={isLoadingElements}
                         startIcon={isLoadingElements ? <CircularProgress size={16} /> : <Visibility />}
                         sx={{ mt: 2 }}